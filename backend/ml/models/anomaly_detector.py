@@ -1,33 +1,116 @@
+# pandas / scikit-learn / joblib sadece ihtiyaç duyan yollarda import edilir: threshold
+# yolu ve derlenmiş (mmap) modelle skorlama bunları hiç yüklemez (~2 s başlangıç)
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-import joblib
+from numpy.lib.stride_tricks import sliding_window_view
 import json
 import sys
 import os
+import time
+import tracemalloc
 from datetime import datetime, timedelta
+from rolling_features import RollingFeatureEngine, RollingSlope
+from forest_compiler import CompiledForest
+from drift_monitor import DriftMonitor, FeatureStats, RetrainQueue, queue_path
+
+# Trend feature'ları: (kaynak kolon, pencere) - calculate_trend ile aynı sırada
+TREND_COLUMNS = ['temperature', 'weight', 'humidity']
+TREND_WINDOW = 10
+
+# Bu boyuta kadar batch'ler derlenmiş forest ile, daha büyükleri sklearn ile skorlanır
+COMPILED_BATCH_LIMIT = 256
+
+# memory_bytes: sklearn ağacı başına sayılan node array'leri
+_TREE_ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'n_node_samples',
+                'weighted_n_node_samples', 'impurity', 'value')
+
+# Eğitim verisinde kovanı ayıran kolon (ilk bulunan kullanılır)
+GROUP_COLUMNS = ('hiveId', 'hive', 'deviceId', 'sensorId', 'router')
+
+
+def _weights(k):
+    # En küçük kareler eğimi = merkezlenmiş x ile ağırlıklı toplam
+    x = np.arange(k) - (k - 1) / 2.0
+    return x / np.dot(x, x)
+
+
+def rolling_slope(values, window=TREND_WINDOW):
+    """Her nokta için kendisiyle biten son `window` değerin en küçük kareler eğimi
+    
+    np.polyfit(arange(k), y[-k:], 1)[0] ile aynı sonuç; ilk window-1 nokta kısa pencere
+    kullanır (ilk nokta 0). Tam pencereler tek bir sliding_window_view @ ağırlık ile hesaplanır.
+    """
+    y = np.asarray(values, dtype=float)
+    out = np.zeros(len(y))
+    
+    for k in range(2, min(window, len(y) + 1)):
+        out[k - 1] = np.dot(_weights(k), y[:k])
+    if len(y) >= window:
+        out[window - 1:] = sliding_window_view(y, window) @ _weights(window)
+    return out
+
+
+def grouped_rolling_slope(values, starts, window=TREND_WINDOW):
+    """Art arda dizilmiş grupların her biri için rolling_slope + grup içi ffill, tek geçişte
+    
+    values: grupların uç uca eklenmiş serisi, starts: her grubun values içindeki başlangıcı
+    (artan, ilk eleman 0). Sonuç her grup için ayrı ayrı
+    rolling_slope(pd.Series(grup).ffill()) ile aynıdır; grup sayısı kadar Python döngüsü yoktur.
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    out = np.zeros(n)
+    if not n:
+        return out
+    
+    lengths = np.diff(np.append(starts, n))
+    group_start = np.repeat(starts, lengths)
+    position = np.arange(n) - group_start
+    
+    # Grup içi forward-fill: son geçerli indeks, grubun başından önceyse NaN kalır
+    last_valid = np.maximum.accumulate(np.where(np.isnan(y), -1, np.arange(n)))
+    filled = np.where(last_valid >= group_start, y[np.maximum(last_valid, 0)], np.nan)
+    
+    # Kısa pencereler (grubun ilk window-1 noktası): k noktalık pencere
+    for k in range(2, window):
+        rows = np.flatnonzero(position == k - 1)
+        if len(rows):
+            out[rows] = filled[rows[:, None] + np.arange(1 - k, 1)] @ _weights(k)
+    if n >= window:
+        full = np.flatnonzero(position >= window - 1)
+        out[full] = (sliding_window_view(filled, window) @ _weights(window))[full - (window - 1)]
+    return out
+
 
 class AnomalyDetector:
     def __init__(self, model_path=None):
-        self.model = IsolationForest(
-            contamination=0.1, 
-            random_state=42,
-            n_estimators=100
-        )
-        self.scaler = StandardScaler()
-        self.pca = PCA(n_components=4)
+        # sklearn nesneleri ilk erişimde oluşturulur / artifact'tan yüklenir (bkz. model property'leri)
+        self._model = None
+        self._scaler = None
+        self._pca = None
+        self._estimators_ready = False
+        self.compiled = None  # Eğitilmiş modelin NumPy derlemesi (forest_compiler)
+        self.n_features = None
+        self.reference_stats = None  # Eğitim feature dağılımı (drift_monitor.FeatureStats.to_dict)
+        self.drift = None            # Eğitilmiş modelde kovan bazında drift izleme
+        self._memory = None          # (model durumu, byte) - memory_bytes cache'i
         self.is_trained = False
         self.feature_names = ['temperature', 'humidity', 'weight', 'gasLevel']
+        self.trend_feature_names = ['temp_trend', 'weight_trend', 'humidity_trend']
+        # hive_id ile gelen okumalar için kovan bazında streaming trend pencereleri
+        self.stream_features = RollingFeatureEngine(TREND_COLUMNS, TREND_WINDOW)
         self.model_path = model_path or 'anomaly_model.joblib'
         
         # Model varsa yükle
         if os.path.exists(self.model_path):
             self.load_model()
     
-    def extract_features(self, data, historical_data=None):
-        """Sensör verisinden feature'ları çıkar"""
+    def extract_features(self, data, historical_data=None, hive_id=None):
+        """Sensör verisinden feature'ları çıkar
+        
+        Trend feature'ları sadece model onlarla eğitildiyse eklenir. historical_data
+        verilirse son TREND_WINDOW kayıttan, hive_id verilirse kovanın streaming
+        penceresinden (okuma pencereye eklenir, O(1)) hesaplanır; ikisi de yoksa düz trend.
+        """
         base_features = [
             data.get('temperature', 20.0),
             data.get('humidity', 50.0),
@@ -35,50 +118,177 @@ class AnomalyDetector:
             data.get('gasLevel', 0.5)
         ]
         
-        # Historical data varsa, trend features ekle
         if historical_data and len(historical_data) > 1:
-            df = pd.DataFrame(historical_data)
-            
-            # Son 24 saatlik trend
-            temp_trend = self.calculate_trend(df, 'temperature')
-            weight_trend = self.calculate_trend(df, 'weight')
-            humidity_trend = self.calculate_trend(df, 'humidity')
-            
-            base_features.extend([temp_trend, weight_trend, humidity_trend])
+            trends = [
+                RollingSlope.from_values(
+                    (row[column] for row in historical_data[-TREND_WINDOW:] if row.get(column) is not None),
+                    TREND_WINDOW
+                ).slope()
+                for column in TREND_COLUMNS
+            ]
+        elif hive_id is not None:
+            trends = self.stream_features.update(hive_id, data)
+        else:
+            trends = [0.0, 0.0, 0.0]
+        
+        if self.expects_trends():
+            base_features.extend(trends)
         
         return base_features
     
+    def expects_trends(self):
+        """Model trend feature'larıyla (7 feature) mı eğitilmiş?"""
+        return self.is_trained and (self.n_features or 0) > len(self.feature_names)
+    
+    @property
+    def model(self):
+        self._ensure_estimators()
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    @property
+    def scaler(self):
+        self._ensure_estimators()
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
+    
+    @property
+    def pca(self):
+        self._ensure_estimators()
+        return self._pca
+    
+    @pca.setter
+    def pca(self, value):
+        self._pca = value
+    
+    def _ensure_estimators(self):
+        """sklearn nesnelerini gerektiğinde hazırla - eğitilmiş artifact varsa tamamını yükle"""
+        if self._estimators_ready:
+            return
+        self._estimators_ready = True
+        if self.is_trained and os.path.exists(self.model_path):
+            self._load_artifact()
+        else:
+            self._model, self._scaler, self._pca = self._new_estimators()
+    
+    def memory_bytes(self):
+        """Yüklü model array'lerinin yaklaşık boyutu - model_registry cache bütçesi için
+        
+        Derlenmiş forest + (yüklendiyse) sklearn ağaçları. sklearn nesneleri ilk ihtiyaçta
+        yüklendiği için sonuç modelin durumuna göre cache'lenir ve durum değişince yeniden ölçülür.
+        """
+        state = (id(self.compiled), id(self._model) if self._estimators_ready else None)
+        if self._memory is None or self._memory[0] != state:
+            total = self.compiled.nbytes if self.compiled is not None else 0
+            if self._estimators_ready:
+                for estimator in getattr(self._model, 'estimators_', ()):
+                    total += sum(getattr(estimator.tree_, name).nbytes for name in _TREE_ARRAYS)
+            self._memory = (state, total)
+        return self._memory[1]
+    
+    def _new_estimators(self, n_jobs=None):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.decomposition import PCA
+        
+        model = IsolationForest(
+            contamination=0.1, 
+            random_state=42,
+            n_estimators=100,
+            n_jobs=n_jobs
+        )
+        return model, StandardScaler(), PCA(n_components=4)
+    
     def calculate_trend(self, df, column):
-        """Belirli bir column için trend hesapla"""
+        """Belirli bir column için trend hesapla (son TREND_WINDOW nokta)"""
         if column not in df.columns or len(df) < 2:
             return 0.0
         
-        # Son 10 veri noktasını al
-        recent_data = df[column].tail(10).values
+        return float(RollingSlope.from_values(df[column].tail(TREND_WINDOW), TREND_WINDOW).slope())
+    
+    def extract_features_batch(self, df, tails=None):
+        """Kolon bazlı feature çıkarımı - (X, tails)
+        
+        Trend feature'ları calculate_trend ile aynıdır: her satır için kendisiyle biten son
+        TREND_WINDOW değerin eğimi, kovan bazında (GROUP_COLUMNS) ve zaman sırasıyla.
+        tails önceki chunk'taki her kovanın son TREND_WINDOW-1 değeridir; chunk'lar arasında
+        taşınarak pencereler chunk sınırında kesilmez.
+        """
+        import pandas as pd
+        
+        tails = {} if tails is None else tails
+        group_col = next((col for col in GROUP_COLUMNS if col in df.columns), None)
+        if 'timestamp' in df.columns:
+            df = df.assign(_ts=pd.to_datetime(df['timestamp'], errors='coerce'))
+            df = df.sort_values(([group_col] if group_col else []) + ['_ts'], kind='mergesort')
+        
+        trends = np.zeros((len(df), len(TREND_COLUMNS)))
+        # Kolonlar bir kez NumPy'a çevrilir; her kovanın serisi (önceki chunk'ın tail'i + satırları)
+        # uç uca eklenip trend'ler tek geçişte hesaplanır - maliyet kovan sayısıyla büyümez
+        columns = [
+            df[column].to_numpy(dtype=float, na_value=np.nan) if column in df.columns else None
+            for column in TREND_COLUMNS
+        ]
+        groups = df.groupby(group_col, sort=False).indices if group_col else {None: np.arange(len(df))}
+        previous = [tails.get(group) for group in groups]
+        rows = np.concatenate(list(groups.values())) if groups else np.empty(0, dtype=np.intp)
+        counts = np.array([len(group_rows) for group_rows in groups.values()], dtype=np.intp)
         
-        # Linear trend hesapla
-        x = np.arange(len(recent_data))
-        trend = np.polyfit(x, recent_data, 1)[0]
+        new_tails = [[] for _ in groups]
+        for j, values in enumerate(columns):
+            prev = [tail[j] if tail is not None else np.empty(0) for tail in previous]
+            if values is None:
+                for g, tail in enumerate(prev):
+                    new_tails[g].append(tail[-(TREND_WINDOW - 1):])
+                continue
+            # Grup başına [tail, satırlar] - tail sadece pencereyi doldurur, sonuç satırlara yazılır
+            series = np.concatenate([part for tail, group_rows in zip(prev, groups.values())
+                                     for part in (tail, values[group_rows])] or [np.empty(0)])
+            prev_lengths = np.array([len(tail) for tail in prev], dtype=np.intp)
+            ends = np.cumsum(prev_lengths + counts)
+            starts = ends - prev_lengths - counts
+            slopes = grouped_rolling_slope(series, starts, TREND_WINDOW)
+            position = np.arange(len(series)) - np.repeat(starts, prev_lengths + counts)
+            trends[rows, j] = np.nan_to_num(slopes[position >= np.repeat(prev_lengths, prev_lengths + counts)])
+            for g, (start, end) in enumerate(zip(starts, ends)):
+                new_tails[g].append(series[max(start, end - (TREND_WINDOW - 1)):end])
+        tails.update(zip(groups, new_tails))
         
-        return float(trend)
+        base = self.feature_matrix(df[[col for col in self.feature_names if col in df.columns]])
+        return np.hstack([base, trends]), tails
     
-    def detect_anomalies(self, data, historical_data=None):
+    def detect_anomalies(self, data, historical_data=None, hive_id=None):
         """Real-time anomaly detection"""
         try:
-            features = self.extract_features(data, historical_data)
+            features = self.extract_features(data, historical_data, hive_id)
             
             if not self.is_trained:
                 # Model eğitilmemişse basit threshold-based detection
                 return self.threshold_based_detection(data)
             
             # ML-based detection
-            scaled_features = self.scaler.transform([features])
-            
-            if hasattr(self, 'pca') and self.pca:
-                scaled_features = self.pca.transform(scaled_features)
+            if self.compiled is not None:
+                # Aynı skor, sklearn'ün çağrı başı doğrulama / dispatch maliyeti olmadan
+                anomaly_score = self.compiled.decision_function([features])[0]
+            else:
+                scaled_features = self.scaler.transform([features])
+                
+                # PCA sadece >4 feature ile eğitimde fit edilir
+                if getattr(self, 'pca', None) is not None and hasattr(self.pca, 'components_'):
+                    scaled_features = self.pca.transform(scaled_features)
+                
+                anomaly_score = self.model.decision_function(scaled_features)[0]
+            # predict() == -1 ile aynı: ağaçları ikinci kez dolaşmaya gerek yok
+            is_anomaly = anomaly_score < 0
             
-            anomaly_score = self.model.decision_function(scaled_features)[0]
-            is_anomaly = self.model.predict(scaled_features)[0] == -1
+            if self.drift is not None:
+                self.drift.observe(hive_id, features)
             
             # Confidence hesapla (0-1 arası)
             confidence = min(abs(anomaly_score), 1.0)
@@ -101,6 +311,99 @@ class AnomalyDetector:
             print(f"Error in anomaly detection: {str(e)}", file=sys.stderr)
             return self.threshold_based_detection(data)
     
+    def feature_matrix(self, readings):
+        """Okumaları (n, feature) float matrisine çevir
+        
+        readings: DataFrame / dict listesi (feature_names + opsiyonel trend kolonları) ya da
+        kolonları aynı sırada olan 2-D array. Eksik değerler extract_features ile aynı
+        varsayılanlarla doldurulur.
+        """
+        defaults = [20.0, 50.0, 10.0, 0.5]
+        
+        if isinstance(readings, np.ndarray):
+            X = np.asarray(readings, dtype=float)
+            if X.ndim != 2 or X.shape[1] not in (4, 7):
+                raise ValueError(f"Expected (n, 4) or (n, 7) array, got {X.shape}")
+            return np.where(np.isnan(X), np.array(defaults + [0.0] * 3)[:X.shape[1]], X)
+        
+        import pandas as pd
+        
+        df = readings if isinstance(readings, pd.DataFrame) else pd.DataFrame(list(readings))
+        columns = [
+            df[name].to_numpy(dtype=float, na_value=np.nan) if name in df.columns else np.full(len(df), np.nan)
+            for name in self.feature_names
+        ]
+        fill = list(defaults)
+        if any(name in df.columns for name in self.trend_feature_names):
+            columns += [
+                df[name].to_numpy(dtype=float, na_value=np.nan) if name in df.columns else np.full(len(df), np.nan)
+                for name in self.trend_feature_names
+            ]
+            fill += [0.0] * 3
+        
+        X = np.column_stack(columns) if len(df) else np.empty((0, len(fill)))
+        return np.where(np.isnan(X), np.array(fill), X)
+    
+    def detect_anomalies_batch(self, readings):
+        """Çok sayıda okumayı (farklı kovanlardan olabilir) tek geçişte skorla
+        
+        scale → PCA → decision_function her biri bir kez çalışır; is_anomaly aynı
+        skorlardan türetilir. Sonuç kolon bazlıdır:
+        {"anomaly_score": array, "is_anomaly": bool array, "confidence": array, "method": str, "count": n}
+        
+        Girdi genişliği modele uydurulur (4 feature'lı modelde trend kolonları atılır, 7 feature'lıda
+        düz trend eklenir); başka bir uyumsuzluk ValueError'dır. Threshold'a sadece eğitilmemiş
+        model düşer - hatalı girdi sessizce threshold sonucu olarak raporlanmaz.
+        """
+        X = self.feature_matrix(readings)
+        if not self.is_trained or not len(X):
+            return self.threshold_based_detection_batch(X)
+        
+        if self.expects_trends():
+            if X.shape[1] == len(self.feature_names):
+                # extract_features ile aynı: geçmiş yoksa düz trend
+                X = np.hstack([X, np.zeros((len(X), len(self.trend_feature_names)))])
+        elif X.shape[1] > len(self.feature_names):
+            # Model trend'siz (4 feature) eğitilmiş - trend kolonları kullanılmaz
+            X = X[:, :len(self.feature_names)]
+        if self.n_features and X.shape[1] != self.n_features:
+            raise ValueError(f"Model expects {self.n_features} features, got {X.shape[1]}")
+        
+        if self.compiled is not None and len(X) <= COMPILED_BATCH_LIMIT:
+            scores = self.compiled.decision_function(X)
+        else:
+            scaled = self.scaler.transform(X)
+            if getattr(self, 'pca', None) is not None and hasattr(self.pca, 'components_'):
+                scaled = self.pca.transform(scaled)
+            scores = self.model.decision_function(scaled)
+        
+        return {
+            "anomaly_score": scores,
+            "is_anomaly": scores < 0,
+            "confidence": np.minimum(np.abs(scores), 1.0),
+            "method": "ml_isolation_forest",
+            "count": len(scores)
+        }
+    
+    def threshold_based_detection_batch(self, X):
+        """threshold_based_detection'ın kolon bazlı karşılığı (X: feature_matrix çıktısı)"""
+        temp, humidity, weight = X[:, 0], X[:, 1], X[:, 2]
+        flags = {
+            "extreme_temperature": (temp > 40) | (temp < 5),
+            "extreme_humidity": (humidity > 90) | (humidity < 10),
+            "extreme_weight": (weight < 0) | (weight > 100)
+        }
+        is_anomaly = flags["extreme_temperature"] | flags["extreme_humidity"] | flags["extreme_weight"]
+        
+        return {
+            "anomaly_score": np.where(is_anomaly, -0.5, 0.1),
+            "is_anomaly": is_anomaly,
+            "confidence": np.where(is_anomaly, 0.8, 0.2),
+            "method": "threshold_based",
+            "anomalies": flags,
+            "count": len(is_anomaly)
+        }
+    
     def threshold_based_detection(self, data):
         """Fallback threshold-based anomaly detection"""
         anomalies = []
@@ -200,37 +503,100 @@ class AnomalyDetector:
         
         return analysis
     
-    def train_model(self, training_data):
-        """Model eğitimi (batch olarak çalıştırılır)"""
+    def train_model(self, training_data, with_trends=True, chunk_size=100000, sample_size=200000, n_jobs=None):
+        """Model eğitimi (batch olarak çalıştırılır)
+        
+        training_data: dict listesi, DataFrame ya da CSV / Parquet dosya yolu. Veri chunk
+        chunk okunur: scaler tüm satırlarla partial_fit edilir, IsolationForest (ağaç başına
+        zaten en fazla 256 örnek kullanır) satırların sample_size'lık düzgün örneklemiyle
+        eğitilir - bellek kullanımı veri boyutundan bağımsız kalır. Dosyada satırlar kovan
+        içinde zaman sıralı olmalı (trend pencereleri chunk'lar arasında taşınır).
+        n_jobs: IsolationForest fit'i için thread sayısı (retrain_fleet süreç başına ayarlar).
+        """
+        # Bellek sadece veri okuma / feature çıkarımı boyunca izlenir (veri boyutuyla büyüyebilecek
+        # kısım); sklearn import'u ve fit tracemalloc altında ~10 kat yavaşlıyor, fit zaten
+        # sample_size ile sınırlı
+        model, scaler, pca = self._new_estimators(n_jobs)
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        
         try:
-            df = pd.DataFrame(training_data)
+            rng = np.random.default_rng(42)
+            sample = None
+            sample_keys = np.empty(0)
+            tails = {}
+            rows = 0
+            chunks = 0
+            
+            for chunk in self.iter_training_chunks(training_data, chunk_size):
+                if with_trends:
+                    features, tails = self.extract_features_batch(chunk, tails)
+                else:
+                    features = self.feature_matrix(chunk)
+                if not len(features):
+                    continue
+                
+                scaler.partial_fit(features)
+                rows += len(features)
+                chunks += 1
+                
+                # Reservoir: en küçük sample_size rastgele anahtar = tüm satırlardan düzgün örnek
+                keys = rng.random(len(features))
+                if sample is not None:
+                    features = np.vstack([sample, features])
+                    keys = np.concatenate([sample_keys, keys])
+                if sample_size and len(features) > sample_size:
+                    keep = np.argpartition(keys, sample_size)[:sample_size]
+                    features, keys = features[keep], keys[keep]
+                sample, sample_keys = features, keys
             
-            # Features hazırla
-            features_list = []
-            for _, row in df.iterrows():
-                features = self.extract_features(row.to_dict())
-                features_list.append(features)
+            if not rows:
+                raise ValueError("No training data")
             
-            features_array = np.array(features_list)
+            reference = FeatureStats.from_matrix(sample, (self.feature_names + self.trend_feature_names)[:sample.shape[1]])
+            _, peak = tracemalloc.get_traced_memory()
+            if tracing:
+                tracemalloc.stop()
+                tracing = False
             
             # Scale features
-            scaled_features = self.scaler.fit_transform(features_array)
+            scaled_features = scaler.transform(sample)
             
             # PCA uygula (optional)
             if scaled_features.shape[1] > 4:
-                scaled_features = self.pca.fit_transform(scaled_features)
+                scaled_features = pca.fit_transform(scaled_features)
             
             # Model eğit
-            self.model.fit(scaled_features)
+            model.fit(scaled_features)
+            model.n_jobs = None  # Skorlama tek okuma / küçük batch: thread havuzu açmasın
+            self._model, self._scaler, self._pca = model, scaler, pca
+            self._estimators_ready = True
+            self.n_features = sample.shape[1]
+            self.reference_stats = reference.to_dict()
             self.is_trained = True
+            self.compile()
+            self.start_drift_monitor()
+            
+            elapsed = time.perf_counter() - started
+            self.training_info = {
+                "samples": rows,
+                "fit_samples": len(sample),
+                "chunks": chunks,
+                "feature_count": sample.shape[1],
+                "training_seconds": round(elapsed, 3),
+                "peak_memory_mb": round(peak / 1e6, 1),
+                "trained_at": datetime.now().isoformat()
+            }
             
             # Model kaydet
             self.save_model()
             
             return {
                 "success": True,
-                "message": f"Model trained with {len(training_data)} samples",
-                "feature_count": features_array.shape[1]
+                "message": f"Model trained with {rows} samples",
+                **self.training_info
             }
             
         except Exception as e:
@@ -238,31 +604,148 @@ class AnomalyDetector:
                 "success": False,
                 "error": str(e)
             }
+        finally:
+            if tracing:
+                tracemalloc.stop()
+    
+    def iter_training_chunks(self, training_data, chunk_size):
+        """Eğitim verisini DataFrame chunk'ları olarak ver"""
+        import pandas as pd
+        
+        if isinstance(training_data, (str, os.PathLike)):
+            path = os.fspath(training_data)
+            if path.endswith(('.parquet', '.pq')):
+                import pyarrow.parquet as pq  # Sadece Parquet okurken gerekli
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+                    yield batch.to_pandas()
+            else:
+                yield from pd.read_csv(path, chunksize=chunk_size)
+            return
+        
+        df = training_data if isinstance(training_data, pd.DataFrame) else pd.DataFrame(list(training_data))
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    
+    def compile(self):
+        """Scaler + PCA + forest'ı düz NumPy array'lerine derle - başarısızsa sklearn kullanılır"""
+        try:
+            self.compiled = CompiledForest.from_detector(self)
+        except Exception as e:
+            print(f"Forest could not be compiled, using sklearn: {str(e)}", file=sys.stderr)
+            self.compiled = None
+        return self.compiled
     
     def save_model(self):
-        """Model ve scaler'ı kaydet"""
+        """Model ve scaler'ı kaydet (+ derlenmiş forest'ı mmap'lenebilir dizin olarak)"""
+        import joblib
+        
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
-            'pca': self.pca if hasattr(self, 'pca') else None,
+            'pca': self.pca,
             'is_trained': self.is_trained,
-            'feature_names': self.feature_names
+            'feature_names': self.feature_names,
+            'training_info': getattr(self, 'training_info', None),
+            'reference_stats': self.reference_stats
         }
-        joblib.dump(model_data, self.model_path)
+        joblib.dump(model_data, self.model_path)  # Sıkıştırmasız: array'ler mmap_mode ile açılabilir
+        if self.compiled is not None:
+            self.save_compiled()
+    
+    def compiled_path(self):
+        """Derlenmiş forest dizini - artifact'ın yanında"""
+        return self.model_path + '.forest'
+    
+    def _artifact_signature(self):
+        st = os.stat(self.model_path)
+        return [st.st_mtime_ns, st.st_size]
+    
+    def save_compiled(self, path=None):
+        """Derlenmiş forest'ı ve skorlama için gereken meta veriyi yaz - hata olursa sadece uyar"""
+        try:
+            self.compiled.save(path or self.compiled_path(), extra={
+                'source': self._artifact_signature(),
+                'feature_names': self.feature_names,
+                'training_info': getattr(self, 'training_info', None),
+                'reference_stats': self.reference_stats
+            })
+        except Exception as e:
+            print(f"Compiled forest could not be saved: {str(e)}", file=sys.stderr)
     
     def load_model(self):
-        """Kaydedilmiş modeli yükle"""
+        """Kaydedilmiş modeli yükle
+        
+        Artifact'la aynı versiyonda derlenmiş forest dizini varsa sadece o açılır (mmap,
+        sklearn import edilmez); sklearn nesneleri ilk erişimde yüklenir. Yoksa artifact
+        tamamen yüklenir, derlenir ve dizin sonraki başlangıçlar için yazılır.
+        """
         try:
-            model_data = joblib.load(self.model_path)
-            self.model = model_data['model']
-            self.scaler = model_data['scaler']
-            self.pca = model_data.get('pca')
-            self.is_trained = model_data['is_trained']
-            self.feature_names = model_data.get('feature_names', self.feature_names)
+            if self._load_compiled():
+                self.start_drift_monitor()
+                print(f"Model loaded successfully from {self.model_path}")
+                return
+            self._load_artifact()
+            self._estimators_ready = True
+            if self.is_trained and self.compile() is not None:
+                self.save_compiled()
+            self.start_drift_monitor()
             print(f"Model loaded successfully from {self.model_path}")
         except Exception as e:
             print(f"Error loading model: {str(e)}")
             self.is_trained = False
+    
+    def _load_compiled(self):
+        path = self.compiled_path()
+        if not os.path.isdir(path):
+            return False
+        try:
+            compiled = CompiledForest.load(path, mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return False
+        if compiled.extra.get('source') != self._artifact_signature():
+            return False  # Artifact sonradan değişmiş - yeniden derlenecek
+        self.compiled = compiled
+        self.n_features = compiled.n_features
+        self.feature_names = compiled.extra.get('feature_names', self.feature_names)
+        self.training_info = compiled.extra.get('training_info')
+        self.reference_stats = compiled.extra.get('reference_stats')
+        self.is_trained = True
+        return True
+    
+    def start_drift_monitor(self, queue=None):
+        """Referans istatistikleri varsa kovan bazında drift izlemeyi başlat (eski artifact'larda yok)
+        
+        Varsayılan kuyruk modele bağlıdır (drift_monitor.queue_path): registry kökü ya da artifact'ın dizini.
+        """
+        self.drift = None
+        if self.is_trained and self.reference_stats:
+            self.drift = DriftMonitor(self.reference_stats, queue=queue or RetrainQueue(queue_path(self.model_path)))
+        return self.drift
+    
+    def _load_artifact(self):
+        import joblib
+        
+        model_data = joblib.load(self.model_path, mmap_mode='r')
+        self._model = model_data['model']
+        self._scaler = model_data['scaler']
+        self._pca = model_data.get('pca')
+        self.is_trained = model_data['is_trained']
+        self.feature_names = model_data.get('feature_names', self.feature_names)
+        self.training_info = model_data.get('training_info')
+        self.reference_stats = model_data.get('reference_stats')
+        self.n_features = getattr(self._scaler, 'n_features_in_', None)
+
+def score_request(detector, input_data):
+    """CLI / daemon isteğini cevapla: {"sensorData": {...}, "historicalData": [...], "hiveId": ...}"""
+    # Ana sensör verisi
+    sensor_data = input_data.get('sensorData', {})
+    
+    # Historical data (opsiyonel) - yoksa daemon hiveId'nin streaming penceresini kullanır
+    historical_data = input_data.get('historicalData', [])
+    hive_id = input_data.get('hiveId')
+    
+    # Anomaly detection yap
+    return detector.detect_anomalies(sensor_data, historical_data, hive_id)
 
 def main():
     """Command line interface"""
@@ -270,19 +753,18 @@ def main():
         print(json.dumps({"error": "No input data provided"}))
         return
     
+    if sys.argv[1] == '--serve':
+        # Daemon modu: model bir kez yüklenir, istekler NDJSON ile cevaplanır
+        from scoring_server import serve
+        serve(sys.argv[1:], AnomalyDetector, score_request, 'anomaly_model.joblib', 8765, 'anomaly')
+        return
+    
     try:
         input_data = json.loads(sys.argv[1])
         
         detector = AnomalyDetector()
         
-        # Ana sensör verisi
-        sensor_data = input_data.get('sensorData', {})
-        
-        # Historical data (opsiyonel)
-        historical_data = input_data.get('historicalData', [])
-        
-        # Anomaly detection yap
-        result = detector.detect_anomalies(sensor_data, historical_data)
+        result = score_request(detector, input_data)
         
         print(json.dumps(result))
         
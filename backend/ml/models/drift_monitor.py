@@ -0,0 +1,343 @@
+"""
+Feature drift izleme - modelin eğitim dağılımı ile gelen okumaların karşılaştırılması
+
+Eğitimde her feature için referans istatistikleri artifact'a kaydedilir: sayı, toplam,
+kareler toplamı ve eğitim dağılımının ondalık (decile) sınırlarında histogram. Skorlayıcı
+aynı sınırlarla kovan başına canlı istatistik tutar (okuma başına feature başına bir
+bisect + iki toplama). Tüm alanlar toplanabilir olduğu için istatistikler merge edilebilir:
+chunk'lar, pencereler, daemon'lar ya da kovanlar birleştirilebilir.
+
+Drift skoru feature'lar üzerinden en yüksek PSI'dır (Population Stability Index):
+
+    PSI = Σ (canlı_oran - referans_oran) * ln(canlı_oran / referans_oran)
+
+< 0.1 değişim yok, 0.1-0.25 hafif, > 0.25 belirgin kayma (DRIFT_THRESHOLD). PSI kısa
+bir pencerede eğitim aralığının içinde daralan seriyi de (ör. yavaş değişen ağırlık) kayma
+sayar; model için zararsız olduğundan bir feature ancak ortalaması en az DRIFT_MIN_SHIFT
+referans std kaydıysa ya da std'si DRIFT_STD_RATIO katına çıktıysa drift'li sayılır. Canlı
+istatistikler iki dönen pencerede tutulur (son DRIFT_WINDOW okuma + bir önceki), yani skor
+eski normal okumalarla seyrelmez. Eşiği geçen kovan retrain kuyruğuna yazılır;
+retrain_fleet.py --queue sadece bu kovanları eğitir.
+
+Kuyruk dosyası çalışma dizinine değil modele bağlıdır (queue_path): registry artifact'ları
+için <registry>/retrain_queue.json, tek artifact için artifact'ın yanı. Böylece daemon,
+coordinator ön taraması ve retrain_fleet aynı dosyayı görür. Okuma-değiştirme-yazma
+süreçler arası dosya kilidiyle (fcntl / Windows'ta msvcrt) yapılır.
+
+    python drift_monitor.py list --registry registry
+    python drift_monitor.py clear --queue retrain_queue.json --hive 107   # tek artifact: artifact'ın dizininde
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from model_registry import registry_root
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DRIFT_THRESHOLD = 0.25
+DRIFT_MIN_SHIFT = 1.0
+DRIFT_STD_RATIO = 2.0
+DRIFT_MIN_SAMPLES = 1000        # ~1 hafta (10 dk aralık) - kısa dilimler yavaş seride yanıltıcı
+DRIFT_WINDOW = 2000
+DRIFT_CHECK_EVERY = 250
+DRIFT_QUEUE = 'retrain_queue.json'
+QUANTILES = np.linspace(0.1, 0.9, 9)
+_MIN_PROPORTION = 1e-4
+
+
+class FeatureStats:
+    """Feature başına toplanabilir özet: count, sum, sumsq + sabit sınırlı histogram"""
+
+    def __init__(self, names, edges):
+        self.names = list(names)
+        self.edges = [list(map(float, e)) for e in edges]   # feature başına iç sınırlar (artan)
+        self.count = 0
+        self.sum = [0.0] * len(self.names)
+        self.sumsq = [0.0] * len(self.names)
+        self.hist = [[0] * (len(e) + 1) for e in self.edges]
+
+    @classmethod
+    def from_matrix(cls, X, names):
+        """Eğitim matrisinden referans - sınırlar X'in ondalık değerleri"""
+        X = np.asarray(X, dtype=float)
+        edges = [np.unique(np.quantile(X[:, j], QUANTILES)) for j in range(X.shape[1])]
+        stats = cls(names, edges)
+        stats.update_matrix(X)
+        return stats
+
+    def empty(self):
+        """Aynı sınırlarla boş istatistik (canlı pencere)"""
+        return FeatureStats(self.names, self.edges)
+
+    def add(self, values):
+        """Tek okuma (feature sırasıyla) - O(feature sayısı × log bin)"""
+        self.count += 1
+        for j, value in enumerate(values[:len(self.names)]):
+            value = float(value)
+            self.sum[j] += value
+            self.sumsq[j] += value * value
+            self.hist[j][bisect_right(self.edges[j], value)] += 1
+
+    def update_matrix(self, X):
+        X = np.asarray(X, dtype=float)[:, :len(self.names)]
+        self.count += len(X)
+        for j in range(X.shape[1]):
+            self.sum[j] += float(X[:, j].sum())
+            self.sumsq[j] += float((X[:, j] ** 2).sum())
+            counts = np.bincount(np.searchsorted(self.edges[j], X[:, j], side='right'),
+                                 minlength=len(self.edges[j]) + 1)
+            self.hist[j] = [a + int(b) for a, b in zip(self.hist[j], counts)]
+
+    def merge(self, other):
+        """Başka bir istatistiği bu nesneye ekle (sınırlar aynı olmalı) - self döner"""
+        if other.edges != self.edges:
+            raise ValueError("FeatureStats sınırları farklı, merge edilemez")
+        self.count += other.count
+        self.sum = [a + b for a, b in zip(self.sum, other.sum)]
+        self.sumsq = [a + b for a, b in zip(self.sumsq, other.sumsq)]
+        self.hist = [[a + b for a, b in zip(h, g)] for h, g in zip(self.hist, other.hist)]
+        return self
+
+    def mean(self, j):
+        return self.sum[j] / self.count if self.count else 0.0
+
+    def std(self, j):
+        if not self.count:
+            return 0.0
+        mean = self.mean(j)
+        return math.sqrt(max(self.sumsq[j] / self.count - mean * mean, 0.0))
+
+    def psi(self, reference, j):
+        total, ref_total = sum(self.hist[j]), sum(reference.hist[j])
+        if not total or not ref_total:
+            return 0.0
+        score = 0.0
+        for live, ref in zip(self.hist[j], reference.hist[j]):
+            p = max(live / total, _MIN_PROPORTION)
+            q = max(ref / ref_total, _MIN_PROPORTION)
+            score += (p - q) * math.log(p / q)
+        return score
+
+    def compare(self, reference, threshold=DRIFT_THRESHOLD):
+        """Referansa göre drift - {'score', 'count', 'drifted': [ad, ...], 'features': {ad: {...}}}"""
+        features = {}
+        drifted = []
+        for j, name in enumerate(self.names):
+            ref_std = reference.std(j)
+            psi = self.psi(reference, j)
+            mean_shift = (self.mean(j) - reference.mean(j)) / (ref_std or 1.0)  # referans std cinsinden
+            std_ratio = self.std(j) / ref_std if ref_std else 1.0
+            features[name] = {
+                "psi": round(psi, 4),
+                "mean_shift": round(mean_shift, 3),
+                "std_ratio": round(std_ratio, 3)
+            }
+            if psi >= threshold and (abs(mean_shift) >= DRIFT_MIN_SHIFT or std_ratio >= DRIFT_STD_RATIO):
+                drifted.append(name)
+        return {
+            "score": max((f["psi"] for f in features.values()), default=0.0),
+            "count": self.count,
+            "drifted": drifted,
+            "features": features
+        }
+
+    def to_dict(self):
+        return {
+            "names": self.names,
+            "edges": self.edges,
+            "count": self.count,
+            "sum": self.sum,
+            "sumsq": self.sumsq,
+            "hist": self.hist
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data["names"], data["edges"])
+        stats.count = data["count"]
+        stats.sum = list(data["sum"])
+        stats.sumsq = list(data["sumsq"])
+        stats.hist = [list(h) for h in data["hist"]]
+        return stats
+
+
+def queue_path(model_path=None, registry=None):
+    """Modelin retrain kuyruğu - registry kökünde ya da artifact'ın yanında (çalışma dizininden bağımsız)"""
+    root = registry or (registry_root(model_path) if model_path else None)
+    if root is None and model_path:
+        root = os.path.dirname(os.path.abspath(model_path))
+    return os.path.abspath(os.path.join(root or '.', DRIFT_QUEUE))
+
+
+class RetrainQueue:
+    """Drift nedeniyle yeniden eğitilecek kovanlar - JSON dosyası, atomik yazım, süreçler arası kilit"""
+
+    def __init__(self, path=DRIFT_QUEUE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        # Daemon, coordinator ve retrain_fleet aynı dosyayı günceller - push/remove kaybolmasın
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path + '.lock', 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def pending(self):
+        """{hiveId: drift raporu}"""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def push(self, hive_id, report):
+        with self._locked():
+            queue = self.pending()
+            queue[str(hive_id)] = report
+            self._write(queue)
+
+    def remove(self, hive_ids):
+        with self._locked():
+            queue = self.pending()
+            for hive_id in hive_ids:
+                queue.pop(str(hive_id), None)
+            self._write(queue)
+
+    def _write(self, queue):
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(queue, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class DriftMonitor:
+    """Kovan başına canlı istatistik + eşik aşımında retrain kuyruğu
+
+    reference: eğitimde kaydedilen FeatureStats (ya da to_dict çıktısı)
+    queue: RetrainQueue, None ise sadece flagged'de tutulur
+    """
+
+    def __init__(self, reference, threshold=DRIFT_THRESHOLD, min_samples=DRIFT_MIN_SAMPLES,
+                 window=DRIFT_WINDOW, check_every=DRIFT_CHECK_EVERY, queue=None, max_hives=10000):
+        self.reference = reference if isinstance(reference, FeatureStats) else FeatureStats.from_dict(reference)
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.window = window
+        self.check_every = check_every
+        self.queue = queue
+        self.max_hives = max_hives
+        self.flagged = {}   # hive → son drift raporu
+        self._hives = {}    # hive → [önceki pencere, güncel pencere]; dict sırası = son okuma sırası
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hives)
+
+    def observe(self, hive_id, features):
+        """Okumanın feature'larını kovanın penceresine ekle - eşik ilk kez aşılırsa rapor döner"""
+        with self._lock:
+            windows = self._hives.pop(hive_id, None)
+            if windows is None:
+                windows = [None, self.reference.empty()]
+                if len(self._hives) >= self.max_hives:
+                    del self._hives[next(iter(self._hives))]
+            self._hives[hive_id] = windows
+
+            current = windows[1]
+            current.add(features)
+            if current.count >= self.window:
+                windows[0], windows[1] = current, self.reference.empty()
+            if current.count % self.check_every or hive_id in self.flagged:
+                return None
+            report = self._report(windows)
+            if report["count"] < self.min_samples or not report["drifted"]:
+                return None
+            report.update(hive=hive_id, flagged_at=datetime.now().isoformat())
+            self.flagged[hive_id] = report
+
+        if self.queue is not None:
+            try:
+                self.queue.push(hive_id, report)
+            except OSError as e:
+                print(f"Retrain queue could not be written: {str(e)}", file=sys.stderr)
+        return report
+
+    def _report(self, windows):
+        live = self.reference.empty()
+        for window in windows:
+            if window is not None:
+                live.merge(window)
+        return live.compare(self.reference, self.threshold)
+
+    def report(self, hive_id):
+        """Kovanın güncel drift raporu - hiç okuma yoksa None"""
+        with self._lock:
+            windows = self._hives.get(hive_id)
+            return self._report(windows) if windows else None
+
+    def summary(self):
+        """Tüm kovanlar: {'threshold', 'min_samples', 'hives': {hive: {'score', 'count'}}, 'flagged': [...]}
+
+        count < min_samples olan kovanların skoru henüz anlamlı değildir.
+        """
+        with self._lock:
+            scores = {}
+            for hive, windows in self._hives.items():
+                report = self._report(windows)
+                scores[str(hive)] = {"score": report["score"], "count": report["count"]}
+            flagged = [str(hive) for hive in self.flagged]
+        return {"threshold": self.threshold, "min_samples": self.min_samples, "hives": scores, "flagged": flagged}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drift retrain kuyruğu")
+    parser.add_argument('command', choices=('list', 'clear'))
+    parser.add_argument('--queue', help="Kuyruk dosyası (varsayılan: <registry>/retrain_queue.json)")
+    parser.add_argument('--registry', help="model_registry kök dizini - kuyruk bu dizinde")
+    parser.add_argument('--hive', action='append', help="clear: sadece bu kovan(lar) (varsayılan: hepsi)")
+    args = parser.parse_args()
+
+    queue = RetrainQueue(args.queue or queue_path(registry=args.registry or '.'))
+    pending = queue.pending()
+    if args.command == 'clear':
+        queue.remove(args.hive or list(pending))
+        print(f"🧹 {len(args.hive or pending)} kovan kuyruktan çıkarıldı")
+        return
+    for hive_id, report in sorted(pending.items()):
+        details = ", ".join(f"{name} PSI {report['features'][name]['psi']:.2f} / {report['features'][name]['mean_shift']:+.1f}σ"
+                            for name in report["drifted"])
+        print(f"⚠️ {hive_id}: {details} ({report['count']} okuma, {report['flagged_at']})")
+    if not pending:
+        print("✅ Kuyruk boş")
+
+
+if __name__ == "__main__":
+    main()
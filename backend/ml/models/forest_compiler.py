@@ -0,0 +1,275 @@
+"""
+Isolation Forest derleyici - scaler + PCA + ağaçlar düz NumPy array'lerine çevrilir
+
+sklearn decision_function tek okuma için bile input doğrulama, joblib dispatch ve
+ağaç başına Python döngüsü yapar. Derlenmiş forest'ta tüm ağaçların node'ları tek
+array'lerde durur (feature, threshold, left, right, leaf_depth) ve bir okuma tüm
+ağaçlarda aynı anda, en fazla max_depth vektör adımıyla yaprağa iner:
+
+    node = roots
+    tekrar max_depth kez: node = where(x[feature[node]] <= threshold[node], left[node], right[node])
+    depth = leaf_depth[node].sum()          # yaprak derinliği + c(yapraktaki örnek sayısı)
+
+Yapraklar kendilerine döner (left = right = kendisi), böylece erken biten dallar için
+ayrı kontrol gerekmez. Skorlar sklearn ile aynıdır (ağaçlar gibi float32 karşılaştırma).
+
+Derlenmiş forest bir dizine kaydedilir (array başına bir .npy + meta.json). Dizin
+np.load(mmap_mode='r') ile açılır: sayfalar ilk erişimde diskten gelir, aynı artifact'ı
+açan daemon / worker süreçleri page cache'i paylaşır ve yükleme için sklearn gerekmez.
+
+    python forest_compiler.py anomaly_model.joblib              # <model>.forest export + parity + benchmark
+    python forest_compiler.py anomaly_model.joblib --output x.forest --samples 2000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+
+def average_path_length(n_samples):
+    """sklearn _average_path_length: n örnekli bir iTree'de ortalama yol uzunluğu c(n)"""
+    n = np.asarray(n_samples, dtype=float)
+    result = np.zeros(n.shape)
+    inner = n > 2
+    result[n == 2] = 1.0
+    result[inner] = 2.0 * (np.log(n[inner] - 1.0) + np.euler_gamma) - 2.0 * (n[inner] - 1.0) / n[inner]
+    return result
+
+
+class CompiledForest:
+    """Derlenmiş scaler + PCA + Isolation Forest - decision_function sklearn ile aynı"""
+
+    ARRAYS = ('scaler_mean', 'scaler_scale', 'pca_mean', 'pca_components', 'roots',
+              'feature', 'threshold', 'left', 'right', 'leaf_depth')
+
+    def __init__(self, arrays, max_depth, denominator, offset, n_features, extra=None):
+        for name in self.ARRAYS:
+            value = arrays.get(name)
+            # np.memmap alt sınıfı her indekslemede ek iş yapar - mmap'li düz ndarray view'ı tut
+            setattr(self, name, None if value is None else np.asarray(value))
+        self.max_depth = int(max_depth)
+        self.denominator = float(denominator)   # ağaç sayısı * c(max_samples)
+        self.offset = float(offset)             # IsolationForest.offset_
+        self.n_features = int(n_features)
+        self.extra = dict(extra or {})          # Kaydedenin ek meta verisi (ör. kaynak artifact)
+
+    @classmethod
+    def from_detector(cls, detector):
+        """AnomalyDetector'ın (model, scaler, pca) üçlüsünü derle"""
+        pca = detector.pca if getattr(detector.pca, 'components_', None) is not None else None
+        return cls.from_estimators(detector.model, detector.scaler, pca)
+
+    @classmethod
+    def from_estimators(cls, forest, scaler=None, pca=None):
+        arrays = {}
+        n_features = forest.n_features_in_
+        if scaler is not None:
+            n_features = scaler.n_features_in_
+            arrays['scaler_mean'] = getattr(scaler, 'mean_', None)
+            arrays['scaler_scale'] = getattr(scaler, 'scale_', None)
+        if pca is not None:
+            components = pca.components_
+            if pca.whiten:
+                components = components / np.sqrt(pca.explained_variance_)[:, None]
+            arrays['pca_mean'] = pca.mean_
+            arrays['pca_components'] = np.ascontiguousarray(components.T)
+
+        roots, feature, threshold, left, right, leaf_depth = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator, features in zip(forest.estimators_, forest.estimators_features_):
+            tree = estimator.tree_
+            count = tree.node_count
+            is_leaf = tree.children_left == -1
+
+            # Node derinlikleri: sklearn çocukları her zaman ebeveynden sonra numaralar
+            depth = np.zeros(count)
+            for node in range(count):
+                if not is_leaf[node]:
+                    depth[tree.children_left[node]] = depth[node] + 1
+                    depth[tree.children_right[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth.max()))
+
+            own = np.arange(count) + offset
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, np.asarray(features)[np.maximum(tree.feature, 0)]))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+            leaf_depth.append(np.where(is_leaf, depth + average_path_length(tree.n_node_samples), 0.0))
+            offset += count
+
+        arrays.update({
+            'roots': np.asarray(roots, dtype=np.intp),
+            'feature': np.concatenate(feature).astype(np.intp),
+            'threshold': np.concatenate(threshold).astype(np.float64),
+            'left': np.concatenate(left).astype(np.intp),
+            'right': np.concatenate(right).astype(np.intp),
+            'leaf_depth': np.concatenate(leaf_depth)
+        })
+        denominator = len(forest.estimators_) * average_path_length([forest.max_samples_])[0]
+        return cls(arrays, max_depth, denominator, forest.offset_, n_features)
+
+    @property
+    def nbytes(self):
+        """Array'lerin toplam boyutu (mmap'li olsa da skorlama sayfaları okur)"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS if getattr(self, name) is not None)
+
+    def transform(self, X):
+        """Scaler + PCA - (n, n_features) → forest girdisi"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.scaler_mean is not None:
+            X = X - self.scaler_mean
+        if self.scaler_scale is not None:
+            X = X / self.scaler_scale
+        if self.pca_components is not None:
+            X = (X - self.pca_mean) @ self.pca_components
+        return X
+
+    def decision_function(self, X):
+        """IsolationForest.decision_function ile aynı - negatif: anomali"""
+        # sklearn ağaçları float32 girdiyle karşılaştırır; aynı kararlar için aynı yuvarlama
+        Z = self.transform(X).astype(np.float32)
+        if len(Z) == 1:
+            # Tek okuma: 2-D indeksleme yerine 1-D gather (gerçek zamanlı yol)
+            z = Z[0]
+            node = self.roots
+            for _ in range(self.max_depth):
+                node = np.where(z[self.feature[node]] <= self.threshold[node], self.left[node], self.right[node])
+            return np.array([-(2.0 ** (-self.leaf_depth[node].sum() / self.denominator)) - self.offset])
+
+        rows = np.arange(len(Z))[:, None]
+        node = np.broadcast_to(self.roots, (len(Z), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = Z[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        depths = self.leaf_depth[node].sum(axis=1)
+        return -(2.0 ** (-depths / self.denominator)) - self.offset
+
+    def save(self, path, extra=None):
+        """Dizine kaydet - önce geçici dizine yazılır, sonra yer değiştirilir (yarım dizin görülmez)"""
+        if extra is not None:
+            self.extra = dict(extra)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        arrays = [name for name in self.ARRAYS if getattr(self, name) is not None]
+        for name in arrays:
+            np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            'max_depth': self.max_depth,
+            'denominator': self.denominator,
+            'offset': self.offset,
+            'n_features': self.n_features,
+            'arrays': arrays,
+            'extra': self.extra
+        }
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Dizinden yükle - mmap_mode=None: array'leri belleğe kopyala"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                  for name in meta['arrays']}
+        return cls(arrays, meta['max_depth'], meta['denominator'], meta['offset'],
+                   meta['n_features'], meta.get('extra'))
+
+
+def _sklearn_decision(detector, X):
+    scaled = detector.scaler.transform(X)
+    if getattr(detector.pca, 'components_', None) is not None:
+        scaled = detector.pca.transform(scaled)
+    return detector.model.decision_function(scaled)
+
+
+def sample_inputs(detector, n, seed=0):
+    """Scaler istatistiklerinden (eğitim dağılımı etrafında) rastgele girdiler"""
+    rng = np.random.default_rng(seed)
+    mean = detector.scaler.mean_
+    scale = detector.scaler.scale_
+    # Dağılımın dışına taşan okumalar da olsun (anomali kararları da karşılaştırılsın)
+    return mean + scale * rng.standard_normal((n, len(mean))) * rng.choice([1.0, 4.0], size=(n, 1))
+
+
+def check_parity(detector, compiled, X):
+    """Derlenmiş ve sklearn skorlarını karşılaştır - {'max_abs_diff', 'decisions_equal', 'n'}"""
+    expected = _sklearn_decision(detector, X)
+    actual = compiled.decision_function(X)
+    return {
+        "n": len(X),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))) if len(X) else 0.0,
+        "decisions_equal": bool(np.array_equal(expected < 0, actual < 0))
+    }
+
+
+def benchmark(detector, compiled, X, repeat=200):
+    """Tek okuma ve batch gecikmesi (ms) - sklearn vs derlenmiş"""
+    def per_call(fn, rows, count):
+        started = time.perf_counter()
+        for i in range(count):
+            fn(rows[i % len(rows)])
+        return (time.perf_counter() - started) / count * 1000
+
+    singles = [row.reshape(1, -1) for row in X[:repeat]]
+    result = {
+        "single_sklearn_ms": per_call(lambda row: _sklearn_decision(detector, row), singles, repeat),
+        "single_compiled_ms": per_call(compiled.decision_function, singles, repeat)
+    }
+    result["batch_sklearn_ms"] = per_call(lambda rows: _sklearn_decision(detector, rows), [X], 3)
+    result["batch_compiled_ms"] = per_call(compiled.decision_function, [X], 3)
+    result["batch_size"] = len(X)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Isolation Forest modelini NumPy array'lerine derle")
+    parser.add_argument('model', nargs='?', default='anomaly_model.joblib', help="AnomalyDetector artifact'ı")
+    parser.add_argument('--output', help="Derlenmiş forest dizini (varsayılan: <model>.forest)")
+    parser.add_argument('--samples', type=int, default=5000, help="Parity / benchmark örnek sayısı")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from anomaly_detector import AnomalyDetector
+
+    detector = AnomalyDetector(args.model)
+    if not detector.is_trained:
+        print(f"❌ Eğitilmiş model bulunamadı: {args.model}")
+        sys.exit(1)
+
+    compiled = CompiledForest.from_detector(detector)
+    output = args.output or detector.compiled_path()
+    if output == detector.compiled_path():
+        detector.compiled = compiled
+        detector.save_compiled()  # Kaynak imzasıyla - AnomalyDetector başlangıçta bunu kullanır
+    else:
+        compiled.save(output)
+    print(f"✅ Derlendi: {output} ({compiled.left.size} node, {compiled.roots.size} ağaç, max derinlik {compiled.max_depth})")
+
+    X = sample_inputs(detector, args.samples)
+    parity = check_parity(detector, compiled, X)
+    print(f"🔍 Parity: {parity['n']} örnek, max fark {parity['max_abs_diff']:.2e}, "
+          f"kararlar {'aynı' if parity['decisions_equal'] else 'FARKLI'}")
+
+    bench = benchmark(detector, compiled, X)
+    print(f"⏱️ Tek okuma: sklearn {bench['single_sklearn_ms']:.3f} ms, derlenmiş {bench['single_compiled_ms']:.3f} ms "
+          f"({bench['single_sklearn_ms'] / bench['single_compiled_ms']:.0f}x)")
+    print(f"⏱️ Batch ({bench['batch_size']}): sklearn {bench['batch_sklearn_ms']:.1f} ms, "
+          f"derlenmiş {bench['batch_compiled_ms']:.1f} ms")
+    if parity['max_abs_diff'] > 1e-9 or not parity['decisions_equal']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
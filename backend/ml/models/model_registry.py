@@ -0,0 +1,346 @@
+"""
+Kovan bazında model registry - versiyonlu artifact'lar + bellek bütçeli LRU cache
+
+Dizin yapısı (kind: 'anomaly' ya da 'trend'):
+
+    <root>/<kind>/global/v0001.joblib
+    <root>/<kind>/apiary/<apiaryId>/v0003.joblib
+    <root>/<kind>/hive/<hiveId>/v0002.joblib
+
+Bir kovan için model şu sırayla çözülür: hive/<hiveId> → apiary/<apiaryId> → global →
+default_path (eski tek artifact, ör. anomaly_model.joblib). Her kapsamda en yüksek
+versiyon kullanılır; publish yeni versiyonu atomik olarak ekler (yarım dosya görülmez)
+ve en eski versiyonları keep sınırına kadar siler.
+
+Yüklenen modeller artifact yoluna göre LRU cache'te tutulur. Bellek kullanımı modelin
+memory_bytes()'ından alınır (AnomalyDetector: derlenmiş forest + yüklendiyse sklearn
+ağaçları; cache isabetinde yeniden ölçülür), yoksa artifact boyutuyla tahmin edilir;
+toplam memory_budget_mb'yi aşınca en uzun süre kullanılmayan modeller bırakılır.
+Çözümlemeler refresh_interval saniye cache'lenir - yeni versiyon en geç bu süre sonra devreye girer.
+
+Kovan anahtarlı akış durumu (streaming trend pencereleri, online baseline'lar) modelden
+bağımsızdır: tür başına tek nesne tüm modellere verilir, versiyon değişince ya da model
+bırakılınca kaybolmaz. Drift monitörü kapsam (artifact dizini) başına tutulur; referans
+dağılımı aynı kaldıkça (bırakılıp tekrar yüklenen model) pencereleri korunur, yeniden
+eğitimle referans değişince yeni pencerelerle başlar.
+
+    python model_registry.py list --root registry
+    python model_registry.py publish --root registry --kind anomaly --hive 107 anomaly_model.joblib
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+KINDS = ('anomaly', 'trend')
+SCOPES = ('hive', 'apiary', 'global')
+SHARED_STATE = ('stream_features', 'baselines')  # scoring_server.ModelHandle'ın taşıdığı durumlar
+
+_VERSION_RE = re.compile(r'^v(\d+)\.joblib$')
+
+
+def registry_root(path):
+    """Artifact registry içindeyse (<root>/<kind>/<kapsam>/.../vNNNN.joblib) registry kökü, değilse None"""
+    path = os.path.abspath(path)
+    if not _VERSION_RE.match(os.path.basename(path)):
+        return None
+    directory = os.path.dirname(path)
+    kind_dir, scope = os.path.split(directory)
+    if scope != 'global':
+        kind_dir, scope = os.path.split(kind_dir)
+        if scope not in SCOPES:
+            return None
+    if os.path.basename(kind_dir) not in KINDS:
+        return None
+    return os.path.dirname(kind_dir)
+
+
+def _safe_key(key):
+    """Kovan / arı bahçesi ID'sini dizin adı olarak güvenli hale getir"""
+    key = str(key)
+    if not key or key in ('.', '..') or re.search(r'[\\/:*?"<>|\x00]', key):
+        raise ValueError(f"Geçersiz registry anahtarı: {key!r}")
+    return key
+
+
+class ModelRegistry:
+    """Versiyonlu artifact deposu + LRU model cache"""
+
+    def __init__(self, root, loaders, memory_budget_mb=512, refresh_interval=30.0, default_paths=None, keep=5):
+        """
+        loaders: {kind: artifact yolundan model oluşturan fonksiyon}, ör. {'anomaly': AnomalyDetector}
+        default_paths: {kind: registry'de hiç model yoksa kullanılacak eski artifact yolu}
+        """
+        self.root = root
+        self.loaders = dict(loaders)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.refresh_interval = refresh_interval
+        self.default_paths = dict(default_paths or {})
+        self.keep = keep
+
+        self._cache = OrderedDict()     # artifact yolu → (model, tahmini byte)
+        self._cache_bytes = 0
+        self._resolved = {}             # (kind, hive, apiary) → (artifact yolu, çözüm zamanı)
+        self._lock = threading.Lock()
+        self._loading = {}              # artifact yolu → Lock (aynı model iki kez yüklenmesin)
+        self._shared = {}               # (kind, özellik) → modellerin paylaştığı kovan durumu
+        self._drift = {}                # (kind, kapsam dizini) → DriftMonitor
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'evictions': 0,
+            'load_seconds': 0.0
+        }
+
+    # --- Artifact deposu ---
+
+    def scope_dir(self, kind, scope='global', key=None):
+        if kind not in KINDS:
+            raise ValueError(f"Bilinmeyen model türü: {kind}")
+        if scope == 'global':
+            return os.path.join(self.root, kind, 'global')
+        if scope not in SCOPES:
+            raise ValueError(f"Bilinmeyen kapsam: {scope}")
+        return os.path.join(self.root, kind, scope, _safe_key(key))
+
+    def versions(self, kind, scope='global', key=None):
+        """Kapsamdaki [(versiyon, yol), ...] - küçükten büyüğe, boş (rezerve) dosyalar hariç"""
+        directory = self.scope_dir(kind, scope, key)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            match = _VERSION_RE.match(name)
+            path = os.path.join(directory, name)
+            if match and os.path.getsize(path) > 0:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def latest(self, kind, scope='global', key=None):
+        versions = self.versions(kind, scope, key)
+        return versions[-1][1] if versions else None
+
+    def publish(self, kind, source, scope='global', key=None):
+        """Artifact'ı kapsamın yeni versiyonu olarak ekle - (versiyon, yol) döner
+
+        Dosya önce aynı dizinde geçici isimle yazılır, sonra os.replace ile versiyon adına
+        taşınır; versiyon adı O_EXCL ile rezerve edildiği için eşzamanlı publish'ler çakışmaz.
+        """
+        directory = self.scope_dir(kind, scope, key)
+        os.makedirs(directory, exist_ok=True)
+        tmp = os.path.join(directory, f".publish-{os.getpid()}-{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp)
+
+        version = max((v for v, _ in self._all_versions(directory)), default=0) + 1
+        while True:
+            target = os.path.join(directory, f"v{version:04d}.joblib")
+            try:
+                os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                version += 1
+        os.replace(tmp, target)
+
+        self._prune(directory)
+        with self._lock:
+            self._resolved.clear()
+        return version, target
+
+    def _all_versions(self, directory):
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [(int(m.group(1)), os.path.join(directory, n)) for n in names for m in [_VERSION_RE.match(n)] if m]
+
+    def _prune(self, directory):
+        if not self.keep:
+            return
+        versions = sorted(self._all_versions(directory))
+        for _, path in versions[:-self.keep]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Windows'ta açık dosya silinemeyebilir - sonraki publish'te tekrar denenir
+            shutil.rmtree(path + '.forest', ignore_errors=True)  # AnomalyDetector'ın derlenmiş forest'ı
+
+    def resolve(self, kind, hive_id=None, apiary_id=None):
+        """Kovan için kullanılacak artifact yolu - hive → apiary → global → default_path
+
+        Hiçbir kapsamda artifact yoksa ve default_path mevcut değilse None döner.
+        """
+        cache_key = (kind, hive_id, apiary_id)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._resolved.get(cache_key)
+            if cached and now - cached[1] < self.refresh_interval:
+                return cached[0]
+
+        path = None
+        if hive_id is not None:
+            path = self.latest(kind, 'hive', hive_id)
+        if path is None and apiary_id is not None:
+            path = self.latest(kind, 'apiary', apiary_id)
+        if path is None:
+            path = self.latest(kind, 'global')
+        if path is None:
+            default = self.default_paths.get(kind)
+            path = default if default and os.path.exists(default) else None
+
+        with self._lock:
+            self._resolved[cache_key] = (path, now)
+        return path
+
+    # --- Model cache ---
+
+    def get(self, kind, hive_id=None, apiary_id=None):
+        """Kovanın modeli (cache'ten ya da diskten) - hiç artifact yoksa FileNotFoundError"""
+        return self.load(kind, self.resolve(kind, hive_id, apiary_id))
+
+    def load(self, kind, path):
+        if path is None:
+            # loader(None) loader'ın kendi varsayılan yoluna (ör. CWD'deki anomaly_model.joblib) düşerdi
+            raise FileNotFoundError(f"Registry'de {kind} modeli yok: {self.root}")
+        cache_key = (kind, path)
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None:
+                self._cache.move_to_end(cache_key)
+                self.stats['hits'] += 1
+                self._resize(cache_key, entry)
+                return entry[0]
+            self.stats['misses'] += 1
+            load_lock = self._loading.setdefault(cache_key, threading.Lock())
+
+        with load_lock:
+            # Beklerken başka bir thread yüklemiş olabilir
+            with self._lock:
+                entry = self._cache.get(cache_key)
+                if entry is not None:
+                    self._cache.move_to_end(cache_key)
+                    return entry[0]
+
+            try:
+                started = time.perf_counter()
+                model = self.loaders[kind](path)
+                elapsed = time.perf_counter() - started
+                size = self._model_bytes(model, path)
+
+                with self._lock:
+                    self._adopt_state(kind, path, model)
+                    self._cache[cache_key] = (model, size)
+                    self._cache_bytes += size
+                    self.stats['loads'] += 1
+                    self.stats['load_seconds'] += elapsed
+                    self._evict()
+            finally:
+                # Loader hata verse de kilit girdisi kalmasın - sonraki istek tekrar dener
+                with self._lock:
+                    self._loading.pop(cache_key, None)
+            return model
+
+    def _model_bytes(self, model, path):
+        memory_bytes = getattr(model, 'memory_bytes', None)
+        if callable(memory_bytes):
+            return int(memory_bytes())
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _resize(self, cache_key, entry):
+        # sklearn nesneleri ilk ihtiyaçta yüklenir - model büyüdüyse bütçeye yansısın
+        size = self._model_bytes(entry[0], cache_key[1])
+        if size != entry[1]:
+            self._cache[cache_key] = (entry[0], size)
+            self._cache_bytes += size - entry[1]
+            self._evict()
+
+    def _adopt_state(self, kind, path, model):
+        """Yeni yüklenen modele registry'nin kovan durumunu ver (ModelHandle.reload'daki taşıma)"""
+        for name in SHARED_STATE:
+            if hasattr(model, name):
+                setattr(model, name, self._shared.setdefault((kind, name), getattr(model, name)))
+        monitor = getattr(model, 'drift', None)
+        if monitor is not None:
+            key = (kind, os.path.dirname(path))
+            previous = self._drift.get(key)
+            if previous is not None and previous.reference.to_dict() == monitor.reference.to_dict():
+                model.drift = previous
+            else:
+                self._drift[key] = monitor
+
+    def _evict(self):
+        # En son yüklenen model bütçeyi tek başına aşsa bile tutulur
+        while self._cache_bytes > self.memory_budget and len(self._cache) > 1:
+            _, (_, size) = self._cache.popitem(last=False)
+            self._cache_bytes -= size
+            self.stats['evictions'] += 1
+
+    def drift_monitors(self, kind=None):
+        """Kapsamların drift monitörleri - model cache'ten bırakılmış olsa da"""
+        with self._lock:
+            return [monitor for (k, _), monitor in self._drift.items() if kind in (None, k)]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._resolved.clear()
+
+    def cache_info(self):
+        with self._lock:
+            return {
+                'models': len(self._cache),
+                'bytes': self._cache_bytes,
+                'budget_bytes': self.memory_budget,
+                **self.stats
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BeeTwin model registry")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    listing = sub.add_parser('list', help="Kapsamları ve versiyonları listele")
+    listing.add_argument('--root', default='registry')
+
+    publish = sub.add_parser('publish', help="Artifact'ı yeni versiyon olarak ekle")
+    publish.add_argument('artifact')
+    publish.add_argument('--root', default='registry')
+    publish.add_argument('--kind', choices=KINDS, required=True)
+    group = publish.add_mutually_exclusive_group()
+    group.add_argument('--hive')
+    group.add_argument('--apiary')
+    publish.add_argument('--keep', type=int, default=5, help="Kapsam başına tutulacak versiyon sayısı")
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        registry = ModelRegistry(args.root, {}, keep=args.keep)
+        scope, key = ('hive', args.hive) if args.hive else ('apiary', args.apiary) if args.apiary else ('global', None)
+        version, path = registry.publish(args.kind, args.artifact, scope, key)
+        print(f"✅ {args.kind}/{scope}{'/' + key if key else ''} v{version}: {path}")
+        return
+
+    registry = ModelRegistry(args.root, {})
+    for kind in KINDS:
+        base = os.path.join(args.root, kind)
+        scopes = [('global', None)]
+        for scope in ('apiary', 'hive'):
+            try:
+                scopes += [(scope, key) for key in sorted(os.listdir(os.path.join(base, scope)))]
+            except FileNotFoundError:
+                pass
+        for scope, key in scopes:
+            versions = registry.versions(kind, scope, key)
+            if versions:
+                print(f"{kind}/{scope}{'/' + key if key else ''}: " + ", ".join(f"v{v}" for v, _ in versions))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
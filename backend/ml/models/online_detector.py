@@ -0,0 +1,293 @@
+"""
+Online anomaly detector - kovan/key başına EWMA baseline, okuma başına O(1) güncelleme
+
+Her kovan için her sensör key'inin üstel ağırlıklı ortalaması ve varyansı tutulur
+(half_life okuma sonra eski değerlerin ağırlığı yarıya iner). Okuma önce mevcut
+baseline'a göre skorlanır (z = |x - ortalama| / std), sonra baseline'a eklenir:
+
+    diff = clip(x - mean, ±CLIP_Z * std)     # sıçramalar baseline'ı sürüklemesin (Huber)
+    mean += alpha * diff
+    var = (1 - alpha) * (var + alpha * diff²)
+
+Kalıcı kaymalar (mevsim, kovan büyümesi) kırpılmış adımlarla baseline'a yine de girer,
+yani model yeniden eğitim olmadan uyum sağlar. Bellek kovan başına sabittir (key başına
+3 sayı); max_hives aşılınca en uzun süre okuma gelmeyen kovan silinir.
+
+Kovan başına son eklenen okumanın zaman damgası tutulur: aynı ya da daha eski damgalı
+okuma (ör. dashboard'un her analizde tekrar gönderdiği son kayıt) skorlanır ama baseline'a
+eklenmez. Yeni kovan historical_data ile başlatılırken güncel okuma ve sonrası atlanır.
+
+Baseline ısınana kadar (WARMUP_READINGS okuma) sonuç AnomalyDetector'dan gelir
+(eğitilmiş model ya da threshold). Sonuç şeması AnomalyDetector.detect_anomalies ile
+aynıdır; method 'online_ewma', ek olarak key başına z-skorları döner.
+
+    python online_detector.py --serve --port 8765          # anomaly daemon yerine (ML_ANOMALY_ONLINE=on)
+    python online_detector.py --replay fleet.csv            # CSV'yi akış olarak oynat, hız + anomali oranı
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from anomaly_detector import AnomalyDetector, GROUP_COLUMNS
+
+ONLINE_KEYS = ('temperature', 'humidity', 'weight', 'gasLevel')
+HALF_LIFE = 288          # okuma (5 dk aralıkla ~1 gün)
+WARMUP_READINGS = 30
+Z_THRESHOLD = 4.0
+CLIP_Z = 3.0
+# Sensör çözünürlüğü: sabit seride varyans sıfıra inip z patlamasın
+MIN_STD = {'temperature': 0.2, 'humidity': 1.0, 'weight': 0.05, 'gasLevel': 0.02}
+
+
+def _epoch(value):
+    """Zaman damgası (epoch saniye, ISO string, datetime) → epoch saniye - bilinmiyorsa None"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class EwmaBaseline:
+    """Tek bir seri için üstel ağırlıklı ortalama / varyans"""
+
+    __slots__ = ('alpha', 'min_std', 'mean', 'var', 'count')
+
+    def __init__(self, alpha, min_std=0.0):
+        self.alpha = alpha
+        self.min_std = min_std
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def std(self):
+        return max(math.sqrt(self.var), self.min_std)
+
+    def zscore(self, value):
+        """Değerin baseline'dan sapması (std cinsinden) - baseline boşsa 0.0"""
+        if not self.count:
+            return 0.0
+        return abs(value - self.mean) / self.std()
+
+    def update(self, value):
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            if self.count >= WARMUP_READINGS:
+                limit = CLIP_Z * self.std()
+                diff = min(max(diff, -limit), limit)
+            # Isınma boyunca daha hızlı öğren (kümülatif ortalama), sonra sabit alpha
+            alpha = max(self.alpha, 1.0 / (self.count + 1))
+            self.mean += alpha * diff
+            self.var = (1.0 - alpha) * (self.var + alpha * diff * diff)
+        self.count += 1
+
+
+class HiveBaselines:
+    """Kovan başına key baseline'ları - RollingFeatureEngine gibi sınırlı ve thread-safe"""
+
+    def __init__(self, keys=ONLINE_KEYS, half_life=HALF_LIFE, max_hives=10000):
+        self.keys = tuple(keys)
+        self.alpha = 1.0 - 0.5 ** (1.0 / half_life)
+        self.max_hives = max_hives
+        self._hives = {}  # hive → [baseline'lar, son eklenen okumanın epoch'u]; dict sırası = son okuma sırası
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._hives)
+
+    def __contains__(self, hive_id):
+        return hive_id in self._hives
+
+    def observe(self, hive_id, reading, historical_data=None, timestamp=None):
+        """Okumayı skorla ve baseline'a ekle - ({key: z}, ısındı mı) döner
+
+        timestamp verilmezse reading['timestamp'] kullanılır. Kovanın son eklenen okumasından
+        yeni olmayan okuma sadece skorlanır. Kovan ilk kez görülüyorsa baseline
+        historical_data ile başlatılır (güncel okuma hariç - o aşağıda bir kez eklenir).
+        """
+        ts = _epoch(reading.get('timestamp') if timestamp is None else timestamp)
+        with self._lock:
+            entry = self._hives.pop(hive_id, None)
+            if entry is None:
+                entry = [tuple(EwmaBaseline(self.alpha, MIN_STD.get(key, 0.0)) for key in self.keys), None]
+                if len(self._hives) >= self.max_hives:
+                    del self._hives[next(iter(self._hives))]
+                self._seed(entry, reading, ts, historical_data or [])
+            self._hives[hive_id] = entry
+            baselines, last_ts = entry
+
+            zscores = {}
+            counts = []
+            for key, baseline in zip(self.keys, baselines):
+                value = reading.get(key)
+                if value is not None and value == value:
+                    zscores[key] = baseline.zscore(float(value))
+                    counts.append(baseline.count)
+            if ts is not None and last_ts is not None and ts <= last_ts:
+                self.duplicates += 1
+            else:
+                self._update(baselines, reading)
+                if ts is not None:
+                    entry[1] = ts
+        return zscores, bool(counts) and min(counts) >= WARMUP_READINGS
+
+    def _seed(self, entry, reading, ts, historical_data):
+        if ts is None and historical_data and all(
+                historical_data[-1].get(key) == reading.get(key) for key in self.keys):
+            # Damgasız okuma geçmişin son kaydıyla aynı - kendisi sayılır, iki kez eklenmesin
+            historical_data = historical_data[:-1]
+        for record in historical_data:
+            record_ts = _epoch(record.get('timestamp'))
+            if ts is not None and record_ts is not None and record_ts >= ts:
+                continue
+            self._update(entry[0], record)
+            if record_ts is not None and (entry[1] is None or record_ts > entry[1]):
+                entry[1] = record_ts
+
+    def _update(self, baselines, reading):
+        for key, baseline in zip(self.keys, baselines):
+            value = reading.get(key)
+            if value is not None and value == value:
+                baseline.update(float(value))
+
+    def baseline(self, hive_id):
+        """Kovanın güncel baseline'ı - {key: {'mean', 'std', 'count'}}, kovan yoksa None"""
+        with self._lock:
+            entry = self._hives.get(hive_id)
+            if entry is None:
+                return None
+            return {
+                key: {"mean": b.mean, "std": b.std(), "count": b.count}
+                for key, b in zip(self.keys, entry[0])
+            }
+
+    def forget(self, hive_id):
+        with self._lock:
+            self._hives.pop(hive_id, None)
+
+
+class OnlineAnomalyDetector:
+    """Kovan başına EWMA baseline'larıyla artımlı anomaly detection
+
+    model_path: ısınma süresince kullanılacak AnomalyDetector artifact'ı (yoksa threshold)
+    """
+
+    def __init__(self, model_path=None, keys=ONLINE_KEYS, half_life=HALF_LIFE, max_hives=10000):
+        self.batch = AnomalyDetector(model_path)
+        self.baselines = HiveBaselines(keys, half_life, max_hives)
+        self.is_trained = True  # Her zaman skor üretir (ısınmada batch detector'a düşer)
+
+    @property
+    def keys(self):
+        return self.baselines.keys
+
+    @property
+    def feature_names(self):
+        # AnomalyDetector yerine kullanılabilsin (coordinator ön taraması)
+        return self.batch.feature_names
+
+    def expects_trends(self):
+        return self.batch.expects_trends()
+
+    def detect_anomalies(self, data, historical_data=None, hive_id=None, timestamp=None):
+        """Real-time anomaly detection - okumayı skorla, sonra kovanın baseline'ına ekle"""
+        try:
+            zscores, warm = self.baselines.observe(hive_id, data, historical_data, timestamp)
+            if not warm:
+                return self.batch.detect_anomalies(data, historical_data, hive_id)
+
+            z_max = max(zscores.values(), default=0.0)
+            anomaly_score = max(-1.0, min(1.0, 1.0 - z_max / Z_THRESHOLD))
+            # Mutlak sınırlar baseline ne olursa olsun geçerli (yavaş kayan arızalar)
+            limits = self.batch.threshold_based_detection(data)["anomalies"]
+            if limits:
+                anomaly_score = min(anomaly_score, -0.5)
+            is_anomaly = anomaly_score < 0
+            confidence = min(abs(anomaly_score), 1.0)
+
+            analysis = self.batch.get_anomaly_analysis(data, is_anomaly, confidence)
+            if is_anomaly:
+                analysis["details"] = [
+                    f"{key} deviates {z:.1f}σ from hive baseline"
+                    for key, z in zscores.items() if z > Z_THRESHOLD
+                ] + limits + analysis["details"]
+
+            return {
+                "anomaly_score": float(anomaly_score),
+                "is_anomaly": bool(is_anomaly),
+                "confidence": float(confidence),
+                "method": "online_ewma",
+                "feature_importance": {key: float(z / Z_THRESHOLD) for key, z in zscores.items()},
+                "zscores": {key: float(z) for key, z in zscores.items()},
+                "analysis": analysis
+            }
+
+        except Exception as e:
+            print(f"Error in online anomaly detection: {str(e)}", file=sys.stderr)
+            return self.batch.threshold_based_detection(data)
+
+
+def score_request(detector, input_data):
+    """CLI / daemon isteği - anomaly_detector.score_request ile aynı format"""
+    return detector.detect_anomalies(input_data.get('sensorData', {}), input_data.get('historicalData', []),
+                                     input_data.get('hiveId'), input_data.get('timestamp'))
+
+
+def replay(detector, path, limit=None):
+    """CSV'yi zaman sırasıyla akış olarak skorla - {'readings', 'anomalies', 'per_reading_us', 'hives'}"""
+    import pandas as pd
+
+    df = pd.read_csv(path, nrows=limit)
+    if 'timestamp' in df.columns:
+        df = df.sort_values('timestamp', kind='stable')
+    group_col = next((col for col in GROUP_COLUMNS if col in df.columns), None)
+    hives = df[group_col].tolist() if group_col else [None] * len(df)
+    records = df[[key for key in ('timestamp',) + detector.keys if key in df.columns]].to_dict('records')
+
+    anomalies = 0
+    started = time.perf_counter()
+    for hive_id, record in zip(hives, records):
+        anomalies += detector.detect_anomalies(record, hive_id=hive_id)["is_anomaly"]
+    elapsed = time.perf_counter() - started
+    return {
+        "readings": len(records),
+        "anomalies": anomalies,
+        "per_reading_us": elapsed / max(len(records), 1) * 1e6,
+        "hives": len(detector.baselines)
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        # AnomalyDetector daemon'ıyla aynı protokol; artifact değişince baseline'lar korunur
+        from scoring_server import serve
+        serve(sys.argv[1:], OnlineAnomalyDetector, score_request, 'anomaly_model.joblib', 8765, 'anomaly')
+        return
+
+    parser = argparse.ArgumentParser(description="Online (EWMA) anomaly detector")
+    parser.add_argument('--replay', required=True, help="hiveId/timestamp/sensör kolonlu CSV")
+    parser.add_argument('--model', default='anomaly_model.joblib', help="Isınma için AnomalyDetector artifact'ı")
+    parser.add_argument('--limit', type=int, help="Okunacak en fazla satır")
+    args = parser.parse_args()
+
+    result = replay(OnlineAnomalyDetector(args.model), args.replay, args.limit)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Filo geneli paralel yeniden eğitim - kovan başına AnomalyDetector, süreç havuzunda
+
+Girdi ya kovan başına geçmiş dosyalarından oluşan bir dizin (<hiveId>.csv / .parquet)
+ya da tüm kovanları içeren tek bir export'tur (hiveId kolonlu CSV). Export önce chunk
+chunk okunup kovan dosyalarına bölünür; bellek kullanımı export boyutundan bağımsızdır.
+
+Her kovan ayrı bir worker sürecinde eğitilir. Worker sayısı × estimator n_jobs çekirdek
+sayısını aşmaz (az kovan varsa her fit birden çok thread kullanır) ve worker'larda BLAS
+thread'leri 1'e sınırlanır - süreçler birbirinin çekirdeğini ezmez.
+
+Kovanın geçmişi zaman sırasına göre eğitim / doğrulama olarak ayrılır (son val_fraction).
+Model eğitim kısmıyla eğitilir, doğrulama kısmındaki anomali oranı ve ortalama skor
+raporlanır. Artifact model_registry'ye hive/<hiveId> kapsamının yeni versiyonu olarak
+atomik yazılır (daemon'lar refresh_interval içinde alır), derlenmiş forest da yanına.
+
+    python retrain_fleet.py histories/ --registry registry
+    python retrain_fleet.py export.csv --registry registry --workers 8 --report retrain_report.json
+    python retrain_fleet.py export.csv --registry registry --queue   # sadece drift'li kovanlar (<registry>/retrain_queue.json)
+
+TrendPredictor her istekte kendi modellerini fit ettiği için yeniden eğitilecek bir
+artifact'ı yoktur; bu iş sadece anomaly modellerini kapsar.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from anomaly_detector import AnomalyDetector, GROUP_COLUMNS
+from drift_monitor import RetrainQueue, queue_path
+from model_registry import ModelRegistry, _safe_key
+
+HISTORY_SUFFIXES = ('.csv', '.parquet', '.pq')
+MIN_ROWS = 200
+VAL_FRACTION = 0.2
+
+
+def split_export(path, out_dir, chunk_size=200000):
+    """Tüm kovanları içeren CSV export'unu <out_dir>/<hiveId>.csv dosyalarına böl"""
+    import pandas as pd
+
+    written = set()
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        group_col = next((col for col in GROUP_COLUMNS if col in chunk.columns), None)
+        if group_col is None:
+            raise ValueError(f"Export'ta kovan kolonu yok (beklenen: {', '.join(GROUP_COLUMNS)})")
+        for hive_id, rows in chunk.groupby(group_col, sort=False):
+            target = os.path.join(out_dir, _safe_key(hive_id) + '.csv')
+            rows.to_csv(target, mode='a', header=target not in written, index=False)
+            written.add(target)
+    return sorted(written)
+
+
+def find_histories(source):
+    """{hiveId: dosya yolu} - dizindeki kovan dosyaları"""
+    histories = {}
+    for name in sorted(os.listdir(source)):
+        hive_id, suffix = os.path.splitext(name)
+        if suffix in HISTORY_SUFFIXES and not name.startswith('.'):
+            histories[hive_id] = os.path.join(source, name)
+    return histories
+
+
+def _read_history(path):
+    import pandas as pd
+
+    if path.endswith(('.parquet', '.pq')):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if 'timestamp' in df.columns:
+        order = pd.to_datetime(df['timestamp'], errors='coerce').argsort(kind='mergesort')
+        df = df.iloc[order].reset_index(drop=True)
+    return df
+
+
+def _limit_threads():
+    # Worker başına BLAS thread'i: paralellik süreçlerden (ve estimator n_jobs'tan) gelir
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def retrain_hive(hive_id, path, registry_root, work_dir, n_jobs=1, min_rows=MIN_ROWS,
+                 val_fraction=VAL_FRACTION, with_trends=True):
+    """Tek kovanı eğit, doğrula, registry'ye yayınla - rapor satırı döner (worker'da çalışır)"""
+    report = {"hive": hive_id, "status": "failed", "source": path}
+    artifact = os.path.join(work_dir, f"{hive_id}.joblib")  # Geçici - registry'ye kopyalanır
+    started = time.perf_counter()
+    try:
+        df = _read_history(path)
+        report["rows"] = len(df)
+        if len(df) < min_rows:
+            report.update(status="skipped", reason=f"{len(df)} rows < {min_rows}")
+            return report
+
+        split = int(len(df) * (1 - val_fraction))
+        detector = AnomalyDetector(artifact)
+        result = detector.train_model(df.iloc[:split], with_trends=with_trends, n_jobs=n_jobs)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "training failed"))
+
+        # Doğrulama: trend pencereleri eğitim kısmından devam etsin diye tüm seri üzerinden
+        if with_trends:
+            features, _ = detector.extract_features_batch(df)
+        else:
+            features = detector.feature_matrix(df)
+        scores = detector.detect_anomalies_batch(features[split:])["anomaly_score"]
+
+        registry = ModelRegistry(registry_root, {})
+        version, target = registry.publish('anomaly', artifact, 'hive', hive_id)
+        # Derlenmiş forest'ı yayınlanan versiyonun imzasıyla yaz - daemon sklearn'süz açar
+        detector.model_path = target
+        detector.save_compiled()
+
+        report.update(
+            status="trained",
+            train_rows=split,
+            val_rows=len(df) - split,
+            fit_seconds=result["training_seconds"],
+            peak_memory_mb=result["peak_memory_mb"],
+            val_anomaly_rate=float(np.mean(scores < 0)) if len(scores) else None,
+            val_score_mean=float(np.mean(scores)) if len(scores) else None,
+            version=version,
+            artifact=target
+        )
+    except Exception as e:
+        report.update(error=str(e), traceback=traceback.format_exc(limit=3))
+    finally:
+        if os.path.exists(artifact):
+            os.remove(artifact)
+        shutil.rmtree(artifact + '.forest', ignore_errors=True)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def plan_workers(n_hives, workers=None, cpus=None):
+    """(worker sayısı, estimator n_jobs) - worker × n_jobs çekirdek sayısını aşmasın"""
+    cpus = cpus or os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, n_hives or 1))
+    return workers, max(1, cpus // workers)
+
+
+def retrain_fleet(source, registry_root, workers=None, hives=None, min_rows=MIN_ROWS,
+                  val_fraction=VAL_FRACTION, with_trends=True, progress=None):
+    """Kaynaktaki tüm (ya da seçili) kovanları paralel eğit - özet rapor döner"""
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    work_dir = tempfile.mkdtemp(prefix='retrain-')
+    try:
+        if os.path.isdir(source):
+            histories = find_histories(source)
+        else:
+            split_dir = os.path.join(work_dir, 'histories')
+            os.makedirs(split_dir)
+            split_export(source, split_dir)
+            histories = find_histories(split_dir)
+        if hives:
+            wanted = set(map(str, hives))
+            histories = {hive: path for hive, path in histories.items() if hive in wanted}
+
+        n_workers, n_jobs = plan_workers(len(histories), workers)
+        reports = []
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_limit_threads) as pool:
+            futures = [
+                pool.submit(retrain_hive, hive_id, path, registry_root, work_dir, n_jobs,
+                            min_rows, val_fraction, with_trends)
+                for hive_id, path in histories.items()
+            ]
+            for future in as_completed(futures):
+                report = future.result()
+                reports.append(report)
+                if progress:
+                    progress(report, len(reports), len(futures))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    reports.sort(key=lambda report: report["hive"])
+    trained = [report for report in reports if report["status"] == "trained"]
+    return {
+        "started_at": started_at,
+        "source": source,
+        "registry": registry_root,
+        "workers": n_workers,
+        "n_jobs": n_jobs,
+        "seconds": round(time.perf_counter() - started, 3),
+        "totals": {
+            "hives": len(reports),
+            "trained": len(trained),
+            "skipped": sum(report["status"] == "skipped" for report in reports),
+            "failed": sum(report["status"] == "failed" for report in reports),
+            "rows": sum(report.get("rows", 0) for report in reports),
+            "fit_seconds": round(sum(report["fit_seconds"] for report in trained), 3)
+        },
+        "hives": reports
+    }
+
+
+def _print_progress(report, done, total):
+    if report["status"] == "trained":
+        print(f"✅ [{done}/{total}] {report['hive']}: v{report['version']}, {report['train_rows']} satır, "
+              f"{report['fit_seconds']:.2f} s, doğrulama anomali oranı {report['val_anomaly_rate']:.1%}")
+    elif report["status"] == "skipped":
+        print(f"⏭️ [{done}/{total}] {report['hive']}: atlandı ({report['reason']})")
+    else:
+        print(f"❌ [{done}/{total}] {report['hive']}: {report['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kovan bazında anomaly modellerini paralel yeniden eğit")
+    parser.add_argument('source', help="Kovan geçmişleri dizini (<hiveId>.csv/.parquet) ya da hiveId kolonlu CSV export")
+    parser.add_argument('--registry', default='registry', help="model_registry kök dizini")
+    parser.add_argument('--workers', type=int, help="Süreç sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument('--hive', action='append', help="Sadece bu kovan(lar)")
+    parser.add_argument('--queue', nargs='?', const='',
+                        help="Drift retrain kuyruğu (drift_monitor) - sadece kuyruktaki kovanlar eğitilir; "
+                             "dosya verilmezse <registry>/retrain_queue.json")
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS)
+    parser.add_argument('--val-fraction', type=float, default=VAL_FRACTION)
+    parser.add_argument('--no-trends', action='store_true', help="Trend feature'ları olmadan eğit (4 feature)")
+    parser.add_argument('--report', help="Özet raporun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    hives = args.hive
+    if args.queue is not None:
+        queue = RetrainQueue(args.queue or queue_path(registry=args.registry))
+        hives = [hive for hive in queue.pending() if not args.hive or hive in args.hive]
+        if not hives:
+            print("✅ Drift kuyruğu boş - eğitilecek kovan yok")
+            return 0
+
+    summary = retrain_fleet(args.source, args.registry, args.workers, hives, args.min_rows,
+                            args.val_fraction, not args.no_trends, progress=_print_progress)
+    if args.queue is not None:
+        # Eğitilen kovanlar kuyruktan çıkar; hata alanlar sonraki çalıştırmada tekrar denenir
+        queue.remove([report["hive"] for report in summary["hives"] if report["status"] == "trained"])
+    totals = summary["totals"]
+    print(f"🏁 {totals['trained']}/{totals['hives']} kovan eğitildi ({totals['skipped']} atlandı, "
+          f"{totals['failed']} hata), {totals['rows']} satır, {summary['seconds']:.1f} s "
+          f"({summary['workers']} worker × n_jobs {summary['n_jobs']})")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"📄 Rapor: {args.report}")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
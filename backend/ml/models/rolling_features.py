@@ -0,0 +1,155 @@
+"""
+Streaming trend feature'ları - kovan/key başına kayan pencerede O(1) eğim
+
+Her pencere Σy, Σy² ve Σxy'yi tutar (x = pencere içindeki sıra, 0..n-1; Σx ve Σx² sadece
+n'e bağlıdır). Yeni değer geldiğinde en eski değer çıkar: kalan değerlerin x'i bir azalır,
+yani Σxy -= Σy_kalan, sonra yeni değer x = n-1 ile eklenir. Eğim, R² ve standart sapma
+np.polyfit(arange(n), y, 1) / np.std(y) ile aynıdır.
+
+Uzun akışlarda kayan nokta hatası birikmesin diye toplamlar RESYNC_INTERVAL güncellemede
+bir pencereden yeniden hesaplanır (amortize O(1)).
+"""
+
+import math
+import threading
+from collections import deque
+
+RESYNC_INTERVAL = 1024
+
+
+class RollingSlope:
+    """Tek bir seri için kayan pencere doğrusal regresyonu"""
+
+    __slots__ = ('window', 'values', 'sum_y', 'sum_yy', 'sum_xy', '_updates')
+
+    def __init__(self, window=10, values=()):
+        if window is not None and window < 2:
+            raise ValueError("window en az 2 olmalı")
+        self.window = window        # None: sınırsız (tüm seri)
+        self.values = deque(maxlen=window)
+        self.sum_y = 0.0
+        self.sum_yy = 0.0
+        self.sum_xy = 0.0
+        self._updates = 0
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        value = float(value)
+        if value != value:  # NaN pencereye girmez
+            return
+        n = len(self.values)
+        if n == self.window:
+            oldest = self.values[0]
+            self.sum_y -= oldest
+            self.sum_yy -= oldest * oldest
+            self.sum_xy -= self.sum_y      # kalan değerler bir sıra sola kayar
+            n -= 1
+        self.sum_xy += n * value
+        self.values.append(value)
+        self.sum_y += value
+        self.sum_yy += value * value
+
+        self._updates += 1
+        if self._updates >= RESYNC_INTERVAL and self.window is not None:
+            self._resync()
+
+    @classmethod
+    def from_values(cls, values, window=None):
+        """Hazır bir seriden pencere oluştur (son `window` değer, NaN'lar atlanır)"""
+        rolling = cls(window)
+        values = [v for v in map(float, values) if v == v]
+        rolling.values.extend(values[-window:] if window else values)
+        rolling._resync()
+        return rolling
+
+    def _resync(self):
+        self.sum_y = math.fsum(self.values)
+        self.sum_yy = math.fsum(v * v for v in self.values)
+        self.sum_xy = math.fsum(i * v for i, v in enumerate(self.values))
+        self._updates = 0
+
+    def _moments(self):
+        n = len(self.values)
+        sum_x = n * (n - 1) / 2.0
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6.0
+        sxx = n * sum_xx - sum_x * sum_x
+        sxy = n * self.sum_xy - sum_x * self.sum_y
+        syy = n * self.sum_yy - self.sum_y * self.sum_y
+        return n, sxx, sxy, max(syy, 0.0)
+
+    def slope(self):
+        """calculate_trend ile aynı - 2'den az değer varsa 0.0"""
+        n, sxx, sxy, _ = self._moments()
+        return sxy / sxx if n >= 2 else 0.0
+
+    def stats(self):
+        """{'slope', 'r_squared', 'std', 'count'} - analyze_trend'in ihtiyaç duyduğu değerler"""
+        n, sxx, sxy, syy = self._moments()
+        if n < 2:
+            return {"slope": 0.0, "r_squared": 0.0, "std": 0.0, "count": n}
+        # Çok küçük varyans: sabit seri (kayan nokta kalıntısını sıfır say)
+        flat = syy <= 1e-12 * max(1.0, self.sum_yy * n)
+        return {
+            "slope": sxy / sxx,
+            "r_squared": 0.0 if flat else min(1.0, sxy * sxy / (sxx * syy)),
+            "std": 0.0 if flat else math.sqrt(syy) / n,
+            "count": n
+        }
+
+
+class RollingFeatureEngine:
+    """Kovan/key başına RollingSlope - okuma başına sabit zamanlı trend feature'ları
+
+    keys: trend hesaplanacak key'ler, sırası feature sırasıdır
+    max_hives: en uzun süre güncellenmeyen kovan bu sınır aşıldığında silinir
+    """
+
+    def __init__(self, keys=('temperature', 'weight', 'humidity'), window=10, max_hives=10000):
+        self.keys = tuple(keys)
+        self.window = window
+        self.max_hives = max_hives
+        self._hives = {}  # dict ekleme sırası = son güncelleme sırası (update'te sona taşınır)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hives)
+
+    def __contains__(self, hive_id):
+        return hive_id in self._hives
+
+    def update(self, hive_id, reading):
+        """Okumayı kovanın pencerelerine ekle, güncel trend'leri (keys sırasıyla) döndür"""
+        with self._lock:
+            windows = self._hives.pop(hive_id, None)
+            if windows is None:
+                windows = tuple(RollingSlope(self.window) for _ in self.keys)
+                if len(self._hives) >= self.max_hives:
+                    del self._hives[next(iter(self._hives))]
+            self._hives[hive_id] = windows
+
+            for key, window in zip(self.keys, windows):
+                value = reading.get(key)
+                if value is not None:
+                    window.append(value)
+            return [window.slope() for window in windows]
+
+    def trends(self, hive_id):
+        """Kovanın güncel trend'leri - hiç okuma yoksa None"""
+        with self._lock:
+            windows = self._hives.get(hive_id)
+            if windows is None:
+                return None
+            return [window.slope() for window in windows]
+
+    def history_length(self, hive_id):
+        with self._lock:
+            windows = self._hives.get(hive_id)
+            return max(len(window) for window in windows) if windows else 0
+
+    def forget(self, hive_id):
+        with self._lock:
+            self._hives.pop(hive_id, None)
@@ -0,0 +1,266 @@
+"""
+ML scoring daemon - Model bir kez yüklenir, istekler süreç başlatmadan cevaplanır
+
+Her istek tek satır JSON'dur (CLI'ın sys.argv[1] ile aldığı obje ile aynı), her cevap da
+tek satır JSON'dur (newline-delimited JSON). İstekteki "id" alanı cevaba aynen eklenir.
+
+    Unix socket : python anomaly_detector.py --serve --socket /tmp/beetwin-anomaly.sock
+                  bağlantı açık kaldıkça satır satır istek / cevap
+    HTTP        : python anomaly_detector.py --serve --port 8765
+                  POST /score   gövde: bir ya da daha çok NDJSON satırı → aynı sırada cevaplar
+                  GET  /health  model yolu, versiyonu, yüklenme zamanı
+                  GET  /drift   kovan bazında drift skorları ve retrain için işaretlenenler
+    Registry    : python anomaly_detector.py --serve --registry registry --memory-budget 256
+                  model isteğin hiveId / apiaryId alanlarına göre model_registry'den seçilir
+
+Her bağlantı / HTTP isteği kendi thread'inde çalışır. Model artifact'ı değiştiğinde
+(mtime / boyut) arka planda yeni bir instance yüklenir ve hazır olunca tek atamayla
+devreye alınır; devam eden istekler eski modelle biter. Yükleme başarısızsa (ör. dosya
+hâlâ yazılıyor) eski model kullanılmaya devam eder ve sonraki kontrolde tekrar denenir.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ModelHandle:
+    """Artifact değişince modeli yeniden yükleyen paylaşılan model referansı"""
+
+    def __init__(self, factory, model_path, check_interval=2.0):
+        self.factory = factory
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self.version = 0
+        self.loaded_at = None
+        self._signature = None
+        self._failed = None     # Yüklenemeyen artifact'ın imzası - değişene kadar tekrar denenmez
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.current = None
+        self.reload(force=True)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.model_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, force=False):
+        """Artifact değiştiyse yeni modeli yükle - devreye alındıysa True döner"""
+        with self._lock:
+            signature = self._stat()
+            if not force and signature in (self._signature, self._failed):
+                return False
+
+            model = self.factory(self.model_path)
+            if signature is not None and not getattr(model, 'is_trained', True):
+                # Yarım yazılmış / bozuk artifact: eskiyle devam, dosya (mtime / boyut) değişince tekrar dene
+                print(f"⚠️ Model yüklenemedi, önceki versiyon kullanılıyor: {self.model_path}",
+                      file=sys.stderr)
+                self._failed = signature
+                if self.current is not None:
+                    return False
+
+            for state in ('stream_features', 'baselines'):
+                if self.current is not None and hasattr(model, state) and hasattr(self.current, state):
+                    # Kovanların streaming trend pencereleri / online baseline'ları model yenilenince kaybolmasın
+                    setattr(model, state, getattr(self.current, state))
+            self.current = model
+            self._signature = signature
+            if signature != self._failed:
+                self._failed = None
+            self.version += 1
+            self.loaded_at = datetime.now().isoformat()
+            print(f"🔄 Model v{self.version} devrede: {self.model_path}", file=sys.stderr)
+            return True
+
+    def start_watching(self):
+        if self.check_interval and self.check_interval > 0:
+            self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading model: {str(e)}", file=sys.stderr)
+
+    def model_for(self, request):
+        return self.current
+
+    def info(self):
+        return {
+            "status": "OK",
+            "model_path": self.model_path,
+            "model_version": self.version,
+            "loaded_at": self.loaded_at,
+            "is_trained": bool(getattr(self.current, 'is_trained', False))
+        }
+
+    def drift(self):
+        monitor = getattr(self.current, 'drift', None)
+        return monitor.summary() if monitor is not None else {"hives": {}, "flagged": []}
+
+
+class RegistryHandle:
+    """İstekteki hiveId / apiaryId'ye göre ModelRegistry'den model seçen handle
+
+    Yeni versiyonlar registry'nin refresh_interval'ı ile devreye girer; ayrı bir watcher gerekmez.
+    """
+
+    def __init__(self, registry, kind):
+        self.registry = registry
+        self.kind = kind
+
+    def model_for(self, request):
+        return self.registry.get(self.kind, request.get('hiveId'), request.get('apiaryId'))
+
+    def start_watching(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def info(self):
+        return {"status": "OK", "registry": self.registry.root, **self.registry.cache_info()}
+
+    def drift(self):
+        # Her model kendi kapsamındaki kovanları izler; kovan birden çok modelde görünmez
+        result = {"hives": {}, "flagged": []}
+        for monitor in self.registry.drift_monitors(self.kind):
+            summary = monitor.summary()
+            result["hives"].update(summary["hives"])
+            result["flagged"] += summary["flagged"]
+        return result
+
+
+def answer(handle, handler, line):
+    """Tek NDJSON satırını cevapla - hatalar da JSON cevap olarak döner"""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {"error": f"Invalid JSON: {str(e)}", "method": "error_fallback"}
+    if not isinstance(request, dict):
+        return {"error": "Request must be a JSON object", "method": "error_fallback"}
+
+    try:
+        result = handler(handle.model_for(request), request)
+    except Exception as e:
+        result = {"error": str(e), "method": "error_fallback"}
+    if 'id' in request:
+        result["id"] = request['id']
+    return result
+
+
+def _encode(result):
+    return (json.dumps(result) + "\n").encode('utf-8')
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_unix_server(handle, handler, socket_path):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                self.wfile.write(_encode(answer(handle, handler, line)))
+                self.wfile.flush()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    return _UnixServer(socket_path, Handler)
+
+
+def make_http_server(handle, handler, host, port):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, _encode(handle.info()))
+            elif self.path == '/drift':
+                self._reply(200, _encode(handle.drift()))
+            else:
+                self._reply(404, _encode({"error": "Not found"}))
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._reply(404, _encode({"error": "Not found"}))
+                return
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            lines = [line for line in body.splitlines() if line.strip()]
+            if not lines:
+                self._reply(400, _encode({"error": "No input data provided"}))
+                return
+            self._reply(200, b''.join(_encode(answer(handle, handler, line)) for line in lines))
+
+        def _reply(self, status, data):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(argv, factory, handler, default_model_path, default_port, kind):
+    """--serve komut satırı: modeli yükle, Unix socket ya da HTTP üzerinden dinle"""
+    parser = argparse.ArgumentParser(description="BeeTwin ML scoring daemon")
+    parser.add_argument('--serve', action='store_true')
+    parser.add_argument('--model', default=default_model_path, help="Model artifact yolu")
+    parser.add_argument('--socket', help="Unix socket yolu (verilmezse HTTP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=default_port)
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help="Artifact değişiklik kontrol aralığı (s), 0: kapalı")
+    parser.add_argument('--registry', help="Kovan bazında model registry kök dizini")
+    parser.add_argument('--memory-budget', type=float, default=512, help="Registry model cache bütçesi (MB)")
+    args = parser.parse_args(argv)
+
+    if args.registry:
+        from model_registry import ModelRegistry
+        registry = ModelRegistry(args.registry, {kind: factory}, args.memory_budget,
+                                 refresh_interval=args.reload_interval or 30.0,
+                                 default_paths={kind: os.path.abspath(args.model)})
+        handle = RegistryHandle(registry, kind)
+    else:
+        handle = ModelHandle(factory, args.model, args.reload_interval).start_watching()
+    if args.socket:
+        server = make_unix_server(handle, handler, args.socket)
+        where = args.socket
+    else:
+        server = make_http_server(handle, handler, args.host, args.port)
+        where = f"http://{args.host}:{server.server_address[1]}"
+    print(f"🧠 ML scoring daemon dinliyor: {where}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handle.stop()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
@@ -0,0 +1,107 @@
+"""
+ML CLI başlangıç benchmark'ı - Node tarafının her istekte başlattığı süreçlerin maliyeti
+
+Her senaryo ayrı bir Python sürecinde (soğuk import) çalıştırılır. Ölçülen değerler:
+import + model yükleme + tek istek süresi ve süreçte yüklenen ağır modüller
+(pandas / sklearn / joblib). Süreler duvar saati, en iyi ve medyan.
+
+    python startup_benchmark.py                                   # varsayılan artifact'lar
+    python startup_benchmark.py --anomaly-model anomaly_model.joblib --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('pandas', 'sklearn', 'joblib', 'scipy')
+
+_SCENARIO = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {here!r})
+{body}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_READING = {"temperature": 34.5, "humidity": 61.0, "weight": 42.3, "gasLevel": 0.4}
+
+
+def _history(n):
+    return [
+        {"timestamp": f"2024-05-{1 + i // 24:02d}T{i % 24:02d}:00:00", "temperature": 34 + 0.1 * i,
+         "humidity": 60 - 0.05 * i, "weight": 40 + 0.02 * i}
+        for i in range(n)
+    ]
+
+
+def scenarios(anomaly_model, trend_model):
+    """(ad, süreçte çalışacak kod) listesi - CLI main()'in yaptığıyla aynı iş"""
+    return [
+        ("anomaly_threshold", f"""
+from anomaly_detector import AnomalyDetector
+AnomalyDetector("__no_model__.joblib").detect_anomalies({_READING!r})
+"""),
+        ("anomaly_model", f"""
+from anomaly_detector import AnomalyDetector
+AnomalyDetector({anomaly_model!r}).detect_anomalies({_READING!r})
+"""),
+        ("trend_simple", f"""
+from trend_predictor import TrendPredictor
+TrendPredictor({trend_model!r}).predict_trends({_history(5)!r})
+"""),
+        ("trend_full", f"""
+from trend_predictor import TrendPredictor
+TrendPredictor({trend_model!r}).predict_trends({_history(48)!r})
+"""),
+    ]
+
+
+def run_scenario(body, repeat=3):
+    """Senaryoyu repeat kez ayrı süreçte çalıştır - {'best_ms', 'median_ms', 'process_ms', 'modules'}"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = _SCENARIO.format(here=here, body=body, heavy=HEAVY_MODULES)
+    inner, total, modules = [], [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=here)
+        total.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "scenario failed")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        inner.append(result['seconds'])
+        modules = result['modules']
+    return {
+        "best_ms": min(inner) * 1000,
+        "median_ms": statistics.median(inner) * 1000,
+        "process_ms": statistics.median(total) * 1000,
+        "modules": modules
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ML CLI soğuk başlangıç benchmark'ı")
+    parser.add_argument('--anomaly-model', default='anomaly_model.joblib')
+    parser.add_argument('--trend-model', default='trend_models.joblib')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yaz")
+    args = parser.parse_args()
+
+    results = {}
+    for name, body in scenarios(os.path.abspath(args.anomaly_model), os.path.abspath(args.trend_model)):
+        results[name] = run_scenario(body, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        print(f"⏱️ {name:18s} en iyi {result['best_ms']:7.1f} ms, medyan {result['median_ms']:7.1f} ms, "
+              f"süreç {result['process_ms']:7.1f} ms, yüklenen: {', '.join(result['modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
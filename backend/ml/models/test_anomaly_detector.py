@@ -0,0 +1,175 @@
+"""
+AnomalyDetector batch yolu testi - 4 feature'lı (trend'siz) ve 7 feature'lı modelde girdi
+genişliğinin modele uydurulması, tek okuma yoluyla aynı skor, derlenmiş / sklearn yol
+eşitliği, diskten (derlenmiş forest) yükleme ve eğitilmemiş modelde threshold'a düşme
+
+    python test_anomaly_detector.py
+    python -m pytest test_anomaly_detector.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from anomaly_detector import COMPILED_BATCH_LIMIT, AnomalyDetector
+
+MAX_DIFF = 1e-9
+_detectors = {}
+
+
+def training_data(n_hives=4, n=150, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for hive in range(n_hives):
+        for i in range(n):
+            rows.append({
+                'hiveId': str(100 + hive),
+                'timestamp': f"2026-01-{1 + i // 24:02d}T{i % 24:02d}:00:00",
+                'temperature': 34.0 + rng.normal(0, 1.0),
+                'humidity': 60.0 + rng.normal(0, 5.0),
+                'weight': 40.0 + 0.01 * i + rng.normal(0, 0.3),
+                'gasLevel': 0.4 + rng.normal(0, 0.05)
+            })
+    return rows
+
+
+def readings(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.normal([34.0, 60.0, 40.0, 0.4, 0.0, 0.0, 0.0], [3.0, 15.0, 3.0, 0.2, 0.2, 0.2, 0.2], size=(n, 7))
+
+
+def trained(with_trends):
+    """Küçük model eğit (modül başına bir kez) - artifact dizini eğitimden sonra silinir"""
+    if with_trends not in _detectors:
+        directory = tempfile.mkdtemp()
+        try:
+            detector = AnomalyDetector(os.path.join(directory, 'anomaly_model.joblib'))
+            result = detector.train_model(training_data(), with_trends=with_trends, sample_size=2000)
+            assert result['success'], result
+            assert detector.compiled is not None
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        _detectors[with_trends] = detector
+    return _detectors[with_trends]
+
+
+def as_dicts(X, detector):
+    names = detector.feature_names + detector.trend_feature_names
+    return [dict(zip(names, row)) for row in X]
+
+
+def test_model_widths():
+    assert trained(False).n_features == 4 and not trained(False).expects_trends()
+    assert trained(True).n_features == 7 and trained(True).expects_trends()
+
+
+def test_four_feature_model_ignores_trend_columns():
+    detector = trained(False)
+    X = readings(100)
+    result = detector.detect_anomalies_batch(X)
+    assert result['method'] == 'ml_isolation_forest' and result['count'] == 100
+    assert np.max(np.abs(result['anomaly_score'] - detector.detect_anomalies_batch(X[:, :4])['anomaly_score'])) <= MAX_DIFF
+    # dict girdide de trend kolonları atılır; tek okuma yoluyla aynı skor
+    scores = detector.detect_anomalies_batch(as_dicts(X, detector))['anomaly_score']
+    singles = [detector.detect_anomalies(data)['anomaly_score'] for data in as_dicts(X[:20, :4], detector)]
+    assert np.max(np.abs(scores - result['anomaly_score'])) <= MAX_DIFF
+    assert np.max(np.abs(scores[:20] - singles)) <= MAX_DIFF
+
+
+def test_seven_feature_model_pads_flat_trends():
+    detector = trained(True)
+    X = readings(100)
+    flat = np.hstack([X[:, :4], np.zeros((100, 3))])
+    padded = detector.detect_anomalies_batch(X[:, :4])['anomaly_score']
+    assert np.max(np.abs(padded - detector.detect_anomalies_batch(flat)['anomaly_score'])) <= MAX_DIFF
+    # Geçmiş / hive_id yoksa tek okuma yolu da düz trend kullanır
+    singles = [detector.detect_anomalies(data)['anomaly_score'] for data in as_dicts(X[:20, :4], detector)]
+    assert np.max(np.abs(padded[:20] - singles)) <= MAX_DIFF
+    # Trend kolonları verilince kullanılır
+    assert np.max(np.abs(detector.detect_anomalies_batch(X)['anomaly_score'] - padded)) > 0
+
+
+def test_width_mismatch_raises():
+    for detector in (trained(False), trained(True)):
+        try:
+            detector.detect_anomalies_batch(readings(10)[:, :5])
+        except ValueError:
+            continue
+        raise AssertionError("5 kolonlu girdi için ValueError bekleniyordu")
+    detector = trained(True)
+    n_features = detector.n_features
+    try:
+        detector.n_features = 6  # Artifact ile kod uyuşmuyor - threshold'a sessizce düşmemeli
+        detector.detect_anomalies_batch(readings(10))
+    except ValueError:
+        return
+    finally:
+        detector.n_features = n_features
+    raise AssertionError("Model genişliği uyuşmazlığında ValueError bekleniyordu")
+
+
+def test_compiled_and_sklearn_paths_agree():
+    for with_trends in (False, True):
+        detector = trained(with_trends)
+        X = readings(COMPILED_BATCH_LIMIT + 44, seed=2)
+        sklearn_scores = detector.detect_anomalies_batch(X)['anomaly_score']    # Limit üstü: sklearn
+        compiled_scores = np.concatenate([detector.detect_anomalies_batch(X[i:i + COMPILED_BATCH_LIMIT])['anomaly_score']
+                                          for i in range(0, len(X), COMPILED_BATCH_LIMIT)])
+        assert np.max(np.abs(sklearn_scores - compiled_scores)) <= MAX_DIFF
+
+
+def test_reload_from_disk():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'anomaly_model.joblib')
+        detector = AnomalyDetector(path)
+        assert detector.train_model(training_data(seed=3), with_trends=True, sample_size=2000)['success']
+        assert os.path.isdir(detector.compiled_path())
+        X = readings(50)
+        expected = detector.detect_anomalies_batch(X)['anomaly_score']
+
+        loaded = AnomalyDetector(path)
+        # Derlenmiş forest açılır, sklearn nesneleri yüklenmez
+        assert loaded.is_trained and loaded.expects_trends() and not loaded._estimators_ready
+        assert np.max(np.abs(loaded.detect_anomalies_batch(X)['anomaly_score'] - expected)) <= MAX_DIFF
+        assert loaded.drift is not None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_untrained_uses_threshold():
+    directory = tempfile.mkdtemp()
+    try:
+        detector = AnomalyDetector(os.path.join(directory, 'missing.joblib'))
+        X = np.array([[34.0, 60.0, 40.0, 0.4], [45.0, 60.0, 40.0, 0.4], [34.0, 95.0, 40.0, 0.4]])
+        result = detector.detect_anomalies_batch(X)
+        assert result['method'] == 'threshold_based'
+        assert result['is_anomaly'].tolist() == [False, True, True]
+        assert result['anomalies']['extreme_temperature'].tolist() == [False, True, False]
+        single = detector.detect_anomalies({'temperature': 45.0, 'humidity': 60.0, 'weight': 40.0, 'gasLevel': 0.4})
+        assert single['is_anomaly'] and single['method'] == 'threshold_based'
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    tests = [test_model_widths, test_four_feature_model_ignores_trend_columns, test_seven_feature_model_pads_flat_trends,
+             test_width_mismatch_raises, test_compiled_and_sklearn_paths_agree, test_reload_from_disk,
+             test_untrained_uses_threshold]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
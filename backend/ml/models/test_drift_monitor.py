@@ -0,0 +1,139 @@
+"""
+drift_monitor testi - PSI (aynı dağılımda ~0, kaymada eşik üstü), FeatureStats merge /
+serileştirme, DriftMonitor'ın kovanı bir kez işaretleyip retrain kuyruğuna yazması,
+kuyruk yolunun modele bağlı olması
+
+    python test_drift_monitor.py
+    python -m pytest test_drift_monitor.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from drift_monitor import DRIFT_QUEUE, DRIFT_THRESHOLD, DriftMonitor, FeatureStats, RetrainQueue, queue_path
+
+NAMES = ['temperature', 'humidity', 'weight', 'gasLevel']
+
+
+def sample(n, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal([34.0, 60.0, 40.0, 0.4], [1.0, 5.0, 2.0, 0.05], size=(n, 4))
+    X[:, 0] += shift
+    return X
+
+
+def test_psi_same_distribution():
+    reference = FeatureStats.from_matrix(sample(20000, 0), NAMES)
+    live = reference.empty()
+    live.update_matrix(sample(5000, 1))
+    report = live.compare(reference)
+    assert report['count'] == 5000
+    assert report['score'] < 0.02, report
+    assert report['drifted'] == []
+
+
+def test_psi_shifted_feature():
+    reference = FeatureStats.from_matrix(sample(20000, 0), NAMES)
+    live = reference.empty()
+    live.update_matrix(sample(5000, 1, shift=3.0))
+    report = live.compare(reference)
+    assert report['features']['temperature']['psi'] > DRIFT_THRESHOLD
+    assert abs(report['features']['temperature']['mean_shift'] - 3.0) < 0.1
+    assert report['drifted'] == ['temperature']
+    assert report['features']['humidity']['psi'] < 0.02
+
+
+def test_narrow_window_is_not_drift():
+    # Eğitim aralığının içinde daralan seri PSI'yi yükseltir ama ortalama / std kaymadığı için drift değil
+    reference = FeatureStats.from_matrix(sample(20000, 0), NAMES)
+    live = reference.empty()
+    X = sample(2000, 1)
+    X[:, 2] = 40.0 + np.linspace(-0.2, 0.2, len(X))
+    live.update_matrix(X)
+    report = live.compare(reference)
+    assert report['features']['weight']['psi'] > DRIFT_THRESHOLD
+    assert 'weight' not in report['drifted']
+
+
+def test_merge_add_and_serialize():
+    reference = FeatureStats.from_matrix(sample(5000, 0), NAMES)
+    X = sample(300, 2)
+    whole = reference.empty()
+    whole.update_matrix(X)
+    parts = reference.empty()
+    parts.update_matrix(X[:100])
+    rows = reference.empty()
+    for row in X[100:]:
+        rows.add(list(row))
+    parts.merge(rows)
+    assert parts.hist == whole.hist and parts.count == whole.count
+    assert np.allclose(parts.sum, whole.sum) and np.allclose(parts.sumsq, whole.sumsq)
+    restored = FeatureStats.from_dict(whole.to_dict())
+    assert restored.to_dict() == whole.to_dict()
+    other = FeatureStats.from_matrix(sample(5000, 3), NAMES)
+    try:
+        whole.merge(other)
+    except ValueError:
+        return
+    raise AssertionError("Farklı sınırlarla merge ValueError vermeli")
+
+
+def test_monitor_flags_once_and_queues():
+    directory = tempfile.mkdtemp()
+    try:
+        queue = RetrainQueue(os.path.join(directory, DRIFT_QUEUE))
+        monitor = DriftMonitor(FeatureStats.from_matrix(sample(20000, 0), NAMES).to_dict(),
+                               min_samples=500, window=400, check_every=100, queue=queue)
+        reports = []
+        for normal, drifted in zip(sample(1200, 1), sample(1200, 2, shift=3.0)):
+            assert monitor.observe('107', normal) is None
+            report = monitor.observe('108', drifted)
+            if report is not None:
+                reports.append(report)
+        # Eşik min_samples'a ulaşınca bir kez aşılır; sonraki kontroller tekrar raporlamaz
+        assert len(reports) == 1 and reports[0]['hive'] == '108'
+        assert reports[0]['count'] >= 500
+        assert list(queue.pending()) == ['108']
+        assert monitor.summary()['flagged'] == ['108']
+        # İki dönen pencere: sayım son window + önceki pencereyle sınırlı
+        assert monitor.report('107')['count'] <= 2 * 400
+        queue.remove(['108'])
+        assert queue.pending() == {}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_queue_path_follows_model():
+    directory = tempfile.mkdtemp()
+    try:
+        artifact = os.path.join(directory, 'registry', 'anomaly', 'hive', '107', 'v0003.joblib')
+        assert queue_path(artifact) == os.path.join(directory, 'registry', DRIFT_QUEUE)
+        standalone = os.path.join(directory, 'models', 'anomaly_model.joblib')
+        assert queue_path(standalone) == os.path.join(directory, 'models', DRIFT_QUEUE)
+        assert queue_path(registry=os.path.join(directory, 'registry')) == os.path.join(directory, 'registry', DRIFT_QUEUE)
+        assert os.path.isabs(queue_path())
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    tests = [test_psi_same_distribution, test_psi_shifted_feature, test_narrow_window_is_not_drift,
+             test_merge_add_and_serialize, test_monitor_flags_once_and_queues, test_queue_path_follows_model]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+forest_compiler parity testi - küçük bir Isolation Forest eğitilir, derlenir ve skorlar /
+kararlar sklearn decision_function ile karşılaştırılır (kaydet / mmap ile yükle dahil)
+
+    python test_forest_compiler.py
+    python -m pytest test_forest_compiler.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from forest_compiler import CompiledForest, check_parity, sample_inputs
+
+MAX_DIFF = 1e-9
+
+
+def fit_detector(n_features=7, pca_components=None, whiten=False, n_estimators=25, seed=0):
+    """AnomalyDetector'ın (model, scaler, pca) üçlüsü gibi küçük bir model"""
+    from sklearn.decomposition import PCA
+    from sklearn.ensemble import IsolationForest
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal([34.0, 60.0, 40.0, 0.4, 0.0, 0.0, 0.0][:n_features], 2.0, size=(500, n_features))
+    scaler = StandardScaler().fit(X)
+    scaled = scaler.transform(X)
+    pca = None
+    if pca_components:
+        pca = PCA(n_components=pca_components, whiten=whiten, random_state=seed).fit(scaled)
+        scaled = pca.transform(scaled)
+    model = IsolationForest(n_estimators=n_estimators, contamination=0.1, random_state=seed).fit(scaled)
+    return SimpleNamespace(model=model, scaler=scaler, pca=pca)
+
+
+def assert_parity(detector, compiled, n=2000):
+    X = sample_inputs(detector, n)
+    parity = check_parity(detector, compiled, X)
+    assert parity["max_abs_diff"] <= MAX_DIFF, parity
+    assert parity["decisions_equal"], parity
+    # Tek okuma yolu (1-D gather) da aynı sonucu vermeli
+    singles = np.concatenate([compiled.decision_function(row.reshape(1, -1)) for row in X[:200]])
+    assert np.max(np.abs(singles - compiled.decision_function(X[:200]))) <= MAX_DIFF
+    return parity
+
+
+def test_parity_scaler_only():
+    detector = fit_detector(n_features=4)
+    assert_parity(detector, CompiledForest.from_estimators(detector.model, detector.scaler))
+
+
+def test_parity_with_pca():
+    for whiten in (False, True):
+        detector = fit_detector(pca_components=4, whiten=whiten)
+        assert_parity(detector, CompiledForest.from_estimators(detector.model, detector.scaler, detector.pca))
+
+
+def test_parity_after_save_and_mmap_load():
+    detector = fit_detector(pca_components=4)
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'model.forest')
+        CompiledForest.from_estimators(detector.model, detector.scaler, detector.pca).save(path, {'source': 'test'})
+        for mmap_mode in ('r', None):
+            loaded = CompiledForest.load(path, mmap_mode=mmap_mode)
+            assert loaded.extra == {'source': 'test'}
+            assert_parity(detector, loaded)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    tests = [test_parity_scaler_only, test_parity_with_pca, test_parity_after_save_and_mmap_load]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
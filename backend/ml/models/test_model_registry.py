@@ -0,0 +1,168 @@
+"""
+model_registry testi - publish / versiyon sırası / keep ile silme, hive → apiary → global →
+default çözümlemesi, bellek bütçeli LRU ve kovan durumunun versiyon değişiminde /
+cache'ten bırakılmada korunması
+
+    python test_model_registry.py
+    python -m pytest test_model_registry.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from drift_monitor import DriftMonitor, FeatureStats
+from model_registry import ModelRegistry, registry_root
+
+MODEL_BYTES = 400 * 1024
+
+
+class FakeModel:
+    """Artifact içeriğini (tag) okuyan küçük model - registry'nin beklediği öznitelikler"""
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.tag = f.read()
+        self.path = path
+        self.baselines = {}
+        seed = 1 if self.tag.startswith('retrained') else 0
+        X = np.random.default_rng(seed).normal(size=(200, 2))
+        self.drift = DriftMonitor(FeatureStats.from_matrix(X, ['a', 'b']))
+
+    def memory_bytes(self):
+        return MODEL_BYTES
+
+
+def artifact(directory, tag):
+    path = os.path.join(directory, f"{tag}.src")
+    with open(path, 'w') as f:
+        f.write(tag)
+    return path
+
+
+def test_publish_versions_and_prune():
+    directory = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(os.path.join(directory, 'registry'), {'anomaly': FakeModel}, keep=2)
+        published = [registry.publish('anomaly', artifact(directory, f"m{i}"), 'hive', '107') for i in range(4)]
+        assert [version for version, _ in published] == [1, 2, 3, 4]
+        os.makedirs(published[2][1] + '.forest')
+        registry.publish('anomaly', artifact(directory, 'm4'), 'hive', '107')
+        versions = registry.versions('anomaly', 'hive', '107')
+        # keep=2: en eski versiyonlar (ve derlenmiş forest dizinleri) silinir, numaralar geri kullanılmaz
+        assert [version for version, _ in versions] == [4, 5]
+        assert not os.path.exists(published[2][1] + '.forest')
+        assert registry_root(versions[-1][1]) == os.path.abspath(registry.root)
+        assert registry_root(artifact(directory, 'x')) is None
+        for key in ('', '..', 'a/b'):
+            try:
+                registry.scope_dir('anomaly', 'hive', key)
+            except ValueError:
+                continue
+            raise AssertionError(f"Geçersiz anahtar kabul edildi: {key!r}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_resolve_order():
+    directory = tempfile.mkdtemp()
+    try:
+        default = artifact(directory, 'default')
+        registry = ModelRegistry(os.path.join(directory, 'registry'), {'anomaly': FakeModel},
+                                 refresh_interval=0, default_paths={'anomaly': default})
+        assert registry.get('anomaly', '107', 'north').tag == 'default'
+        registry.publish('anomaly', artifact(directory, 'global'))
+        registry.publish('anomaly', artifact(directory, 'north'), 'apiary', 'north')
+        registry.publish('anomaly', artifact(directory, 'hive107'), 'hive', '107')
+        assert registry.get('anomaly', '107', 'north').tag == 'hive107'
+        assert registry.get('anomaly', '108', 'north').tag == 'north'
+        assert registry.get('anomaly', '108', 'south').tag == 'global'
+        assert registry.get('anomaly').tag == 'global'
+
+        empty = ModelRegistry(os.path.join(directory, 'empty'), {'anomaly': FakeModel})
+        assert empty.resolve('anomaly', '107') is None
+        try:
+            empty.get('anomaly', '107')
+        except FileNotFoundError:
+            return
+        raise AssertionError("Model yokken FileNotFoundError bekleniyordu")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_resolution_cache_cleared_by_publish():
+    directory = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(os.path.join(directory, 'registry'), {'anomaly': FakeModel}, refresh_interval=3600)
+        registry.publish('anomaly', artifact(directory, 'v1'))
+        assert registry.get('anomaly', '107').tag == 'v1'
+        registry.publish('anomaly', artifact(directory, 'v2'))
+        assert registry.get('anomaly', '107').tag == 'v2'
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_lru_budget():
+    directory = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(os.path.join(directory, 'registry'), {'anomaly': FakeModel}, memory_budget_mb=1)
+        for hive in ('1', '2', '3'):
+            registry.publish('anomaly', artifact(directory, hive), 'hive', hive)
+        first = registry.get('anomaly', '1')
+        registry.get('anomaly', '2')
+        assert registry.get('anomaly', '1') is first  # İsabet - en son kullanılan olur
+        registry.get('anomaly', '3')                  # Bütçe 2 model: en uzun süre kullanılmayan ('2') bırakılır
+        info = registry.cache_info()
+        assert (info['models'], info['bytes'], info['evictions']) == (2, 2 * MODEL_BYTES, 1)
+        assert registry.get('anomaly', '1') is first
+        assert registry.cache_info()['loads'] == 3
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_state_survives_reload_and_eviction():
+    directory = tempfile.mkdtemp()
+    try:
+        registry = ModelRegistry(os.path.join(directory, 'registry'), {'anomaly': FakeModel},
+                                 memory_budget_mb=0.5, refresh_interval=0)
+        registry.publish('anomaly', artifact(directory, 'v1'), 'hive', '107')
+        registry.publish('anomaly', artifact(directory, 'other'), 'hive', '108')
+        model = registry.get('anomaly', '107')
+        model.baselines['107'] = 'warm'
+        monitor = model.drift
+
+        registry.get('anomaly', '108')  # Bütçe tek model - 107 bırakılır
+        reloaded = registry.get('anomaly', '107')
+        assert reloaded is not model
+        assert reloaded.baselines is model.baselines and reloaded.drift is monitor
+
+        # Yeni versiyon: kovan durumu taşınır; yeniden eğitimle referans değişince drift yeni başlar
+        registry.publish('anomaly', artifact(directory, 'retrained'), 'hive', '107')
+        retrained = registry.get('anomaly', '107')
+        assert retrained.tag == 'retrained' and retrained.baselines['107'] == 'warm'
+        assert retrained.drift is not monitor
+        assert registry.drift_monitors('anomaly') == [retrained.drift, registry.get('anomaly', '108').drift]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    tests = [test_publish_versions_and_prune, test_resolve_order, test_resolution_cache_cleared_by_publish,
+             test_lru_budget, test_state_survives_reload_and_eviction]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+online_detector testi - aynı / eski zaman damgalı okumanın baseline'a ikinci kez eklenmemesi,
+historical_data ile başlatmada güncel okumanın atlanması, ısınma ve sıçrama tespiti
+
+    python test_online_detector.py
+    python -m pytest test_online_detector.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from online_detector import CLIP_Z, WARMUP_READINGS, EwmaBaseline, HiveBaselines, OnlineAnomalyDetector, _epoch
+
+T0 = 1767225600.0  # 2026-01-01T00:00:00Z
+
+
+def reading(i, temperature=34.0, **extra):
+    return dict({'temperature': temperature + (i % 3) * 0.1, 'humidity': 60.0, 'weight': 40.0, 'gasLevel': 0.4,
+                 'timestamp': T0 + i * 300}, **extra)
+
+
+def count(baselines, hive_id):
+    return baselines.baseline(hive_id)['temperature']['count']
+
+
+def test_epoch_formats():
+    assert _epoch(T0) == T0
+    assert _epoch('2026-01-01T00:00:00Z') == T0
+    assert _epoch('2026-01-01T03:00:00+03:00') == T0
+    assert _epoch('2026-01-01T00:00:00') == T0  # Damgasız saat UTC sayılır
+    assert _epoch(None) is None and _epoch('dün') is None
+
+
+def test_duplicate_reading_is_scored_not_added():
+    baselines = HiveBaselines()
+    for i in range(5):
+        baselines.observe('107', reading(i))
+    assert count(baselines, '107') == 5
+    # Dashboard aynı son okumayı tekrar gönderir; daha eski bir okuma da gelebilir
+    zscores, _ = baselines.observe('107', reading(4))
+    baselines.observe('107', reading(2))
+    assert 'temperature' in zscores
+    assert count(baselines, '107') == 5
+    assert baselines.duplicates == 2
+    # timestamp parametresi okumadakini ezer
+    baselines.observe('107', reading(4), timestamp=T0 + 10 * 300)
+    assert count(baselines, '107') == 6
+
+
+def test_seed_excludes_current_reading():
+    history = [reading(i) for i in range(10)]
+    baselines = HiveBaselines()
+    # Güncel okuma geçmişin son kaydıyla aynı (aynı damga) - bir kez sayılır
+    baselines.observe('107', history[-1], historical_data=history)
+    assert count(baselines, '107') == 10
+    baselines.observe('107', history[-1], historical_data=history)
+    assert count(baselines, '107') == 10
+
+    # Güncel okumadan sonraki kayıtlar da başlatmaya girmez
+    baselines.observe('108', history[5], historical_data=history)
+    assert count(baselines, '108') == 6
+
+
+def test_seed_without_timestamps():
+    history = [{k: v for k, v in reading(i).items() if k != 'timestamp'} for i in range(10)]
+    baselines = HiveBaselines()
+    baselines.observe('107', dict(history[-1]), historical_data=history)
+    assert count(baselines, '107') == 10
+    baselines.observe('108', reading(99, temperature=30.0), historical_data=history)
+    assert count(baselines, '108') == 11
+
+
+def test_max_hives_evicts_least_recent():
+    baselines = HiveBaselines(max_hives=2)
+    for hive in ('a', 'b', 'a', 'c'):
+        baselines.observe(hive, reading(0))
+    assert 'a' in baselines and 'c' in baselines and 'b' not in baselines
+
+
+def test_ewma_clips_spikes_after_warmup():
+    baseline = EwmaBaseline(alpha=0.01, min_std=0.2)
+    for _ in range(WARMUP_READINGS):
+        baseline.update(34.0)
+    baseline.update(80.0)
+    # Sıçrama CLIP_Z * std kadar kırpılır - baseline sürüklenmez (kırpılmasa ~1.5 kayardı)
+    assert 0 < baseline.mean - 34.0 <= CLIP_Z * 0.2 / WARMUP_READINGS
+
+
+def test_detector_warmup_then_online():
+    directory = tempfile.mkdtemp()
+    try:
+        detector = OnlineAnomalyDetector(os.path.join(directory, 'missing.joblib'))
+        results = [detector.detect_anomalies(reading(i), hive_id='107') for i in range(WARMUP_READINGS + 5)]
+        assert results[0]['method'] == 'threshold_based'  # Isınma: eğitilmiş model yok → threshold
+        assert results[-1]['method'] == 'online_ewma' and not results[-1]['is_anomaly']
+        # Mutlak sınırların içinde ama kovanın kendi baseline'ına göre sıçrama
+        spike = detector.detect_anomalies(reading(WARMUP_READINGS + 5, temperature=38.0), hive_id='107')
+        assert spike['is_anomaly'] and spike['zscores']['temperature'] > 4.0
+        assert any('temperature deviates' in line for line in spike['analysis']['details'])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    tests = [test_epoch_formats, test_duplicate_reading_is_scored_not_added, test_seed_excludes_current_reading,
+             test_seed_without_timestamps, test_max_hives_evicts_least_recent, test_ewma_clips_spikes_after_warmup,
+             test_detector_warmup_then_online]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,57 @@
+# pandas / scikit-learn / joblib sadece ML tahmin yolunda (>= 10 kayıt) import edilir;
+# basit trend analizi bunları hiç yüklemez
 import numpy as np
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score
-import joblib
 import json
+import copy
 import sys
 import os
 from datetime import datetime, timedelta
+from rolling_features import RollingSlope
 
 class TrendPredictor:
     def __init__(self, model_path=None):
+        # Estimator'lar ilk ML tahmininde (ya da is_trained sorgulanınca) oluşturulur / yüklenir
+        self.weight_model = None
+        self.temp_model = None
+        self.humidity_model = None
+        self.battery_model = None
+        
+        self._is_trained = False
+        self._models_ready = False
+        self.model_path = model_path or 'trend_models.joblib'
+    
+    @property
+    def is_trained(self):
+        self._ensure_models()
+        return self._is_trained
+    
+    @is_trained.setter
+    def is_trained(self, value):
+        self._is_trained = value
+    
+    def _ensure_models(self):
+        """Varsayılan estimator'ları oluştur, model varsa yükle"""
+        if self._models_ready:
+            return
+        self._models_ready = True
+        from sklearn.linear_model import LinearRegression
+        from sklearn.ensemble import RandomForestRegressor
+        
         self.weight_model = RandomForestRegressor(n_estimators=50, random_state=42)
         self.temp_model = LinearRegression()
         self.humidity_model = LinearRegression()
         self.battery_model = LinearRegression()
         
-        self.is_trained = False
-        self.model_path = model_path or 'trend_models.joblib'
-        
         # Model varsa yükle
         if os.path.exists(self.model_path):
             self.load_models()
     
     def load_models(self):
         """Eğitilmiş modelleri yükle"""
+        import joblib
+        
         try:
-            models = joblib.load(self.model_path)
+            models = joblib.load(self.model_path, mmap_mode='r')
             self.weight_model = models.get('weight_model', self.weight_model)
             self.temp_model = models.get('temp_model', self.temp_model)
             self.humidity_model = models.get('humidity_model', self.humidity_model)
@@ -39,6 +64,9 @@ class TrendPredictor:
     
     def save_models(self):
         """Modelleri kaydet"""
+        import joblib
+        
+        self._ensure_models()
         try:
             models = {
                 'weight_model': self.weight_model,
@@ -51,8 +79,22 @@ class TrendPredictor:
         except Exception as e:
             print(f"❌ Could not save models: {str(e)}")
     
+    def fork(self):
+        """İstek başına kopya - predict_*_trend modelleri her çağrıda yeniden fit eder,
+        daemon'da eşzamanlı istekler aynı estimator'ları paylaşmamalı"""
+        from sklearn.base import clone
+        
+        self._ensure_models()
+        predictor = copy.copy(self)
+        predictor.weight_model = clone(self.weight_model)
+        predictor.temp_model = clone(self.temp_model)
+        predictor.humidity_model = clone(self.humidity_model)
+        predictor.battery_model = clone(self.battery_model)
+        return predictor
+    
     def prepare_time_features(self, df):
         """Zaman-based feature'ları hazırla"""
+        import pandas as pd
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         df = df.sort_values('timestamp')
         
@@ -82,6 +124,8 @@ class TrendPredictor:
             if len(historical_data) < 10:
                 return self.simple_trend_analysis(historical_data)
             
+            import pandas as pd
+            self._ensure_models()
             df = pd.DataFrame(historical_data)
             df = self.prepare_time_features(df)
             
@@ -132,6 +176,7 @@ class TrendPredictor:
     
     def predict_weight_trend(self, df, days):
         """Kovan ağırlık trendi tahmin et"""
+        import pandas as pd
         if 'weight' not in df.columns or len(df) < 5:
             return {"error": "Insufficient weight data"}
         
@@ -202,6 +247,8 @@ class TrendPredictor:
             
             # Confidence based on model performance
             if len(y) > 10:
+                from sklearn.metrics import r2_score
+                
                 y_pred = self.weight_model.predict(X)
                 r2 = r2_score(y, y_pred)
                 confidence = max(0.3, min(0.95, r2))
@@ -323,20 +370,17 @@ class TrendPredictor:
         }
     
     def analyze_trend(self, series):
-        """Series için trend analizi"""
-        if len(series) < 3:
-            return {"direction": "unknown", "strength": 0}
+        """Series için trend analizi
         
-        # Linear trend
-        x = np.arange(len(series))
-        coeffs = np.polyfit(x, series, 1)
-        slope = coeffs[0]
+        series: değerler (tüm seri) ya da streaming bir RollingSlope penceresi. Eğim ve R²
+        np.polyfit ile aynıdır, tek geçişte toplamlardan hesaplanır.
+        """
+        window = series if isinstance(series, RollingSlope) else RollingSlope.from_values(series)
+        if len(window) < 3:
+            return {"direction": "unknown", "strength": 0}
         
-        # Trend strength (R-squared)
-        y_pred = np.polyval(coeffs, x)
-        ss_res = np.sum((series - y_pred) ** 2)
-        ss_tot = np.sum((series - np.mean(series)) ** 2)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+        stats = window.stats()
+        slope = stats["slope"]
         
         # Direction
         if abs(slope) < 0.01:
@@ -349,8 +393,8 @@ class TrendPredictor:
         return {
             "direction": direction,
             "slope": float(slope),
-            "strength": float(r_squared),
-            "volatility": float(np.std(series))
+            "strength": float(stats["r_squared"]),
+            "volatility": float(stats["std"])
         }
     
     def calculate_statistics(self, series):
@@ -413,40 +457,52 @@ class TrendPredictor:
         if len(historical_data) < 2:
             return {"error": "Insufficient data for analysis"}
         
-        df = pd.DataFrame(historical_data)
-        
         result = {
             "method": "simple_analysis",
             "statistics": {},
             "trends": {}
         }
         
+        # DataFrame(...)[col].dropna() ile aynı seri: eksik (None / NaN) değerler atlanır
         for col in ['temperature', 'humidity', 'weight', 'batteryLevel']:
-            if col in df.columns:
-                series = df[col].dropna()
-                if len(series) > 1:
-                    result["statistics"][col] = self.calculate_statistics(series)
-                    result["trends"][col] = self.analyze_trend(series)
+            values = [record[col] for record in historical_data if record.get(col) is not None]
+            series = np.asarray(values, dtype=float)
+            series = series[~np.isnan(series)]
+            if len(series) > 1:
+                result["statistics"][col] = self.calculate_statistics(series)
+                result["trends"][col] = self.analyze_trend(series)
         
         return result
 
+def predict_request(predictor, input_data):
+    """CLI / daemon isteğini cevapla: {"historicalData": [...], "forecastDays": 7}"""
+    # Historical data
+    historical_data = input_data.get('historicalData', [])
+    forecast_days = input_data.get('forecastDays', 7)
+    
+    # Predictions yap
+    return predictor.predict_trends(historical_data, forecast_days)
+
 def main():
     """Command line interface"""
     if len(sys.argv) < 2:
         print(json.dumps({"error": "No input data provided"}))
         return
     
+    if sys.argv[1] == '--serve':
+        # Daemon modu: modeller bir kez yüklenir, istekler NDJSON ile cevaplanır
+        from scoring_server import serve
+        serve(sys.argv[1:], TrendPredictor,
+              lambda predictor, input_data: predict_request(predictor.fork(), input_data),
+              'trend_models.joblib', 8766, 'trend')
+        return
+    
     try:
         input_data = json.loads(sys.argv[1])
         
         predictor = TrendPredictor()
         
-        # Historical data
-        historical_data = input_data.get('historicalData', [])
-        forecast_days = input_data.get('forecastDays', 7)
-        
-        # Predictions yap
-        result = predictor.predict_trends(historical_data, forecast_days)
+        result = predict_request(predictor, input_data)
         
         print(json.dumps(result))
         
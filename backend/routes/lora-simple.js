@@ -58,7 +58,8 @@ router.post('/data', [
             metadata: {
                 source: 'coordinator',
                 routerId,
-                sensorId
+                sensorId,
+                ...(req.body.anomaly && { anomaly: req.body.anomaly })
             }
         });
 
@@ -84,4 +85,98 @@ router.post('/data', [
     }
 });
 
+// @route   POST /api/lora/batch
+// @desc    Coordinator'dan gelen toplu veriyi al (tek istek, tek insertMany)
+// @access  Public
+// @body    { "readings": [ { deviceId, routerId, sensorId, sensorData, timestamp, ... } ] }
+router.post('/batch', async (req, res) => {
+    try {
+        const { readings } = req.body;
+
+        if (!readings || !Array.isArray(readings)) {
+            return res.status(400).json({
+                success: false,
+                message: 'readings array gerekli'
+            });
+        }
+
+        console.log('📦 LoRa batch received:', readings.length, 'readings');
+
+        // Her router/device çifti için sensörü bir kez bul
+        const sensorCache = new Map();
+        const documents = [];
+        let skipped = 0;
+
+        for (const reading of readings) {
+            const { deviceId, routerId, sensorId, sensorData, timestamp } = reading || {};
+
+            if (!deviceId || !routerId || !sensorData || typeof sensorData !== 'object') {
+                skipped++;
+                continue;
+            }
+
+            const cacheKey = `${routerId}|${deviceId}`;
+            if (!sensorCache.has(cacheKey)) {
+                sensorCache.set(cacheKey, await Sensor.findOne({ routerId, deviceId }));
+            }
+            const sensor = sensorCache.get(cacheKey);
+
+            if (!sensor) {
+                skipped++;
+                continue;
+            }
+
+            documents.push({
+                sensorId: sensor._id,
+                data: sensorData,
+                timestamp: timestamp || new Date(),
+                batteryLevel: reading.batteryLevel || 85,
+                signalStrength: reading.signalStrength || -65,
+                metadata: {
+                    source: 'coordinator',
+                    routerId,
+                    sensorId,
+                    ...(reading.anomaly && { anomaly: reading.anomaly })
+                }
+            });
+        }
+
+        // Toplu insert - geçersiz kayıtlar diğerlerini engellemesin
+        let saved = 0;
+        if (documents.length > 0) {
+            try {
+                const result = await SensorReading.insertMany(documents, { ordered: false });
+                saved = result.length;
+            } catch (error) {
+                if (!error.insertedDocs) {
+                    throw error;
+                }
+                saved = error.insertedDocs.length;
+                skipped += documents.length - saved;
+            }
+        }
+
+        console.log(`✅ LoRa batch saved: ${saved}, skipped: ${skipped}`);
+
+        res.json({
+            success: true,
+            message: `${saved} sensör verisi kaydedildi`,
+            data: {
+                received: readings.length,
+                saved,
+                skipped,
+                receivedAt: new Date()
+            }
+        });
+
+    } catch (error) {
+        console.error('❌ LoRa batch processing error:', error);
+        res.status(500).json({
+            success: false,
+            message: 'Toplu veri işleme hatası',
+            error: error.message
+        });
+    }
+});
+
 module.exports = router;
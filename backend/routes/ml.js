@@ -70,6 +70,7 @@ router.post('/analyze', auth, async (req, res) => {
         const mlResults = await mlProcessor.analyzeData({
             deviceId: deviceId,
             sensorData: latestReading.data,
+            timestamp: latestReading.timestamp,
             historicalData: historicalData
         });
 
@@ -214,6 +214,7 @@ class LoRaDataProcessor {
             const mlResults = await this.mlProcessor.analyzeData({
                 deviceId: wirelessData.deviceId,
                 sensorData: wirelessData.sensorData,
+                timestamp: readingData.timestamp,
                 historicalData: historicalData
             });
 
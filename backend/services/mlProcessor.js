@@ -1,6 +1,19 @@
 const { spawn } = require('child_process');
+const http = require('http');
 const path = require('path');
 
+// Python ML daemon'ları süreç başına bir kez başlatılır (her MLProcessor instance'ı paylaşır)
+const ML_DAEMONS = {
+    // ML_ANOMALY_ONLINE=on: kovan bazında artımlı (EWMA) detector, aynı sonuç şeması
+    anomaly: {
+        script: process.env.ML_ANOMALY_ONLINE === 'on' ? 'online_detector.py' : 'anomaly_detector.py',
+        port: parseInt(process.env.ML_ANOMALY_PORT || '8765')
+    },
+    trend: { script: 'trend_predictor.py', port: parseInt(process.env.ML_TREND_PORT || '8766') }
+};
+const ML_REQUEST_TIMEOUT = 5000;
+const daemonProcesses = {};
+
 /**
  * Machine Learning Processor Service
  */
@@ -24,6 +37,7 @@ class MLProcessor {
                 this.pythonPath = pythonPath;
                 this.isInitialized = true;
                 console.log(`🧠 ML Processor initialized successfully with Python: ${pythonPath}`);
+                this.startDaemons();
                 return;
             } catch (error) {
                 continue;
@@ -52,6 +66,110 @@ class MLProcessor {
         });
     }
 
+    /**
+     * Scoring daemon'larını başlat - modeller bir kez yüklenir, istekler HTTP/NDJSON ile gider
+     * ML_DAEMONS=off ile kapatılır; port zaten doluysa (başka bir süreç başlatmışsa) o kullanılır.
+     */
+    startDaemons() {
+        if (process.env.ML_DAEMONS === 'off') {
+            return;
+        }
+
+        for (const [name, daemon] of Object.entries(ML_DAEMONS)) {
+            if (daemonProcesses[name]) {
+                continue;
+            }
+
+            const args = [path.join(this.modelsPath, daemon.script), '--serve', '--port', String(daemon.port)];
+            if (process.env.ML_REGISTRY_DIR) {
+                // Kovan bazında modeller (model_registry.py) - istekteki hiveId'ye göre seçilir
+                args.push('--registry', process.env.ML_REGISTRY_DIR);
+            }
+
+            const child = spawn(this.pythonPath, args, { cwd: this.modelsPath, stdio: ['ignore', 'ignore', 'pipe'] });
+
+            child.stderr.on('data', (chunk) => {
+                console.log(`🧠 [${name}] ${chunk.toString().trim()}`);
+            });
+            child.on('error', (error) => {
+                console.error(`❌ ML daemon (${name}) başlatılamadı:`, error.message);
+            });
+            child.on('exit', (code) => {
+                console.log(`⚠️ ML daemon (${name}) kapandı (code ${code})`);
+                if (daemonProcesses[name] === child) {
+                    delete daemonProcesses[name];
+                }
+            });
+
+            daemonProcesses[name] = child;
+        }
+
+        if (!MLProcessor.exitHookInstalled) {
+            MLProcessor.exitHookInstalled = true;
+            process.on('exit', () => {
+                Object.values(daemonProcesses).forEach(child => child.kill());
+            });
+        }
+    }
+
+    /**
+     * Daemon'a tek bir NDJSON isteği gönder - cevap objesini döner
+     */
+    requestDaemon(name, payload) {
+        return new Promise((resolve, reject) => {
+            const body = JSON.stringify(payload) + '\n';
+            const req = http.request({
+                host: '127.0.0.1',
+                port: ML_DAEMONS[name].port,
+                path: '/score',
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-ndjson',
+                    'Content-Length': Buffer.byteLength(body)
+                },
+                timeout: ML_REQUEST_TIMEOUT
+            }, (res) => {
+                let data = '';
+                res.setEncoding('utf8');
+                res.on('data', (chunk) => { data += chunk; });
+                res.on('end', () => {
+                    try {
+                        const result = JSON.parse(data.split('\n')[0]);
+                        if (res.statusCode !== 200 || result.error) {
+                            reject(new Error(result.error || `ML daemon HTTP ${res.statusCode}`));
+                        } else {
+                            resolve(result);
+                        }
+                    } catch (error) {
+                        reject(error);
+                    }
+                });
+            });
+
+            req.on('timeout', () => req.destroy(new Error('ML daemon timeout')));
+            req.on('error', reject);
+            req.end(body);
+        });
+    }
+
+    /**
+     * SensorReading dokümanlarını Python modüllerinin beklediği düz kayıtlara çevir
+     */
+    toHistoricalRecords(historicalData) {
+        if (!Array.isArray(historicalData)) {
+            return [];
+        }
+
+        return historicalData.map(reading => {
+            const values = reading.data instanceof Map ? Object.fromEntries(reading.data) : (reading.data || {});
+            return {
+                timestamp: reading.timestamp,
+                ...values,
+                ...(reading.batteryLevel !== undefined && { batteryLevel: reading.batteryLevel })
+            };
+        });
+    }
+
     /**
      * Geçmiş verileri al (ML analizi için)
      */
@@ -111,10 +229,82 @@ class MLProcessor {
 
     async detectAnomalies(data) {
         const sensorReading = Array.isArray(data) ? data[0] : data;
+
+        if (this.isInitialized && sensorReading.sensorData) {
+            try {
+                const result = await this.requestDaemon('anomaly', {
+                    hiveId: sensorReading.deviceId,
+                    sensorData: sensorReading.sensorData,
+                    // Online detector aynı okumayı (aynı damga) baseline'a tekrar eklemez
+                    timestamp: sensorReading.timestamp,
+                    historicalData: this.toHistoricalRecords(sensorReading.historicalData)
+                });
+                return {
+                    anomalies: this.toAnomalyObjects(result, sensorReading.sensorData),
+                    anomalyScore: result.anomaly_score,
+                    isAnomalous: result.is_anomaly,
+                    confidence: result.confidence,
+                    method: result.method,
+                    message: result.analysis ? result.analysis.summary : ''
+                };
+            } catch (error) {
+                console.log('⚠️ ML anomaly daemon kullanılamadı, fallback:', error.message);
+            }
+        }
+
         return this.fallbackAnomalyDetection(sensorReading.sensorData);
     }
 
+    /**
+     * Daemon sonucunu fallbackAnomalyDetection ile aynı şekle çevir: [{ parameter, value, threshold, severity }]
+     * Tüketiciler daemon'ın açık olup olmadığına göre farklı şekil görmesin.
+     */
+    toAnomalyObjects(result, sensorData) {
+        const values = sensorData instanceof Map ? Object.fromEntries(sensorData) : (sensorData || {});
+        if (!result.is_anomaly) {
+            return [];
+        }
+
+        // Mutlak sınır aşımları - fallback ile aynı eşikler
+        const anomalies = this.fallbackAnomalyDetection(values).anomalies;
+        const seen = new Set(anomalies.map(anomaly => anomaly.parameter));
+        const severity = result.confidence >= 0.5 ? 'high' : 'medium';
+        const add = (parameter) => {
+            if (!seen.has(parameter) && values[parameter] !== undefined) {
+                seen.add(parameter);
+                anomalies.push({ parameter, value: values[parameter], threshold: null, severity });
+            }
+        };
+
+        // Threshold yöntemi: "extreme_weight" → weight
+        (result.anomalies || []).forEach(name => add(String(name).replace(/^extreme_/, '')));
+
+        // Model kararı: en çok sapan parametre(ler) - online detector'da importance = z / Z_THRESHOLD
+        if (anomalies.length === 0) {
+            const importance = result.feature_importance || {};
+            const ranked = Object.keys(importance)
+                .filter(parameter => values[parameter] !== undefined)
+                .sort((a, b) => importance[b] - importance[a]);
+            const flagged = ranked.filter(parameter => importance[parameter] >= 1);
+            (flagged.length > 0 ? flagged : ranked.slice(0, 1)).forEach(add);
+        }
+
+        return anomalies;
+    }
+
     async predictTrends(data) {
+        if (this.isInitialized && data && Array.isArray(data.historicalData)) {
+            try {
+                return await this.requestDaemon('trend', {
+                    hiveId: data.deviceId,
+                    historicalData: this.toHistoricalRecords(data.historicalData),
+                    forecastDays: data.forecastDays || 7
+                });
+            } catch (error) {
+                console.log('⚠️ ML trend daemon kullanılamadı, fallback:', error.message);
+            }
+        }
+
         return this.fallbackTrendAnalysis(data);
     }
 
@@ -0,0 +1,55 @@
+"""
+BeeTwin PC Coordinator yardımcı modülleri
+pc_coordinator_text.py tarafından kullanılan okuma / gönderim altyapısı
+"""
+
+from .binary import decode_frame, encode_frame, is_binary_frame
+from .coalesce import Coalescer
+from .deadband import DeadbandFilter
+from .framing import LineFramer
+from .gateway import GatewayReader, run_gateways
+from .history import RouterHistory
+from .http_client import BackendClient, CircuitBreaker, CircuitOpenError
+from .log import RateLimitFilter, setup_logging
+from .metrics import MetricsRegistry, MetricsServer, RateMeter
+from .pipeline import UploadPipeline
+from .prescreen import AnomalyPrescreen, load_anomaly_detector
+from .protocol import Record, parse_frame
+from .replay import CaptureWriter, ReplaySerial, StubBackend, load_capture
+from .scheduler import PriorityQueues, PriorityRules
+from .serial_reader import SerialReaderThread
+from .spool import DiskSpool, SpoolReplayer
+
+__all__ = [
+    'decode_frame',
+    'encode_frame',
+    'is_binary_frame',
+    'Coalescer',
+    'DeadbandFilter',
+    'LineFramer',
+    'GatewayReader',
+    'run_gateways',
+    'RouterHistory',
+    'BackendClient',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'RateLimitFilter',
+    'setup_logging',
+    'MetricsRegistry',
+    'MetricsServer',
+    'RateMeter',
+    'UploadPipeline',
+    'AnomalyPrescreen',
+    'load_anomaly_detector',
+    'Record',
+    'parse_frame',
+    'CaptureWriter',
+    'ReplaySerial',
+    'StubBackend',
+    'load_capture',
+    'PriorityQueues',
+    'PriorityRules',
+    'SerialReaderThread',
+    'DiskSpool',
+    'SpoolReplayer',
+]
@@ -0,0 +1,148 @@
+"""
+Kompakt binary LoRa frame (v1) - text satırla aynı okumayı ~1/3 boyutta taşır
+
+    offset  boyut  alan
+    0       2      magic 0xBE 0x57 (yazdırılamaz byte'lar - text satırlarla karışmaz)
+    2       1      versiyon (1)
+    3       1      N = payload uzunluğu (byte 4'ten CRC'ye kadar)
+    4       2      router ID   (uint16, big-endian)
+    6       2      sensor ID   (uint16, big-endian)
+    8       2      key bitmap  (bit i → KEY_TABLE[i])
+    10      ...    değerler, bitmap'teki bit sırasıyla, fixed-point (ham / scale)
+    4+N     2      CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), byte 2..4+N üzerinden
+
+Örnek: RID:107; SID:1013; WT: 25.83 text'te 30 byte, binary'de 14 byte:
+    BE 57 01 08 00 6B 03 F5 00 01 0A 17 CRC CRC
+
+Tüm alanlar big-endian. Bilinmeyen versiyon, uzunluk ya da CRC hatası frame'i geçersiz kılar.
+Yeni key eklemek yeni bir bit demektir; var olan bitlerin anlamı değiştirilmez.
+"""
+
+import struct
+from binascii import crc_hqx
+from operator import truediv
+
+MAGIC = b'\xbe\x57'
+VERSION = 1
+HEADER_SIZE = 4                 # magic + versiyon + uzunluk
+CRC_SIZE = 2
+
+# bit → (key, struct kodu, scale)
+KEY_TABLE = (
+    ('WT', 'h', 100),     # 0  sıcaklık °C       ±327.67
+    ('WH', 'H', 100),     # 1  nem %             0..655.35
+    ('PR', 'H', 10),      # 2  basınç hPa        0..6553.5
+    ('AL', 'h', 1),       # 3  rakım m           ±32767
+    ('WG', 'i', 1000),    # 4  ağırlık kg        gram çözünürlük
+    ('CO', 'H', 10),      # 5  CO ppm            0..6553.5
+    ('NO', 'H', 100),     # 6  NO2 ppm           0..655.35
+    ('VB', 'H', 100),     # 7  titreşim
+    ('SD', 'H', 10),      # 8  ses dB
+    ('LT', 'I', 10),      # 9  ışık lux          0..429496729.5
+    ('UV', 'H', 100),     # 10 UV indeksi
+    ('PH', 'H', 100),     # 11 pH
+    ('MS', 'H', 10),      # 12 toprak nemi %
+    ('GS', 'H', 10),      # 13 gaz seviyesi
+    ('LPG', 'H', 10),     # 14 LPG ppm
+)                         # bit 15 ayrılmış
+
+MAX_PAYLOAD = 6 + sum(struct.calcsize(code) for _, code, _ in KEY_TABLE)  # tüm key'ler dolu
+
+_KEY_BITS = {key: bit for bit, (key, _, _) in enumerate(KEY_TABLE)}
+_RANGES = {code: (-(1 << (8 * struct.calcsize(code) - 1)), (1 << (8 * struct.calcsize(code) - 1)) - 1)
+           if code.islower() else (0, (1 << (8 * struct.calcsize(code))) - 1)
+           for code in 'hHiI'}
+
+_IDS = struct.Struct('>HHH')
+_MIN_FRAME = HEADER_SIZE + _IDS.size + CRC_SIZE
+_CRC = struct.Struct('>H')
+_layouts = {}   # bitmap → (Struct, keys, scales) - en fazla 2^15, pratikte birkaç tane
+_ids = {}       # uint16 ID → str
+
+
+def _layout(bitmap):
+    layout = _layouts.get(bitmap)
+    if layout is None:
+        if bitmap >> len(KEY_TABLE):
+            return None
+        entries = [KEY_TABLE[bit] for bit in range(len(KEY_TABLE)) if bitmap >> bit & 1]
+        layout = (
+            struct.Struct('>' + ''.join(code for _, code, _ in entries)),
+            tuple(key for key, _, _ in entries),
+            tuple(scale for _, _, scale in entries)
+        )
+        _layouts[bitmap] = layout
+    return layout
+
+
+def _id(value):
+    text = _ids.get(value)
+    if text is None:
+        text = _ids[value] = str(value)
+    return text
+
+
+def is_binary_frame(frame):
+    return frame[:2] == MAGIC
+
+
+def frame_size(header):
+    """Header'ın ilk 4 byte'ından toplam frame boyutu - desteklenmiyorsa None"""
+    if header[2] != VERSION or not 6 <= header[3] <= MAX_PAYLOAD:
+        return None
+    return HEADER_SIZE + header[3] + CRC_SIZE
+
+
+def crc_ok(frame):
+    return crc_hqx(frame[2:-CRC_SIZE], 0xFFFF) == _CRC.unpack_from(frame, len(frame) - CRC_SIZE)[0]
+
+
+def decode_frame(frame):
+    """Binary frame'i (router, sensor, ((key, value), ...)) olarak çöz - geçersizse None
+
+    struct.unpack_from doğrudan frame buffer'ı üzerinde çalışır; ara str ya da dilim üretilmez
+    (sadece CRC için 2..-2 aralığı).
+    """
+    size = len(frame)
+    if (size < _MIN_FRAME or frame[:2] != MAGIC or frame[2] != VERSION
+            or frame[3] != size - HEADER_SIZE - CRC_SIZE):
+        return None
+    if crc_hqx(frame[2:-CRC_SIZE], 0xFFFF) != _CRC.unpack_from(frame, size - CRC_SIZE)[0]:
+        return None
+
+    router, sensor, bitmap = _IDS.unpack_from(frame, HEADER_SIZE)
+    layout = _layouts.get(bitmap) or _layout(bitmap)
+    if layout is None or not bitmap or layout[0].size != size - _MIN_FRAME:
+        return None
+    values = layout[0].unpack_from(frame, HEADER_SIZE + _IDS.size)
+    if len(values) == 1:
+        fields = ((layout[1][0], values[0] / layout[2][0]),)
+    else:
+        fields = tuple(zip(layout[1], map(truediv, values, layout[2])))
+    return _ids.get(router) or _id(router), _ids.get(sensor) or _id(sensor), fields
+
+
+def encode_frame(router, sensor, data):
+    """Router firmware'inin üreteceği frame'i oluştur (replay / test verisi için)
+
+    router, sensor: 0..65535 (int ya da '107' gibi str), data: {key: değer}
+    """
+    bitmap = 0
+    for key in data:
+        if key not in _KEY_BITS:
+            raise ValueError(f"Binary frame'de tanımsız key: {key}")
+        bitmap |= 1 << _KEY_BITS[key]
+    if not bitmap:
+        raise ValueError("Binary frame en az bir değer içermeli")
+
+    raw = []
+    for key, code, scale in (KEY_TABLE[bit] for bit in range(len(KEY_TABLE)) if bitmap >> bit & 1):
+        value = round(data[key] * scale)
+        low, high = _RANGES[code]
+        if not low <= value <= high:
+            raise ValueError(f"{key}={data[key]} binary aralığın dışında")
+        raw.append(value)
+
+    body = _IDS.pack(int(router), int(sensor), bitmap) + _layout(bitmap)[0].pack(*raw)
+    head = bytes((VERSION, len(body)))
+    return MAGIC + head + body + _CRC.pack(crc_hqx(head + body, 0xFFFF))
@@ -0,0 +1,122 @@
+"""
+Coalescer - Router'ların tek tek gönderdiği key'leri tek bir okumada birleştirir
+Router 107 bir döngüde WT, PR, AL, WH satırlarını ayrı ayrı yollar; backend'e
+bunların hepsini içeren tek bir sensorData gider.
+
+Bir router/sensor için bekleyen okuma şu durumlarda gönderilir:
+  - beklenen key seti tamamlandığında (config'den ya da önceki döngülerden öğrenilir)
+  - aynı key tekrar geldiğinde (yeni döngü başladı demektir)
+  - ilk alandan itibaren window saniye geçtiğinde
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ('payload', 'started')
+
+    def __init__(self, payload, started):
+        self.payload = payload
+        self.started = started
+
+
+class Coalescer:
+    """Router/sensor bazında kısa süreli birleştirme penceresi"""
+
+    def __init__(self, emit, window=3.0, expected_keys=None, learn_keys=True):
+        self.emit = emit
+        self.window = window
+        self.expected_keys = {
+            router: frozenset(keys) for router, keys in (expected_keys or {}).items()
+        }
+        self.learn_keys = learn_keys
+        self._learned = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {
+            'fields_in': 0,
+            'readings_out': 0
+        }
+
+    def start(self):
+        """Süresi dolan pencereleri gönderen arka plan thread'i"""
+        self._thread = threading.Thread(target=self._run, name="coalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Thread'i durdur ve bekleyen tüm okumaları gönder"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2.0)
+        self.flush_all()
+
+    def add(self, payload):
+        """Yeni parse edilmiş payload'ı ilgili router'ın penceresine ekle"""
+        key = (payload['router'], payload['sensor'])
+        ready = []
+
+        with self._lock:
+            self.stats['fields_in'] += len(payload['data'])
+            pending = self._pending.get(key)
+
+            if pending is not None and not pending.payload['data'].keys().isdisjoint(payload['data']):
+                # Aynı key tekrar geldi - önceki döngüyü kapat
+                ready.append(self._close(key))
+                pending = None
+
+            if pending is None:
+                merged = dict(payload)
+                merged['data'] = dict(payload['data'])
+                self._pending[key] = _Pending(merged, time.monotonic())
+            else:
+                data = pending.payload['data']
+                pending.payload.update(payload)
+                data.update(payload['data'])
+                pending.payload['data'] = data
+
+            expected = self.expected_keys.get(key[0]) or self._learned.get(key)
+            if expected and expected.issubset(self._pending[key].payload['data']):
+                ready.append(self._close(key))
+
+        for merged in ready:
+            self.emit(merged)
+
+    def flush_expired(self, now=None):
+        """Penceresi dolan okumaları gönder"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [key for key, p in self._pending.items() if now - p.started >= self.window]
+            ready = [self._close(key) for key in expired]
+        for merged in ready:
+            self.emit(merged)
+
+    def flush_all(self):
+        with self._lock:
+            ready = [self._close(key) for key in list(self._pending)]
+        for merged in ready:
+            self.emit(merged)
+
+    def _close(self, key):
+        payload = self._pending.pop(key).payload
+        if self.learn_keys and key[0] not in self.expected_keys:
+            # Bir döngüde görülen en geniş key setini hatırla
+            keys = frozenset(payload['data'])
+            learned = self._learned.get(key)
+            if learned is None or not keys.issubset(learned):
+                self._learned[key] = keys | learned if learned else keys
+        self.stats['readings_out'] += 1
+        return payload
+
+    def _run(self):
+        interval = max(0.05, self.window / 4)
+        while not self._stop.wait(interval):
+            try:
+                self.flush_expired()
+            except Exception as e:
+                logger.error("❌ Coalescer hatası: %s", e)
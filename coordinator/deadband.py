@@ -0,0 +1,74 @@
+"""
+Deadband filtresi - Anlamlı değişmeyen sensör değerlerini backend'e göndermez
+Basınç, yükseklik, gece ağırlığı gibi neredeyse sabit değerler için her key'e
+mutlak (abs) ve/veya göreli (rel) bir eşik tanımlanır. Değer eşik kadar değişmediyse
+alan bastırılır; ancak heartbeat süresi dolduysa değişmese de gönderilir.
+"""
+
+import threading
+import time
+
+
+class DeadbandFilter:
+    """Router/sensor/key bazında değişim bastırma
+
+    rules: {'PR': {'abs': 0.5}, 'WH': {'rel': 0.02}, ...} - kuralı olmayan key'ler her zaman geçer
+    state: {(router, sensor): {key: (son_gönderilen_değer, zaman)}} - dışarıdan verilebilir
+    """
+
+    def __init__(self, rules, heartbeat=600.0, state=None):
+        self.rules = rules
+        self.heartbeat = heartbeat
+        self.state = state if state is not None else {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'fields_in': 0,
+            'fields_suppressed': 0,
+            'readings_suppressed': 0,
+            'suppressed_by_key': {}
+        }
+
+    def filter(self, payload, now=None):
+        """Payload'dan değişmeyen alanları çıkar - hiç alan kalmazsa None döner"""
+        now = time.monotonic() if now is None else now
+        data = payload['data']
+        forwarded = {}
+
+        with self._lock:
+            last_sent = self.state.setdefault((payload['router'], payload['sensor']), {})
+            self.stats['fields_in'] += len(data)
+
+            for key, value in data.items():
+                rule = self.rules.get(key)
+                last = last_sent.get(key)
+                if rule is None or last is None or self._changed(rule, last[0], value) \
+                        or now - last[1] >= self.heartbeat:
+                    forwarded[key] = value
+                    last_sent[key] = (value, now)
+                else:
+                    self.stats['fields_suppressed'] += 1
+                    by_key = self.stats['suppressed_by_key']
+                    by_key[key] = by_key.get(key, 0) + 1
+
+            if not forwarded:
+                self.stats['readings_suppressed'] += 1
+                return None
+
+        if len(forwarded) == len(data):
+            return payload
+        filtered = dict(payload)
+        filtered['data'] = forwarded
+        return filtered
+
+    def _changed(self, rule, last, value):
+        delta = abs(value - last)
+        if delta == 0:
+            return False
+        if delta >= rule.get('abs', float('inf')):
+            return True
+        return delta >= rule.get('rel', float('inf')) * abs(last)
+
+    def savings(self):
+        """Bastırılan alan oranı (0-1)"""
+        fields_in = self.stats['fields_in']
+        return self.stats['fields_suppressed'] / fields_in if fields_in else 0.0
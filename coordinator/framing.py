@@ -0,0 +1,145 @@
+"""
+Serial framing - Gelen byte akışını satır (frame) bazında böler
+Yarım kalan satırlar bir sonraki okumaya taşınır, bozuk frame'ler raporlanıp atlanır
+binary=True ise magic byte'larla başlayan binary frame'ler (coordinator/binary.py)
+uzunluk alanına göre ayrılır; aynı port üzerinde text ve binary router'lar karışık olabilir.
+"""
+
+from .binary import HEADER_SIZE, MAGIC, crc_ok, frame_size
+
+# Text protokolünde izin verilen byte'lar: yazdırılabilir ASCII + tab
+_PRINTABLE = frozenset(range(0x20, 0x7f)) | {0x09}
+
+FRAME_TOO_LONG = 'too_long'
+FRAME_INVALID_BYTES = 'invalid_bytes'
+FRAME_LEADING_JUNK = 'leading_junk'
+FRAME_BAD_HEADER = 'bad_header'
+FRAME_BAD_CRC = 'bad_crc'
+
+
+class LineFramer:
+    """Incremental newline framer
+
+    feed() her çağrıda tamamlanmış frame'leri (\\r\\n temizlenmiş bytes) döner.
+    max_frame byte içinde newline gelmezse frame çok uzun sayılır ve bir sonraki
+    newline'a kadar olan veri atlanarak yeniden senkronize olunur.
+    start_marker verilirse (örn. b'RID:') marker'dan önceki gürültü atılır.
+    """
+
+    def __init__(self, max_frame=256, start_marker=None, on_error=None, binary=False):
+        self.max_frame = max_frame
+        self.start_marker = start_marker
+        self.on_error = on_error
+        self.binary = binary
+        self._buffer = bytearray()
+        self._discarding = False
+        self.stats = {
+            'frames': 0,
+            'errors': 0,
+            'bytes': 0,
+            'discarded_bytes': 0
+        }
+
+    def feed(self, data):
+        """Yeni gelen byte'ları ekle, tamamlanan frame'leri döndür"""
+        self.stats['bytes'] += len(data)
+        buf = self._buffer
+        buf += data
+        frames = []
+
+        start = 0
+        while True:
+            end = buf.find(b'\n', start)
+            magic = buf.find(MAGIC, start) if self.binary else -1
+            if magic >= 0 and (end < 0 or magic < end):
+                start = self._take_binary(buf, start, magic, frames)
+                if start < 0:
+                    start = magic  # Frame henüz tamamlanmadı - sonraki okumayı bekle
+                    break
+                continue
+            if end < 0:
+                break
+            raw = bytes(buf[start:end])
+            start = end + 1
+
+            if self._discarding:
+                # Çok uzun frame'in kalanı - newline ile senkronizasyon tamamlandı
+                self._discarding = False
+                self.stats['discarded_bytes'] += len(raw) + 1
+                continue
+
+            frame = self._check(raw.rstrip(b'\r'))
+            if frame:
+                frames.append(frame)
+
+        del buf[:start]
+
+        if len(buf) > self.max_frame:
+            self._error(FRAME_TOO_LONG, bytes(buf[:32]))
+            self.stats['discarded_bytes'] += len(buf)
+            buf.clear()
+            self._discarding = True
+        elif self._discarding:
+            self.stats['discarded_bytes'] += len(buf)
+            buf.clear()
+
+        return frames
+
+    def _take_binary(self, buf, start, magic, frames):
+        """magic'te başlayan binary frame'i al - yeni başlangıç indeksi ya da eksikse -1 döner"""
+        if magic > start:
+            # Binary frame'den önce newline ile bitmemiş byte'lar
+            if not self._discarding:
+                self._error(FRAME_LEADING_JUNK, bytes(buf[start:magic]))
+            self.stats['discarded_bytes'] += magic - start
+        self._discarding = False
+
+        if len(buf) - magic < HEADER_SIZE:
+            return -1
+        size = frame_size(buf[magic:magic + HEADER_SIZE])
+        if size is None:
+            # Magic tesadüfen veride geçmiş olabilir - atlayıp aramaya devam et
+            self._error(FRAME_BAD_HEADER, bytes(buf[magic:magic + HEADER_SIZE]))
+            self.stats['discarded_bytes'] += len(MAGIC)
+            return magic + len(MAGIC)
+        if len(buf) - magic < size:
+            return -1
+
+        frame = bytes(buf[magic:magic + size])
+        if not crc_ok(frame):
+            self._error(FRAME_BAD_CRC, frame)
+            self.stats['discarded_bytes'] += len(MAGIC)
+            return magic + len(MAGIC)
+
+        self.stats['frames'] += 1
+        frames.append(frame)
+        return magic + size
+
+    def reset(self):
+        """Port yeniden açıldığında yarım kalan veriyi temizle"""
+        self._buffer.clear()
+        self._discarding = False
+
+    def _check(self, frame):
+        if not frame:
+            return None
+
+        if self.start_marker:
+            pos = frame.find(self.start_marker)
+            if pos > 0:
+                self._error(FRAME_LEADING_JUNK, frame[:pos])
+                self.stats['discarded_bytes'] += pos
+                frame = frame[pos:]
+
+        if not _PRINTABLE.issuperset(frame):
+            self._error(FRAME_INVALID_BYTES, frame)
+            self.stats['discarded_bytes'] += len(frame)
+            return None
+
+        self.stats['frames'] += 1
+        return frame
+
+    def _error(self, kind, sample):
+        self.stats['errors'] += 1
+        if self.on_error:
+            self.on_error(kind, sample)
@@ -0,0 +1,116 @@
+"""
+Asyncio multi-gateway okuyucu - Tek process içinde birden fazla LoRa E32 coordinator
+Her port kendi non-blocking okuyucusuna sahiptir; thread ya da sabit polling yoktur.
+
+pyserial-asyncio kuruluysa (pip install pyserial-asyncio) onun transport'u kullanılır,
+değilse POSIX sistemlerde port dosya tanımlayıcısı doğrudan event loop'a bağlanır.
+"""
+
+import asyncio
+import logging
+import sys
+
+import serial
+
+from .framing import LineFramer
+from .serial_reader import frame_text, log_framing_error
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+
+async def open_serial_stream(port, baudrate):
+    """Serial portu asyncio StreamReader olarak aç - (reader, close_fn) döner"""
+    if serial_asyncio is not None:
+        reader, writer = await serial_asyncio.open_serial_connection(url=port, baudrate=baudrate)
+        return reader, writer.close
+
+    if sys.platform == 'win32':
+        raise RuntimeError("Windows'ta asyncio modu için pyserial-asyncio gerekli: pip install pyserial-asyncio")
+
+    loop = asyncio.get_running_loop()
+    ser = serial.Serial(port, baudrate, timeout=0)
+    reader = asyncio.StreamReader(loop=loop)
+
+    def on_readable():
+        try:
+            data = ser.read(ser.in_waiting or 1)
+        except serial.SerialException as e:
+            loop.remove_reader(ser.fileno())
+            reader.set_exception(e)
+            return
+        if data:
+            reader.feed_data(data)
+
+    loop.add_reader(ser.fileno(), on_readable)
+
+    def close():
+        if ser.is_open:
+            loop.remove_reader(ser.fileno())
+            ser.close()
+        reader.feed_eof()
+
+    return reader, close
+
+
+class GatewayReader:
+    """Tek bir gateway portunu okuyup parse edilen payload'ı ortak pipeline'a verir"""
+
+    def __init__(self, port, baudrate, parse_fn, on_payload, on_line=None, max_frame=256):
+        self.port = port
+        self.baudrate = baudrate
+        self.parse_fn = parse_fn
+        self.on_payload = on_payload
+        self.on_line = on_line
+        self.framer = LineFramer(
+            max_frame=max_frame,
+            start_marker=b'RID:',
+            binary=True,
+            on_error=lambda kind, sample: log_framing_error(port, kind, sample)
+        )
+        self.lines_read = 0
+
+    async def run(self):
+        reader, close = await open_serial_stream(self.port, self.baudrate)
+        logger.info("✅ Gateway bağlandı: %s (%d baud)", self.port, self.baudrate)
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break  # EOF - port kapandı
+
+                for frame in self.framer.feed(data):
+                    try:
+                        await self.handle_frame(frame)
+                    except Exception as e:
+                        logger.error("❌ Gateway %s hata: %s", self.port, e)
+        finally:
+            close()
+
+    async def handle_frame(self, frame):
+        self.lines_read += 1
+        if self.on_line:
+            self.on_line(self.port, frame_text(frame))
+
+        # "Coordinator ready..." mesajını atla
+        if b'Coordinator ready' in frame:
+            return
+
+        payload = self.parse_fn(frame)
+        if payload:
+            payload['gateway'] = self.port
+            result = self.on_payload(payload)
+            if asyncio.iscoroutine(result):
+                await result
+
+
+async def run_gateways(gateways):
+    """Tüm gateway'leri aynı event loop'ta çalıştır - biri hata verirse diğerleri devam eder"""
+    results = await asyncio.gather(*(g.run() for g in gateways), return_exceptions=True)
+    for gateway, result in zip(gateways, results):
+        if isinstance(result, Exception):
+            logger.error("❌ Gateway %s hatası: %s", gateway.port, result)
@@ -0,0 +1,143 @@
+"""
+Router geçmişi - Router/key bazında sabit boyutlu (timestamp, değer) ring buffer'ları
+Her seri iki array('d') içinde tutulur; okuma başına Python nesnesi birikmez.
+
+Router'lar son güncelleme sırasına göre tutulur: idle_timeout boyunca veri
+göndermeyen router'lar ve max_routers'ı aşan en eski router'lar silinir.
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+class _Series:
+    """Tek bir key için ring buffer"""
+
+    __slots__ = ('times', 'values', 'head', 'count')
+
+    def __init__(self, capacity):
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0      # Sıradaki yazma indeksi
+        self.count = 0
+
+    def append(self, ts, value):
+        self.times[self.head] = ts
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.times)
+        if self.count < len(self.times):
+            self.count += 1
+
+    def latest(self):
+        i = self.head - 1  # -1 → son eleman (wrap)
+        return self.times[i], self.values[i]
+
+    def last(self, n):
+        """Son n kayıt, eskiden yeniye - (times, values) array'leri"""
+        n = min(n, self.count)
+        start = self.head - n
+        if start >= 0:
+            return self.times[start:self.head], self.values[start:self.head]
+        # Buffer başa sarmış - iki dilimi birleştir
+        return (self.times[start:] + self.times[:self.head],
+                self.values[start:] + self.values[:self.head])
+
+
+class _Router:
+    __slots__ = ('sensor', 'last_update', 'series')
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+        self.last_update = 0.0
+        self.series = {}
+
+
+class RouterHistory:
+    """Thread-safe, sınırlı router/key geçmişi"""
+
+    def __init__(self, capacity=128, idle_timeout=3600.0, max_routers=256):
+        if capacity < 1:
+            raise ValueError("capacity en az 1 olmalı")
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.max_routers = max_routers
+        self._routers = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'updates': 0,
+            'evicted': 0
+        }
+
+    def __len__(self):
+        return len(self._routers)
+
+    def __contains__(self, router):
+        return router in self._routers
+
+    def record(self, router, fields, sensor=None, ts=None):
+        """Bir okumanın alanlarını ({key: değer}) router'ın serilerine ekle"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            entry = self._routers.get(router)
+            if entry is None:
+                entry = self._routers[router] = _Router(sensor)
+            else:
+                self._routers.move_to_end(router)
+                if sensor is not None:
+                    entry.sensor = sensor
+
+            for key, value in fields.items():
+                series = entry.series.get(key)
+                if series is None:
+                    series = entry.series[key] = _Series(self.capacity)
+                series.append(ts, value)
+            entry.last_update = ts
+            self.stats['updates'] += 1
+
+            self._evict(ts)
+
+    def latest(self, router):
+        """Router'ın her key için son değeri - {key: (timestamp, değer)}"""
+        with self._lock:
+            entry = self._routers.get(router)
+            if entry is None:
+                return {}
+            return {key: series.latest() for key, series in entry.series.items()}
+
+    def last(self, router, key, n=None):
+        """Router/key için son n kayıt (varsayılan: hepsi) - (times, values) array('d')"""
+        with self._lock:
+            entry = self._routers.get(router)
+            series = entry.series.get(key) if entry else None
+            if series is None:
+                return array('d'), array('d')
+            return series.last(self.capacity if n is None else n)
+
+    def last_update(self, router):
+        with self._lock:
+            entry = self._routers.get(router)
+            return entry.last_update if entry else None
+
+    def routers(self):
+        with self._lock:
+            return list(self._routers)
+
+    def evict_idle(self, now=None):
+        """idle_timeout'u geçmiş router'ları sil - silinen router sayısını döner"""
+        with self._lock:
+            return self._evict(time.time() if now is None else now)
+
+    def _evict(self, now):
+        # OrderedDict son güncellemeye göre sıralı: en eski router her zaman baştadır
+        evicted = 0
+        while self._routers:
+            router, entry = next(iter(self._routers.items()))
+            if len(self._routers) > self.max_routers or now - entry.last_update > self.idle_timeout:
+                del self._routers[router]
+                evicted += 1
+            else:
+                break
+        self.stats['evicted'] += evicted
+        return evicted
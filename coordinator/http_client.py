@@ -0,0 +1,143 @@
+"""
+Backend HTTP client - Keep-alive bağlantı havuzu, retry/backoff ve devre kesici
+Her okuma için yeni TCP bağlantısı açmak yerine tek bir Session paylaşılır
+"""
+
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Tekrar denenmeye değer HTTP durumları (geçici backend hataları)
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Devre kesici açıkken istek yapılmaya çalışıldı"""
+
+
+class CircuitBreaker:
+    """Basit closed → open → half-open devre kesici
+
+    Art arda failure_threshold hata olursa devre açılır ve reset_timeout boyunca
+    istekler backend'e hiç gitmeden reddedilir. Süre dolunca tek bir deneme
+    isteğine izin verilir; başarılı olursa devre tekrar kapanır.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """İstek yapılabilir mi?"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: aynı anda sadece tek deneme isteği
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("⛔ Backend devre kesici açıldı (%d hata) - %.0fs boyunca istek yapılmayacak",
+                                   self.failures, self.reset_timeout)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class BackendClient:
+    """Tüm backend istekleri için paylaşılan, thread-safe HTTP client"""
+
+    def __init__(self, pool_size=4, connect_timeout=3.05, read_timeout=10.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 breaker_threshold=5, breaker_reset=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
+        })
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff: [0, min(max, base * 2^attempt)]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, url, data, idempotent=False):
+        """JSON POST - idempotent istekler geçici hatalarda backoff ile tekrar denenir
+
+        Devre açıksa CircuitOpenError, deneme hakkı biterse son requests hatası fırlatılır.
+        """
+        retries = self.max_retries if idempotent else 0
+        return self._request('POST', url, retries, json=data)
+
+    def get(self, url, timeout=None):
+        """GET isteği (health check vb.) - GET her zaman idempotent"""
+        return self._request('GET', url, self.max_retries, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method, url, retries, timeout=None, **kwargs):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Backend devre kesici açık: {url}")
+
+            try:
+                response = self.session.request(
+                    method, url, timeout=timeout or self.timeout, **kwargs
+                )
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    # 4xx backend'in ayakta olduğunu gösterir - devre için başarı sayılır
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= retries:
+                    return response
+
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
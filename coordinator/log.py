@@ -0,0 +1,58 @@
+"""
+Coordinator logging - seviyeli ve hız sınırlı log çıktısı
+Paket başına mesajlar DEBUG seviyesindedir ve sınırlanmaz (DEBUG açıldıysa her paket
+görünmelidir). INFO ve üstünde aynı mesaj şablonu (örn. backend timeout) kısa sürede çok
+tekrarlanırsa fazlası bastırılır ve sonra özet olarak bildirilir.
+"""
+
+import logging
+import sys
+import threading
+import time
+
+
+class RateLimitFilter(logging.Filter):
+    """Aynı (logger, mesaj şablonu) için interval saniyede en fazla burst kayıt geçirir
+
+    Sadece min_level ve üstü kayıtlar sınırlanır; altındakiler her zaman geçer.
+    """
+
+    def __init__(self, burst=5, interval=10.0, min_level=logging.INFO):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.min_level = min_level
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (son {self.interval:.0f}s içinde {suppressed} benzer mesaj bastırıldı)"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def setup_logging(level='INFO', burst=5, interval=10.0):
+    """Coordinator için root logger'ı kur - mesajlar stdout'a, sade formatta"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(message)s', '%H:%M:%S'))
+    handler.addFilter(RateLimitFilter(burst, interval))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    # DEBUG'da her HTTP bağlantısını yazmasın
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -0,0 +1,226 @@
+"""
+Coordinator metrikleri - Prometheus text formatında küçük bir /metrics endpoint'i
+Harici bağımlılık yok: sayaçlar, gauge'lar ve sabit bucket'lı histogramlar burada tutulur.
+
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Artan sayaç - label'lar inc() çağrısında sırayla verilir"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def total(self):
+        """Tüm label kombinasyonlarının toplamı"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, label_values, value) for label_values, value in items]
+
+
+class Gauge(Counter):
+    """Anlık değer - set() ile ya da her scrape'te fn() ile okunur
+
+    fn verilirse tek bir sayı ya da {label_values_tuple: değer} dict'i dönmelidir.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, help, labels=(), fn=None):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def samples(self):
+        if self.fn is None:
+            return super().samples()
+        result = self.fn()
+        if isinstance(result, dict):
+            return [(self.name, labels, value) for labels, value in result.items()]
+        return [(self.name, (), result)]
+
+
+class CallbackCounter(Gauge):
+    """Değeri başka bir bileşenin kendi istatistiğinden okunan sayaç"""
+
+    type = 'counter'
+
+
+class Histogram:
+    """Sabit bucket'lı histogram (label'sız)"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = ()
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            result.append((f'{self.name}_bucket', ('le',), (f'{bound:g}',), cumulative))
+        cumulative += counts[-1]
+        result.append((f'{self.name}_bucket', ('le',), ('+Inf',), cumulative))
+        result.append((f'{self.name}_sum', (), (), total))
+        result.append((f'{self.name}_count', (), (), cumulative))
+        return result
+
+
+class RateMeter:
+    """Bir sayacın son window saniyedeki saniye başına artışı (örn. serial byte/s)"""
+
+    def __init__(self, read_total, window=10.0):
+        self.read_total = read_total
+        self.window = window
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def rate(self):
+        now = time.monotonic()
+        total = self.read_total()
+        with self._lock:
+            self._samples.append((now, total))
+            while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+                self._samples.pop(0)
+            start_time, start_total = self._samples[0]
+        elapsed = now - start_time
+        return (total - start_total) / elapsed if elapsed > 0 else 0.0
+
+
+class MetricsRegistry:
+    """Tüm metrikleri tutar ve Prometheus text formatına çevirir"""
+
+    def __init__(self, prefix='beetwin_coordinator_'):
+        self.prefix = prefix
+        self._metrics = []
+
+    def _add(self, metric):
+        metric.name = self.prefix + metric.name
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), fn=None):
+        return self._add(Gauge(name, help, labels, fn))
+
+    def counter_fn(self, name, help, fn, labels=()):
+        return self._add(CallbackCounter(name, help, labels, fn))
+
+    def histogram(self, name, help, buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.warning("Metrik okunamadı %s: %s", metric.name, e)
+                continue
+            for sample in samples:
+                if len(sample) == 4:
+                    name, label_names, label_values, value = sample
+                else:
+                    name, label_values, value = sample
+                    label_names = metric.labels
+                lines.append(f'{name}{_format_labels(label_names, label_values)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Registry'yi http://host:port/metrics adresinde yayınlayan arka plan HTTP sunucusu"""
+
+    def __init__(self, registry, host='127.0.0.1', port=9108):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
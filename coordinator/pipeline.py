@@ -0,0 +1,154 @@
+"""
+Upload pipeline - Serial okuma ile backend gönderimini birbirinden ayırır
+Reader thread payload'ları sınırlı bir kuyruğa koyar, worker'lar kuyruğu boşaltır
+Worker'lar payload'ları batch halinde toplar: boyut ya da süre limiti dolunca gönderir
+Öncelik seviyeleri verilirse her seviyenin kendi kuyruğu olur (coordinator/scheduler.py)
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from .scheduler import OVERFLOW_DROP_OLDEST, OVERFLOW_POLICIES, PriorityQueues
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEVEL = 'normal'
+
+
+class UploadPipeline:
+    """Sınırlı kuyruk(lar) + upload worker havuzu
+
+    upload_fn her zaman payload listesi (batch) alır ve başarı durumunu döner.
+    batch_size=1 verilirse her payload tek başına gönderilir.
+
+    levels: [(ad, maxsize, weight), ...] yüksekten düşüğe; priority_fn(payload) seviye
+    adını döner. Verilmezse queue_size boyutlu tek bir kuyruk kullanılır. En düşük
+    seviye dışındaki bir okuma geldiğinde batch_wait beklenmeden batch gönderilir.
+    """
+
+    def __init__(self, upload_fn, queue_size=1000, workers=2,
+                 overflow_policy=OVERFLOW_DROP_OLDEST, block_timeout=5.0,
+                 batch_size=50, batch_wait=2.0, levels=None, priority_fn=None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Geçersiz overflow policy: {overflow_policy}")
+        if batch_size < 1:
+            raise ValueError("batch_size en az 1 olmalı")
+
+        self.upload_fn = upload_fn
+        self.queue = PriorityQueues(levels or [(DEFAULT_LEVEL, queue_size, 1)])
+        self.priority_fn = priority_fn
+        self.lowest = self.queue.names[-1]
+        self.worker_count = workers
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'dropped': 0,
+            'uploaded': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_depth': 0
+        }
+
+    def start(self):
+        """Upload worker'larını başlat"""
+        for i in range(self.worker_count):
+            t = threading.Thread(
+                target=self._worker,
+                name=f"upload-worker-{i + 1}",
+                daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, payload):
+        """Payload'ı seviyesinin kuyruğuna ekle - eklenemezse False döner"""
+        level = self.priority_fn(payload) if self.priority_fn else self.lowest
+        accepted, dropped = self.queue.put(
+            payload, level, self.overflow_policy, self.block_timeout
+        )
+
+        with self._lock:
+            self._stats['dropped'] += dropped
+            if not accepted:
+                return False
+            self._stats['enqueued'] += 1
+            depth = self.queue.qsize()
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+        return True
+
+    def stop(self, drain=True, timeout=10.0):
+        """Worker'ları durdur - drain=True ise kuyruktaki veriler önce gönderilir"""
+        if not drain:
+            self._count('dropped', self.queue.drain())
+
+        self.queue.close()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def stats(self):
+        """Kuyruk ve gönderim istatistikleri - 'levels' seviye bazında kuyruk durumu"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['depth'] = self.queue.qsize()
+        stats['levels'] = {
+            name: dict(level_stats, depth=self.queue.qsize(name))
+            for name, level_stats in self.queue.stats.items()
+        }
+        return stats
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _collect_batch(self):
+        """İlk payload'ı bekle, sonra batch_size dolana ya da batch_wait geçene kadar topla
+
+        Öncelikli bir okuma alındığında artık beklenmez; sadece hazırda bekleyenler eklenir.
+        """
+        batch = []
+
+        entry = self.queue.get()
+        if entry is None:
+            return batch, True
+        level, first = entry
+        batch.append(first)
+
+        deadline = time.monotonic() + (self.batch_wait if level == self.lowest else 0.0)
+        while len(batch) < self.batch_size:
+            try:
+                entry = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            level, item = entry
+            batch.append(item)
+            if level != self.lowest:
+                deadline = 0.0
+
+        return batch, False
+
+    def _worker(self):
+        while True:
+            batch, stop = self._collect_batch()
+            if batch:
+                try:
+                    ok = self.upload_fn(batch)
+                except Exception as e:
+                    logger.error("❌ Upload worker hatası: %s", e)
+                    ok = False
+                self._count('uploaded' if ok else 'failed', len(batch))
+                self._count('batches')
+            if stop:
+                return
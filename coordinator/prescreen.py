@@ -0,0 +1,104 @@
+"""
+Edge anomali ön taraması - backend/ml/models/anomaly_detector.py coordinator içinde bir kez yüklenir
+Birleştirilmiş her okuma router'ın son geçmişiyle birlikte skorlanır; sonuç
+payload['anomaly'] olarak backend'e gider, anomaliler öncelikli gönderilir.
+
+AnomalyDetector numpy / pandas / scikit-learn gerektirir; bu yüzden sadece
+ön tarama açıkken (lazy) import edilir. online=True ile kovan (router) başına EWMA
+baseline tutan OnlineAnomalyDetector kullanılır - baseline'lar ingest sırasında öğrenir.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def load_anomaly_detector(models_dir, model_path=None, online=False):
+    """backend/ml/models altındaki AnomalyDetector'ı (online: OnlineAnomalyDetector) import et ve modeli yükle"""
+    models_dir = os.path.abspath(models_dir)
+    if models_dir not in sys.path:
+        sys.path.insert(0, models_dir)
+    model_path = model_path or os.path.join(models_dir, 'anomaly_model.joblib')
+    if online:
+        from online_detector import OnlineAnomalyDetector
+        return OnlineAnomalyDetector(model_path)
+    from anomaly_detector import AnomalyDetector
+
+    return AnomalyDetector(model_path)
+
+
+class AnomalyPrescreen:
+    """Okumaları RouterHistory'deki son değerlerle AnomalyDetector'a skorlatır"""
+
+    def __init__(self, detector, history, history_points=10):
+        self.detector = detector
+        self.history = history
+        self.history_points = history_points
+        self._lock = threading.Lock()
+        self.stats = {
+            'scored': 0,
+            'anomalies': 0,
+            'skipped': 0,
+            'seconds': 0.0
+        }
+
+    def uses_history(self):
+        """Model trend feature'larıyla (7 feature) mı eğitilmiş?"""
+        # scaler'a erişmek derlenmiş modelle başlayan detector'da sklearn'ü yükler
+        return self.detector.expects_trends()
+
+    def score(self, payload):
+        """payload['anomaly'] ekle - model feature'larından hiçbiri yoksa None döner"""
+        router = payload['router']
+        # Router key'lerini ayrı döngülerde gönderebilir - son bilinen değerlerle tamamla
+        latest = self.history.latest(router)
+        data = {key: value for key, (ts, value) in latest.items()}
+        if not any(name in data for name in self.detector.feature_names):
+            with self._lock:
+                self.stats['skipped'] += 1
+            return None
+
+        historical = self._historical(router) if self.uses_history() else None
+        # Online detector aynı okumayı (aynı damga) baseline'a iki kez eklemesin
+        data['timestamp'] = max(ts for ts, value in latest.values())
+
+        started = time.perf_counter()
+        # Router = kovan: detector'ın kovan bazlı durumu (trend pencereleri, online baseline) router'a ayrılır
+        result = self.detector.detect_anomalies(data, historical, hive_id=router)
+        elapsed = time.perf_counter() - started
+
+        anomaly = {
+            'score': result['anomaly_score'],
+            'isAnomaly': result['is_anomaly'],
+            'confidence': result['confidence'],
+            'method': result['method']
+        }
+        payload['anomaly'] = anomaly
+        with self._lock:
+            self.stats['scored'] += 1
+            self.stats['seconds'] += elapsed
+            if anomaly['isAnomaly']:
+                self.stats['anomalies'] += 1
+        return anomaly
+
+    def _historical(self, router):
+        """Son history_points okuma - detector'ın beklediği [{'timestamp', feature: değer}, ...] formatında"""
+        columns = {}
+        times = None
+        for name in self.detector.feature_names:
+            key_times, values = self.history.last(router, name, self.history_points)
+            if values:
+                columns[name] = values
+                times = key_times
+        if not columns:
+            return None
+        length = min(len(values) for values in columns.values())
+        return [
+            dict({name: values[len(values) - length + i] for name, values in columns.items()},
+                 timestamp=times[len(times) - length + i])
+            for i in range(length)
+        ]
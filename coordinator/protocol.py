@@ -0,0 +1,200 @@
+"""
+RID/SID text protokolü - bytes seviyesinde hızlı parser
+
+Desteklenen format (bir satırda bir ya da daha fazla alan):
+    RID:107; SID:1013; WT: 25.83
+    RID:107; SID:1013; WT:25.83; WH:55.1; PR:1012
+
+Satır str'ye decode edilmeden bytes üzerinde parse edilir; ID ve key string'leri
+cache'lenir, sonuç tek bir tuple tabanlı Record'dur. Binary frame'ler (coordinator/binary.py)
+magic byte'larından tanınır ve aynı Record'a çözülür.
+Benchmark + parity kontrolü: python -m coordinator.protocol
+"""
+
+import time
+from collections import namedtuple
+
+from .binary import MAGIC, decode_frame, encode_frame
+
+# Sınırlı sayıda router/sensor/key var - her satırda yeni str üretmemek için cache'lenir
+_CACHE_LIMIT = 4096
+_head_cache = {}    # b'RID:107; SID:1013' → ('107', '1013')
+_key_cache = {}     # b' WT' → 'WT'
+_prefix_cache = {}  # b'RID:107; SID:1013; WT' → ('107', '1013', 'WT') (tek alanlı satırlar)
+
+_new_tuple = tuple.__new__
+
+
+class Record(namedtuple('Record', 'router sensor fields')):
+    """Parse edilmiş tek bir router satırı - fields: ((key, value), ...)"""
+
+    __slots__ = ()
+
+    def to_payload(self):
+        """Pipeline'da kullanılan (JSON'a çevrilebilir) payload dict'i"""
+        return {
+            'router': self.router,
+            'sensor': self.sensor,
+            'data': dict(self.fields)
+        }
+
+
+def _parse_head(head):
+    """b'RID:107; SID:1013' kısmını doğrula ve ID'leri döndür"""
+    rid, _, sid = head.partition(b';')
+    rid_key, _, router = rid.partition(b':')
+    sid_key, _, sensor = sid.partition(b':')
+    router = router.strip()
+    sensor = sensor.strip()
+    if rid_key.strip() != b'RID' or sid_key.strip() != b'SID' or not router or not sensor:
+        return None
+    ids = (router.decode('ascii'), sensor.decode('ascii'))
+    if len(_head_cache) < _CACHE_LIMIT:
+        _head_cache[head] = ids
+    return ids
+
+
+def _parse_key(raw):
+    key = raw.strip()
+    if not key.isalnum():
+        return None
+    key = key.decode('ascii')
+    if len(_key_cache) < _CACHE_LIMIT:
+        _key_cache[raw] = key
+    return key
+
+
+def _parse_full(frame):
+    """Genel yol: header'ı ve tüm KEY: value alanlarını ayrıştır"""
+    split = frame.find(b';', frame.find(b';') + 1)
+    if split < 0:
+        return None
+    head = frame[:split]
+    ids = _head_cache.get(head) or _parse_head(head)
+    if ids is None:
+        return None
+
+    fields = []
+    try:
+        for part in frame[split + 1:].split(b';'):
+            key, sep, value = part.partition(b':')
+            if sep:
+                name = _key_cache.get(key) or _parse_key(key)
+                if name is None:
+                    return None
+                fields.append((name, float(value)))
+            elif part.strip():
+                return None
+    except ValueError:
+        return None
+
+    if not fields:
+        return None
+    return _new_tuple(Record, (ids[0], ids[1], tuple(fields)))
+
+
+def parse_frame(frame):
+    """Tek bir frame'i (bytes, newline'sız) parse et - geçersizse None
+
+    Tek alanlı satırlarda (mevcut router'ların gönderdiği format) son ':' öncesi
+    kısım cache'lenir; sonraki satırlarda sadece değer float'a çevrilir.
+    """
+    if frame[:2] == MAGIC:
+        decoded = decode_frame(frame)
+        return _new_tuple(Record, decoded) if decoded is not None else None
+
+    idx = frame.rfind(b':')
+    hit = _prefix_cache.get(frame[:idx])
+    if hit is not None:
+        try:
+            return _new_tuple(Record, (hit[0], hit[1], ((hit[2], float(frame[idx + 1:])),)))
+        except ValueError:
+            pass  # Ör. sondaki ';' - sonuç cache'e bağlı olmasın, genel yoldan parse et
+
+    record = _parse_full(frame)
+    if (record is not None and len(record.fields) == 1 and b';' not in frame[idx + 1:]
+            and len(_prefix_cache) < _CACHE_LIMIT):
+        _prefix_cache[frame[:idx]] = (record.router, record.sensor, record.fields[0][0])
+    return record
+
+
+def _legacy_parse_text_data(line):
+    """Benchmark referansı - pc_coordinator_text.py'deki eski str tabanlı parser"""
+    try:
+        if 'RID:' in line and 'SID:' in line:
+            parts = line.strip().split(';')
+            router_id = parts[0].strip().split(':')[1].strip()
+            sensor_id = parts[1].strip().split(':')[1].strip()
+            data_split = parts[2].strip().split(':')
+            return {
+                'router': router_id,
+                'sensor': sensor_id,
+                'data_key': data_split[0].strip(),
+                'data_value': float(data_split[1].strip())
+            }
+    except Exception:
+        pass
+    return None
+
+
+def check():
+    """Cache'li hızlı yol ile genel yol aynı sonucu vermeli - satır önce soğuk, sonra sıcak cache'le"""
+    cases = [
+        [b'RID:107; SID:1013; WT: 25.83;', b'RID:107; SID:1013; WT: 25.83', b'RID:107; SID:1013; WT: 25.83;'],
+        [b'RID:108; SID:1014; WH:55.1', b'RID:108; SID:1014; WH:55.1 ; ', b'RID:108; SID:1014; WH:abc'],
+    ]
+    for lines in cases:
+        _prefix_cache.clear()
+        cold = [_parse_full(line) for line in lines]
+        warm = [parse_frame(line) for line in lines]
+        assert warm == cold, f"Cache'li parse farklı: {lines} → {warm} != {cold}"
+        assert [parse_frame(line) for line in lines] == cold
+    _prefix_cache.clear()
+    print("✅ parse_frame cache parity")
+
+
+def benchmark(n=200000):
+    """Eski parser ile yeni parser'ın satır/saniye karşılaştırması"""
+    single = [f"RID:{100 + i % 50}; SID:{1000 + i % 50}; WT: {20 + i % 10}.{i % 100:02d}" for i in range(1000)]
+    multi = [f"RID:{100 + i % 50}; SID:{1000 + i % 50}; WT:25.83; WH:55.1; PR:1012; AL:{i % 300}" for i in range(1000)]
+
+    def run(fn, lines, repeat=5):
+        best = 0.0
+        for _ in range(repeat):
+            count = 0
+            start = time.perf_counter()
+            while count < n // repeat:
+                for line in lines:
+                    fn(line)
+                count += len(lines)
+            best = max(best, count / (time.perf_counter() - start))
+        return best
+
+    single_bytes = [line.encode() for line in single]
+    multi_bytes = [line.encode() for line in multi]
+    single_binary = [encode_frame(100 + i % 50, 1000 + i % 50, {'WT': 20 + i % 10 + i % 100 / 100})
+                     for i in range(1000)]
+    multi_binary = [encode_frame(100 + i % 50, 1000 + i % 50, {'WT': 25.83, 'WH': 55.1, 'PR': 1012, 'AL': i % 300})
+                    for i in range(1000)]
+
+    results = [
+        ("legacy str parser (1 alan)", run(_legacy_parse_text_data, single)),
+        ("legacy: decode + parse (1 alan)", run(lambda b: _legacy_parse_text_data(b.decode('utf-8', errors='ignore').strip()), single_bytes)),
+        ("parse_frame bytes (1 alan)", run(parse_frame, single_bytes)),
+        ("parse_frame bytes (4 alan)", run(parse_frame, multi_bytes)),
+        ("parse_frame binary (1 alan)", run(parse_frame, single_binary)),
+        ("parse_frame binary (4 alan)", run(parse_frame, multi_binary)),
+    ]
+
+    print(f"📊 Parser benchmark ({n} satır)")
+    for name, rate in results:
+        print(f"  {name:<34} {rate:>12,.0f} satır/s")
+    print(f"  4 alanlı satırda alan/s: {results[3][1] * 4:,.0f} "
+          f"(eski parser satır başına sadece 1 alan okur)")
+    print(f"  Frame boyutu (4 alan): text {sum(map(len, multi_bytes)) / len(multi_bytes) + 1:.0f} byte, "
+          f"binary {sum(map(len, multi_binary)) / len(multi_binary):.0f} byte")
+
+
+if __name__ == '__main__':
+    check()
+    benchmark()
@@ -0,0 +1,263 @@
+"""
+Record / replay - Donanım ve Node backend olmadan coordinator'ı uçtan uca ölçmek için
+Kaydedilmiş bir serial log'u gerçek port gibi okutur ve okumaları yerel bir stub
+backend'e gönderir. Log şu formatlarda olabilir:
+
+    RID:107; SID:1013; WT: 25.83                       ← düz satırlar (sabit aralıkla)
+    1718000000.125 RID:107; SID:1013; WT: 25.83        ← epoch saniye + satır
+    2024-06-10T09:13:20.125 RID:107; SID:1013; WT: 25.83  ← ISO zaman + satır
+    1718000000.250 BIN:be5701...                       ← binary frame (hex)
+
+CaptureWriter canlı çalışırken gelen satırları epoch formatında kaydeder.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .binary import MAGIC
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(token):
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(token).timestamp()
+    except ValueError:
+        return None
+
+
+def load_capture(path, line_interval=0.1):
+    """Capture dosyasını (saniye offset'i, satır bytes) listesine çevir
+
+    Zaman damgası olmayan satırlar bir önceki satırdan line_interval sonra gelmiş sayılır.
+    Offset'ler ilk satıra göredir.
+    """
+    records = []
+    first = None
+    last = None
+    with open(path, 'rb') as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+
+            stamp = None
+            head, sep, rest = line.partition(b' ')
+            if sep and not head.startswith(b'RID:'):
+                stamp = _parse_timestamp(head.decode('ascii', errors='ignore'))
+                if stamp is not None:
+                    line = rest.strip()
+
+            if line.startswith(b'BIN:'):
+                try:
+                    line = bytes.fromhex(line[4:].decode('ascii'))
+                except ValueError:
+                    continue
+
+            if stamp is None:
+                offset = 0.0 if last is None else last + line_interval
+            else:
+                if first is None:
+                    first = stamp - (last + line_interval if last is not None else 0.0)
+                offset = stamp - first
+            records.append((offset, line))
+            last = offset
+    return records
+
+
+class CaptureWriter:
+    """Canlı okunan satırları replay için zaman damgasıyla dosyaya yazar"""
+
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='ascii', errors='replace')
+        self._lock = threading.Lock()
+
+    def write(self, line):
+        with self._lock:
+            self._file.write(f"{time.time():.3f} {line}\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplaySerial:
+    """Capture kayıtlarını pyserial.Serial gibi sunan okunabilir kaynak
+
+    speed=1 kayıttaki zamanlamayı korur, speed=N N kat hızlı oynatır,
+    speed=0 beklemeden olabildiğince hızlı verir. Kayıtlar bitince finished set edilir.
+    """
+
+    def __init__(self, records, speed=1.0, port='replay', chunk_lines=64):
+        self.records = records
+        self.speed = speed
+        self.port = port
+        self.chunk_lines = chunk_lines
+        self.in_waiting = 0
+        self.is_open = True
+        self.lines_fed = 0
+        self.bytes_fed = 0
+        self.finished = threading.Event()
+        self._index = 0
+        self._started = None
+
+    def read(self, size=1):
+        if self._index >= len(self.records):
+            self.finished.set()
+            time.sleep(0.05)
+            return b''
+
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+
+        if self.speed > 0:
+            due = self._started + self.records[self._index][0] / self.speed
+            if due > now:
+                time.sleep(due - now)
+                now = due
+
+        # Zamanı gelmiş satırları tek seferde ver (gerçek portun buffer'ı gibi)
+        lines = []
+        while self._index < len(self.records) and len(lines) < self.chunk_lines:
+            offset, line = self.records[self._index]
+            if self.speed > 0 and self._started + offset / self.speed > now:
+                break
+            # Binary frame'ler uzunluk alanıyla ayrılır, newline sadece text satırlarda
+            lines.append(line if line[:2] == MAGIC else line + b'\n')
+            self._index += 1
+
+        data = b''.join(lines)
+        self.lines_fed += len(lines)
+        self.bytes_fed += len(data)
+        return data
+
+    def close(self):
+        self.is_open = False
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Nearest-rank yüzdelikler - {50: ..., 90: ..., 99: ...}"""
+    if not values:
+        return {p: None for p in points}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {p: ordered[min(last, max(0, int(round(p / 100 * len(ordered))) - 1))] for p in points}
+
+
+class StubBackend:
+    """/api/lora/data, /api/lora/batch ve /api/health cevaplayan yerel test backend'i
+
+    Her okumanın geliş anı ile payload timestamp'i arasındaki fark uçtan uca gecikme
+    olarak kaydedilir. latency ve error_rate ile yavaş / hatalı backend taklit edilir.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.readings = 0
+        self.latencies = []
+        self.first_received = None
+        self.last_received = None
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if self.path == '/api/health':
+                    self._reply(200, {'status': 'OK'})
+                else:
+                    self._reply(404, {'success': False})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, result = stub.handle(self.path, body)
+                self._reply(status, result)
+
+            def _reply(self, status, result):
+                data = json.dumps(result).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    def url(self, path):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle(self, path, body):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.requests += 1
+                self.errors += 1
+            return 503, {'success': False, 'message': 'stub error'}
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 400, {'success': False, 'message': 'invalid json'}
+        readings = data.get('readings', []) if path.endswith('/batch') else [data]
+
+        now = time.time()
+        delays = []
+        for reading in readings:
+            try:
+                delays.append(now - datetime.fromisoformat(reading['timestamp']).timestamp())
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        with self._lock:
+            self.requests += 1
+            self.readings += len(readings)
+            self.latencies.extend(delays)
+            if self.first_received is None:
+                self.first_received = now
+            self.last_received = now
+        return 200, {'success': True, 'data': {'received': len(readings), 'saved': len(readings), 'skipped': 0}}
+
+    def report(self):
+        """İstek/okuma sayıları ve gecikme yüzdelikleri"""
+        with self._lock:
+            latencies = list(self.latencies)
+            result = {
+                'requests': self.requests,
+                'errors': self.errors,
+                'readings': self.readings,
+                'first_received': self.first_received,
+                'last_received': self.last_received
+            }
+        result['latency'] = percentiles(latencies)
+        result['latency_max'] = max(latencies) if latencies else None
+        return result
@@ -0,0 +1,162 @@
+"""
+Öncelikli upload zamanlaması - alarm okumaları rutin okumaların arkasında beklemez
+PriorityRules okumayı key/değer aralıklarına göre bir seviyeye atar; PriorityQueues her
+seviye için ayrı sınırlı kuyruk tutar ve ağırlıklı round-robin ile boşaltır:
+her turda seviye i en fazla weight[i] okuma verir, boş olmayan her seviye her turda
+en az bir kez sıra alır (düşük öncelik aç kalmaz).
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+# Kuyruk dolduğunda uygulanacak davranışlar
+OVERFLOW_BLOCK = 'block'              # Reader'ı bekletir (backpressure)
+OVERFLOW_DROP_NEWEST = 'drop_newest'  # Gelen yeni paketi at
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # Kuyruktaki en eski paketi at, yeniyi ekle
+
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST)
+
+
+class PriorityRules:
+    """Okumayı key/değer kurallarına göre bir öncelik seviyesine ata
+
+    rules: [{'key': 'CO', 'above': 50, 'priority': 'critical'},
+            {'key': 'WT', 'above': 40, 'below': 5, 'priority': 'high'},  # > 40 ya da < 5
+            {'anomaly': True, 'priority': 'high'}]                      # edge ön taraması
+    levels: yüksekten düşüğe seviye adları - hiçbir kural eşleşmezse son seviye
+    """
+
+    def __init__(self, rules, levels):
+        self.levels = tuple(levels)
+        rank = {name: i for i, name in enumerate(self.levels)}
+        self._by_key = {}
+        self._anomaly_rank = None
+        for rule in rules:
+            if rule['priority'] not in rank:
+                raise ValueError(f"Tanımsız öncelik seviyesi: {rule['priority']}")
+            level = rank[rule['priority']]
+            if rule.get('anomaly'):
+                if self._anomaly_rank is None or level < self._anomaly_rank:
+                    self._anomaly_rank = level
+                continue
+            self._by_key.setdefault(rule['key'], []).append((rule.get('above'), rule.get('below'), level))
+
+    def classify(self, payload):
+        best = len(self.levels) - 1
+        anomaly = payload.get('anomaly')
+        if self._anomaly_rank is not None and anomaly and anomaly['isAnomaly']:
+            best = self._anomaly_rank
+        for key, value in payload['data'].items():
+            for above, below, level in self._by_key.get(key, ()):
+                if level < best and ((above is not None and value > above) or
+                                     (below is not None and value < below)):
+                    best = level
+        return self.levels[best]
+
+
+class PriorityQueues:
+    """Seviye başına sınırlı kuyruk + ağırlıklı round-robin boşaltma
+
+    levels: [(ad, maxsize, weight), ...] yüksekten düşüğe. get() kuyruklar boşsa bekler,
+    close() sonrası kuyruklar tamamen boşaldığında None döner.
+    """
+
+    def __init__(self, levels):
+        self.names = tuple(name for name, _, _ in levels)
+        self.maxsizes = tuple(size for _, size, _ in levels)
+        self.weights = tuple(weight for _, _, weight in levels)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._queues = [deque() for _ in levels]
+        self._credits = list(self.weights)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {
+            name: {'enqueued': 0, 'dropped': 0, 'served': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+            for name in self.names
+        }
+
+    def put(self, item, level, overflow_policy=OVERFLOW_DROP_OLDEST, timeout=None):
+        """Okumayı seviyesinin kuyruğuna ekle - (eklendi mi, atılan okuma sayısı) döner"""
+        i = self._index[level]
+        q = self._queues[i]
+        dropped = 0
+        with self._cond:
+            if len(q) >= self.maxsizes[i]:
+                if overflow_policy == OVERFLOW_BLOCK:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(q) >= self.maxsizes[i]:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.stats[level]['dropped'] += 1
+                            return False, 1
+                        self._cond.wait(remaining)
+                elif overflow_policy == OVERFLOW_DROP_NEWEST:
+                    self.stats[level]['dropped'] += 1
+                    return False, 1
+                else:
+                    while len(q) >= self.maxsizes[i]:
+                        q.popleft()
+                        dropped += 1
+                    self.stats[level]['dropped'] += dropped
+
+            q.append((time.monotonic(), item))
+            self.stats[level]['enqueued'] += 1
+            self._cond.notify_all()
+        return True, dropped
+
+    def get(self, timeout=None):
+        """Sıradaki (seviye, okuma) - timeout'ta queue.Empty, kapalı ve boşsa None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                i = self._pick()
+                if i is not None:
+                    enqueued, item = self._queues[i].popleft()
+                    waited = time.monotonic() - enqueued
+                    stats = self.stats[self.names[i]]
+                    stats['served'] += 1
+                    stats['wait_total'] += waited
+                    if waited > stats['wait_max']:
+                        stats['wait_max'] = waited
+                    self._cond.notify_all()  # 'block' modunda bekleyen put'lar
+                    return self.names[i], item
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+    def drain(self):
+        """Bekleyen tüm okumaları at - atılan sayıyı döner"""
+        with self._cond:
+            dropped = 0
+            for name, q in zip(self.names, self._queues):
+                self.stats[name]['dropped'] += len(q)
+                dropped += len(q)
+                q.clear()
+            self._cond.notify_all()
+            return dropped
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def qsize(self, level=None):
+        if level is not None:
+            return len(self._queues[self._index[level]])
+        return sum(len(q) for q in self._queues)
+
+    def _pick(self):
+        # Kredisi kalan en yüksek öncelikli dolu kuyruk; yoksa yeni tur (krediler yenilenir)
+        for attempt in range(2):
+            for i, q in enumerate(self._queues):
+                if q and self._credits[i] > 0:
+                    self._credits[i] -= 1
+                    return i
+            if attempt == 0:
+                self._credits = list(self.weights)
+        return None
@@ -0,0 +1,84 @@
+"""
+Serial reader thread - sadece okur ve parse eder, backend'i asla beklemez
+Port üzerinde bloklanır (polling / sleep yok), byte'ları LineFramer ile frame'lere böler
+"""
+
+import logging
+import threading
+
+import serial
+
+from .binary import MAGIC
+from .framing import LineFramer
+
+logger = logging.getLogger(__name__)
+
+
+def log_framing_error(source, kind, sample):
+    """Framing hatalarını tek satırda raporla"""
+    logger.warning("⚠️ Framing hatası [%s] %s: %r - yeniden senkronize ediliyor", source, kind, sample[:32])
+
+
+def frame_text(frame):
+    """on_line / capture için frame'in yazdırılabilir hali - binary frame'ler 'BIN:<hex>'"""
+    if frame[:2] == MAGIC:
+        return 'BIN:' + frame.hex()
+    return frame.decode('ascii')
+
+
+class SerialReaderThread(threading.Thread):
+    """LoRa serial portundan frame okuyup parse edilen payload'ı callback'e verir"""
+
+    def __init__(self, ser, parse_fn, on_payload, on_line=None, max_frame=256):
+        super().__init__(name="serial-reader", daemon=True)
+        self.ser = ser
+        self.port = ser.port
+        self.parse_fn = parse_fn
+        self.on_payload = on_payload
+        self.on_line = on_line
+        self.framer = LineFramer(
+            max_frame=max_frame,
+            start_marker=b'RID:',
+            binary=True,
+            on_error=lambda kind, sample: log_framing_error(ser.port, kind, sample)
+        )
+        self.stop_event = threading.Event()
+        self.lines_read = 0
+        self.error = None
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                # En az 1 byte gelene kadar (ya da port timeout'una kadar) bloklar,
+                # sonra buffer'da ne varsa tek seferde alır
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except serial.SerialException as e:
+                logger.error("❌ Serial port hatası: %s", e)
+                self.error = e
+                self.stop_event.set()
+                break
+
+            if not data:
+                continue
+
+            for frame in self.framer.feed(data):
+                try:
+                    self.handle_frame(frame)
+                except Exception as e:
+                    logger.error("❌ Hata: %s", e)
+
+    def handle_frame(self, frame):
+        self.lines_read += 1
+        if self.on_line:
+            self.on_line(frame_text(frame))
+
+        # "Coordinator ready..." mesajını atla
+        if b'Coordinator ready' in frame:
+            return
+
+        payload = self.parse_fn(frame)
+        if payload:
+            self.on_payload(payload)
@@ -0,0 +1,298 @@
+"""
+Disk spool - Backend'e ulaşılamadığında okumaları kaybetmemek için yerel kuyruk
+Segmentlere bölünmüş append-only log (satır başına bir JSON kayıt):
+
+    spool/
+      0000000001.log   ← en eski segment (replay buradan başlar)
+      0000000002.log
+      0000000003.log   ← aktif segment (yazma)
+      cursor.json      ← replay'in kaldığı segment + byte offset
+
+Yazmalar tamponlanır ve fsync her kayıtta değil fsync_batch kayıtta ya da
+fsync_interval saniyede bir yapılır. Toplam boyut max_bytes'ı aşarsa en eski
+segment silinir (bounded disk kullanımı).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.log'
+CURSOR_FILE = 'cursor.json'
+
+
+class DiskSpool:
+    """Thread-safe, segmentli append-only spool"""
+
+    def __init__(self, directory, segment_bytes=4 * 1024 * 1024,
+                 max_bytes=256 * 1024 * 1024, fsync_batch=200, fsync_interval=1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.stats = {
+            'spooled': 0,
+            'replayed': 0,
+            'dropped': 0,
+            'corrupt': 0
+        }
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)
+        )
+        # Kapalı segment boyutları sadece açılışta diskten okunur; sonra append / rotate /
+        # silme ile güncellenir (her append'te tüm segmentleri stat'lamamak için)
+        self._sizes = {name: self._file_size(name) for name in self._segments}
+        self._closed_bytes = sum(self._sizes.values())
+        self._cursor = self._load_cursor()
+
+        # Her açılışta yeni bir aktif segment - yarım kalmış eski segmentlere yazılmaz
+        next_seq = int(self._segments[-1][:-len(SEGMENT_SUFFIX)]) + 1 if self._segments else 1
+        self._open_segment(next_seq)
+
+    # ------------------------------------------------------------------ yazma
+
+    def append(self, records):
+        """Kayıtları aktif segmente ekle (fsync toplu yapılır)"""
+        if not records:
+            return
+        data = ''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records).encode('utf-8')
+
+        with self._lock:
+            self._active_file.write(data)
+            self._active_size += len(data)
+            self._unsynced += len(records)
+            self.stats['spooled'] += len(records)
+
+            if self._active_size >= self.segment_bytes:
+                self._rotate()
+            elif self._sync_due():
+                self._sync()
+
+            self._enforce_limit()
+
+    def sync(self):
+        """Bekleyen yazmaları diske indir (periyodik çağrılır)"""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._active_file.close()
+            # Boş aktif segmenti bırakma
+            if self._active_size == 0:
+                self._remove_segment(self._active)
+
+    # ------------------------------------------------------------------ okuma
+
+    def pending_bytes(self):
+        """Henüz replay edilmemiş yaklaşık veri miktarı"""
+        with self._lock:
+            total = self._total_bytes()
+            if self._cursor['segment'] in self._segments:
+                total -= self._cursor['offset']
+            return max(0, total)
+
+    def read_batch(self, max_records=100):
+        """En eski segmentten sıradaki kayıtları oku - (records, cursor) döner
+
+        Dönen cursor replay başarılı olunca commit() ile kaydedilmelidir.
+        Aktif segmente gelindiğinde segment kapatılır ki okunup silinebilsin.
+        """
+        with self._lock:
+            while True:
+                segment = self._current_segment()
+                if segment is None:
+                    return [], None
+
+                if segment == self._active:
+                    if self._active_size == 0:
+                        return [], None
+                    self._rotate()
+
+                offset = self._cursor['offset'] if self._cursor['segment'] == segment else 0
+                records = []
+                with open(self._path(segment), 'rb') as f:
+                    f.seek(offset)
+                    while len(records) < max_records:
+                        line = f.readline()
+                        if not line:
+                            break
+                        if not line.endswith(b'\n'):
+                            # Çökme sırasında yarım yazılmış satır - segmentin sonu say
+                            self.stats['corrupt'] += 1
+                            offset += len(line)
+                            break
+                        offset += len(line)
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            self.stats['corrupt'] += 1
+
+                cursor = {'segment': segment, 'offset': offset}
+                if records:
+                    return records, cursor
+
+                # Segment tamamen tüketilmiş - sil ve bir sonrakine geç
+                self._commit(cursor, 0)
+
+    def commit(self, cursor, replayed):
+        """read_batch() ile okunan kayıtların gönderildiğini kaydet"""
+        if cursor is None:
+            return
+        with self._lock:
+            self._commit(cursor, replayed)
+
+    # ------------------------------------------------------------------ iç işler
+
+    def _commit(self, cursor, replayed):
+        self.stats['replayed'] += replayed
+        segment = cursor['segment']
+        if segment not in self._segments:
+            return  # Bu arada limit yüzünden silinmiş olabilir
+        if segment != self._active and cursor['offset'] >= self._segment_size(segment):
+            self._remove_segment(segment)
+            cursor = {'segment': None, 'offset': 0}
+        self._cursor = cursor
+        self._save_cursor()
+
+    def _current_segment(self):
+        if self._cursor['segment'] in self._segments:
+            return self._cursor['segment']
+        return self._segments[0] if self._segments else None
+
+    def _open_segment(self, seq):
+        self._active = f"{seq:010d}{SEGMENT_SUFFIX}"
+        self._active_file = open(self._path(self._active), 'ab')
+        self._active_size = 0
+        self._segments.append(self._active)
+
+    def _rotate(self):
+        self._sync()
+        self._active_file.close()
+        self._sizes[self._active] = self._active_size
+        self._closed_bytes += self._active_size
+        self._open_segment(int(self._active[:-len(SEGMENT_SUFFIX)]) + 1)
+
+    def _sync_due(self):
+        return (self._unsynced >= self.fsync_batch or
+                time.monotonic() - self._last_sync >= self.fsync_interval)
+
+    def _sync(self):
+        self._active_file.flush()
+        os.fsync(self._active_file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _enforce_limit(self):
+        while self._total_bytes() > self.max_bytes and len(self._segments) > 1:
+            oldest = self._segments[0]
+            path = self._path(oldest)
+            with open(path, 'rb') as f:
+                lost = f.read().count(b'\n')
+            if self._cursor['segment'] == oldest:
+                lost -= self._count_lines_before(path, self._cursor['offset'])
+                self._cursor = {'segment': None, 'offset': 0}
+                self._save_cursor()
+            self._remove_segment(oldest)
+            self.stats['dropped'] += lost
+            logger.warning("🗑️ Spool limiti aşıldı, %s silindi (%d okuma kayboldu)", oldest, lost)
+
+    def _count_lines_before(self, path, offset):
+        with open(path, 'rb') as f:
+            return f.read(offset).count(b'\n')
+
+    def _remove_segment(self, name):
+        os.remove(self._path(name))
+        self._segments.remove(name)
+        self._closed_bytes -= self._sizes.pop(name, 0)
+
+    def _total_bytes(self):
+        return self._closed_bytes + self._active_size
+
+    def _segment_size(self, name):
+        if name == self._active:
+            return self._active_size
+        return self._sizes.get(name, 0)
+
+    def _file_size(self, name):
+        try:
+            return os.path.getsize(self._path(name))
+        except OSError:
+            return 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load_cursor(self):
+        try:
+            with open(self._path(CURSOR_FILE), 'r') as f:
+                cursor = json.load(f)
+            return {'segment': cursor.get('segment'), 'offset': int(cursor.get('offset', 0))}
+        except (OSError, ValueError):
+            return {'segment': None, 'offset': 0}
+
+    def _save_cursor(self):
+        tmp = self._path(CURSOR_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self._cursor, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path(CURSOR_FILE))
+
+
+class SpoolReplayer(threading.Thread):
+    """Spool'daki okumaları sırasıyla ve toplu olarak backend'e tekrar gönderir
+
+    send_fn(records) True/False dönerse kayıtlar spool'dan düşülür (False =
+    backend reddetti, tekrar denemek anlamsız); None dönerse backend hâlâ
+    erişilemez demektir ve aynı batch retry_interval sonra tekrar denenir.
+    """
+
+    def __init__(self, spool, send_fn, batch_size=100, retry_interval=10.0, idle_interval=1.0):
+        super().__init__(name="spool-replayer", daemon=True)
+        self.spool = spool
+        self.send_fn = send_fn
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.idle_interval = idle_interval
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.spool.sync()
+            records, cursor = self.spool.read_batch(self.batch_size)
+            if not records:
+                self.stop_event.wait(self.idle_interval)
+                continue
+
+            try:
+                result = self.send_fn(records)
+            except Exception as e:
+                logger.error("❌ Spool replay hatası: %s", e)
+                result = None
+
+            if result is None:
+                self.stop_event.wait(self.retry_interval)
+                continue
+
+            self.spool.commit(cursor, len(records))
+            if result:
+                logger.info("♻️ Spool'dan %d okuma backend'e gönderildi", len(records))
+            else:
+                logger.warning("⚠️ Spool'daki %d okuma backend tarafından reddedildi, atlandı", len(records))
@@ -0,0 +1,107 @@
+"""
+Coalescer + DeadbandFilter testi - key setinin tamamlanması / tekrar eden key / pencere
+süresiyle birleştirme, öğrenilen key setleri; deadband eşikleri ve heartbeat
+
+    python coordinator/test_coalesce.py
+    python -m pytest coordinator/test_coalesce.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coordinator.coalesce import Coalescer
+from coordinator.deadband import DeadbandFilter
+
+
+def payload(router, data, sensor='1013'):
+    return {'router': router, 'sensor': sensor, 'data': data}
+
+
+def test_coalesce_expected_keys():
+    emitted = []
+    coalescer = Coalescer(emitted.append, expected_keys={'107': ['WT', 'WH', 'PR']})
+    coalescer.add(payload('107', {'WT': 25.8}))
+    coalescer.add(payload('107', {'WH': 55.1}))
+    assert emitted == []
+    coalescer.add(payload('107', {'PR': 1012.0}))
+    assert emitted == [payload('107', {'WT': 25.8, 'WH': 55.1, 'PR': 1012.0})]
+    assert coalescer.stats == {'fields_in': 3, 'readings_out': 1}
+
+
+def test_coalesce_repeated_key_starts_new_cycle():
+    emitted = []
+    coalescer = Coalescer(emitted.append, learn_keys=False)
+    coalescer.add(payload('107', {'WT': 25.8}))
+    coalescer.add(payload('107', {'WH': 55.1}))
+    coalescer.add(payload('107', {'WT': 26.0}))
+    assert emitted == [payload('107', {'WT': 25.8, 'WH': 55.1})]
+    # Farklı sensor ayrı pencerede birleşir
+    coalescer.add(payload('107', {'WT': 30.0}, sensor='1014'))
+    coalescer.flush_all()
+    assert emitted[1:] == [payload('107', {'WT': 26.0}), payload('107', {'WT': 30.0}, sensor='1014')]
+
+
+def test_coalesce_learns_keys():
+    emitted = []
+    coalescer = Coalescer(emitted.append)
+    coalescer.add(payload('107', {'WT': 25.8}))
+    coalescer.add(payload('107', {'WH': 55.1}))
+    coalescer.add(payload('107', {'WT': 26.0}))  # Tekrar eden key ilk döngüyü kapatır, {WT, WH} öğrenilir
+    assert emitted == [payload('107', {'WT': 25.8, 'WH': 55.1})]
+    # İkinci döngü tamamlanınca yeni bir key beklemeden gönderilir
+    coalescer.add(payload('107', {'WH': 55.3}))
+    assert emitted[1:] == [payload('107', {'WT': 26.0, 'WH': 55.3})]
+
+
+def test_coalesce_window_expiry():
+    emitted = []
+    coalescer = Coalescer(emitted.append, window=3.0)
+    coalescer.add(payload('107', {'WT': 25.8}))
+    coalescer.flush_expired(now=time.monotonic() + 1.0)
+    assert emitted == []
+    coalescer.flush_expired(now=time.monotonic() + 3.0)
+    assert emitted == [payload('107', {'WT': 25.8})]
+
+
+def test_deadband_thresholds():
+    band = DeadbandFilter({'PR': {'abs': 0.5}, 'WH': {'rel': 0.02}}, heartbeat=600.0)
+    first = payload('107', {'PR': 1012.0, 'WH': 50.0, 'WT': 25.0})
+    assert band.filter(first, now=0.0) is first
+    # PR +0.4 (< 0.5) ve WH +0.9 (< %2) bastırılır; kuralı olmayan WT her zaman geçer
+    assert band.filter(payload('107', {'PR': 1012.4, 'WH': 50.9, 'WT': 25.0}), now=1.0) == payload('107', {'WT': 25.0})
+    assert band.filter(payload('107', {'PR': 1012.4, 'WH': 50.9}), now=2.0) is None
+    # Eşik son gönderilen değere göre ölçülür (sürünen değişim birikir)
+    assert band.filter(payload('107', {'PR': 1012.5, 'WH': 51.0}), now=3.0) == payload('107', {'PR': 1012.5, 'WH': 51.0})
+    assert band.stats['readings_suppressed'] == 1
+    assert band.stats['suppressed_by_key'] == {'PR': 2, 'WH': 2}
+    assert band.savings() == 4 / 10
+
+
+def test_deadband_heartbeat_and_keys():
+    band = DeadbandFilter({'PR': {'abs': 0.5}}, heartbeat=600.0)
+    band.filter(payload('107', {'PR': 1012.0}), now=0.0)
+    assert band.filter(payload('107', {'PR': 1012.0}), now=599.0) is None
+    assert band.filter(payload('107', {'PR': 1012.0}), now=600.0) is not None
+    # Durum router/sensor başına tutulur
+    assert band.filter(payload('108', {'PR': 1012.0}), now=601.0) is not None
+    assert band.filter(payload('107', {'PR': 1012.0}, sensor='1014'), now=601.0) is not None
+
+
+def main():
+    tests = [test_coalesce_expected_keys, test_coalesce_repeated_key_starts_new_cycle, test_coalesce_learns_keys,
+             test_coalesce_window_expiry, test_deadband_thresholds, test_deadband_heartbeat_and_keys]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Binary frame + LineFramer testi - CRC'li encode/decode round-trip, byte byte gelen karışık
+text / binary akışın bölünmesi, bozuk CRC ve çok uzun satırdan sonra yeniden senkronizasyon
+
+    python coordinator/test_framing.py
+    python -m pytest coordinator/test_framing.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coordinator.binary import crc_ok, decode_frame, encode_frame, frame_size
+from coordinator.framing import (FRAME_BAD_CRC, FRAME_INVALID_BYTES, FRAME_LEADING_JUNK, FRAME_TOO_LONG,
+                                 LineFramer)
+
+
+def test_binary_round_trip():
+    data = {'WT': 25.83, 'WH': 55.1, 'PR': 1012.3, 'WG': 41.257, 'AL': -12}
+    frame = encode_frame(107, '1013', data)
+    assert crc_ok(frame)
+    assert frame_size(frame[:4]) == len(frame)
+    router, sensor, fields = decode_frame(frame)
+    assert (router, sensor) == ('107', '1013')
+    assert dict(fields) == data
+    # Alanlar bitmap sırasıyla gelir (KEY_TABLE)
+    assert [key for key, _ in fields] == ['WT', 'WH', 'PR', 'AL', 'WG']
+
+
+def test_binary_docstring_example_size():
+    frame = encode_frame(107, 1013, {'WT': 25.83})
+    assert len(frame) == 14
+    assert frame[:12] == bytes.fromhex('BE5701 08 006B 03F5 0001 0A17'.replace(' ', ''))
+
+
+def test_binary_rejects_corruption():
+    frame = encode_frame(107, 1013, {'WT': 25.83, 'WH': 55.1})
+    for i in range(2, len(frame)):
+        corrupted = bytearray(frame)
+        corrupted[i] ^= 0x01
+        assert decode_frame(bytes(corrupted)) is None, i
+    assert decode_frame(frame[:-1]) is None
+    assert decode_frame(frame + b'\x00') is None
+
+
+def test_binary_encode_validation():
+    for data in ({}, {'XX': 1.0}, {'WT': 400.0}, {'WH': -1.0}):
+        try:
+            encode_frame(107, 1013, data)
+        except ValueError:
+            continue
+        raise AssertionError(f"ValueError bekleniyordu: {data}")
+
+
+def test_framer_mixed_stream_byte_by_byte():
+    binary = encode_frame(108, 1014, {'WT': 31.5, 'CO': 12.0})
+    stream = b'RID:107; SID:1013; WT: 25.83\r\n' + binary + b'RID:107; SID:1013; WH: 55.1\n'
+    framer = LineFramer(binary=True)
+    frames = []
+    for i in range(len(stream)):
+        frames += framer.feed(stream[i:i + 1])
+    assert frames == [b'RID:107; SID:1013; WT: 25.83', binary, b'RID:107; SID:1013; WH: 55.1']
+    assert framer.stats['errors'] == 0
+    assert framer.stats['bytes'] == len(stream)
+
+
+def test_framer_bad_crc_resyncs():
+    good = encode_frame(107, 1013, {'WT': 25.83})
+    bad = bytearray(good)
+    bad[-1] ^= 0xFF
+    errors = []
+    framer = LineFramer(binary=True, on_error=lambda kind, sample: errors.append(kind))
+    frames = framer.feed(bytes(bad) + good + b'RID:107; SID:1013; PR: 1012\n')
+    assert frames == [good, b'RID:107; SID:1013; PR: 1012']
+    assert errors[0] == FRAME_BAD_CRC
+
+
+def test_framer_too_long_then_recovers():
+    errors = []
+    framer = LineFramer(max_frame=32, on_error=lambda kind, sample: errors.append(kind))
+    assert framer.feed(b'X' * 40) == []
+    assert errors == [FRAME_TOO_LONG]
+    # Uzun satırın kalanı newline'a kadar atlanır, sonraki satır normal gelir
+    assert framer.feed(b'YYYY\nRID:107; SID:1013; WT: 25.83\n') == [b'RID:107; SID:1013; WT: 25.83']
+    assert framer.stats['discarded_bytes'] == 45
+
+
+def test_framer_start_marker_and_invalid_bytes():
+    errors = []
+    framer = LineFramer(start_marker=b'RID:', on_error=lambda kind, sample: errors.append(kind))
+    frames = framer.feed(b'\x00boot RID:107; SID:1013; WT: 25.83\nRID:1\xff\n')
+    # Marker'dan önceki gürültü atılır, yazdırılamaz byte içeren satır tamamen atlanır
+    assert frames == [b'RID:107; SID:1013; WT: 25.83']
+    assert errors == [FRAME_LEADING_JUNK, FRAME_INVALID_BYTES]
+
+
+def main():
+    tests = [test_binary_round_trip, test_binary_docstring_example_size, test_binary_rejects_corruption,
+             test_binary_encode_validation, test_framer_mixed_stream_byte_by_byte, test_framer_bad_crc_resyncs,
+             test_framer_too_long_then_recovers, test_framer_start_marker_and_invalid_bytes]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+parse_frame testi - cache'li hızlı yol (sıcak) ile genel yolun (soğuk) aynı Record'u vermesi,
+geçersiz satırlar ve binary frame'in aynı Record'a çözülmesi
+
+    python coordinator/test_protocol.py
+    python -m pytest coordinator/test_protocol.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coordinator import protocol
+from coordinator.binary import encode_frame
+from coordinator.protocol import Record, parse_frame
+
+LINES = [
+    b'RID:107; SID:1013; WT: 25.83',
+    b'RID:107; SID:1013; WT: 25.83;',
+    b'RID:107; SID:1013; WT:abc',
+    b'RID:107; SID:1013; WT: 26.1',
+    b'RID:108; SID:1014; WH:55.1 ; ',
+    b'RID:108; SID:1014; WT:25.83; WH:55.1; PR:1012; AL:300',
+    b'RID:108;SID:1014;WH:55.1',
+    b'RID:108; SID:1014; WH 55.1',
+    b'RID:108; SID:1014',
+    b'SID:1014; RID:108; WH:55.1',
+    b'RID:; SID:1014; WH:55.1',
+    b'RID:108; SID:1014; W-H:55.1',
+    b'garbage',
+    b'',
+]
+
+
+def test_cold_and_warm_cache_parity():
+    protocol._prefix_cache.clear()
+    cold = [protocol._parse_full(line) for line in LINES]
+    # İlk geçiş cache'i doldurur, ikinci geçiş hızlı yoldan gider - sonuç aynı olmalı
+    for _ in range(2):
+        assert [parse_frame(line) for line in LINES] == cold
+    assert protocol._prefix_cache  # Tek alanlı satırlar cache'lendi
+    protocol._prefix_cache.clear()
+
+
+def test_parsed_records():
+    protocol._prefix_cache.clear()
+    assert parse_frame(LINES[0]) == Record('107', '1013', (('WT', 25.83),))
+    assert parse_frame(LINES[0]).to_payload() == {'router': '107', 'sensor': '1013', 'data': {'WT': 25.83}}
+    assert parse_frame(LINES[5]).fields == (('WT', 25.83), ('WH', 55.1), ('PR', 1012.0), ('AL', 300.0))
+    for line in LINES[2:3] + LINES[7:]:
+        assert parse_frame(line) is None, line
+    # Sıcak cache'te sayı olmayan değer genel yola düşer, yine None
+    parse_frame(LINES[0])
+    assert parse_frame(LINES[2]) is None
+    protocol._prefix_cache.clear()
+
+
+def test_binary_frame_same_record_as_text():
+    text = parse_frame(b'RID:107; SID:1013; WT:25.83; WH:55.1; PR:1012')
+    binary = parse_frame(encode_frame(107, 1013, {'WT': 25.83, 'WH': 55.1, 'PR': 1012}))
+    assert binary == text
+    corrupted = bytearray(encode_frame(107, 1013, {'WT': 25.83}))
+    corrupted[-1] ^= 0xFF
+    assert parse_frame(bytes(corrupted)) is None
+
+
+def main():
+    tests = [test_cold_and_warm_cache_parity, test_parsed_records, test_binary_frame_same_record_as_text]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
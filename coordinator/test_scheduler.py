@@ -0,0 +1,125 @@
+"""
+PriorityQueues / PriorityRules testi - dolu kuyrukta block / drop_newest / drop_oldest
+davranışları, ağırlıklı round-robin sırası ve kural sınıflandırması
+
+    python coordinator/test_scheduler.py
+    python -m pytest coordinator/test_scheduler.py
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from coordinator.scheduler import (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, PriorityQueues,
+                                   PriorityRules)
+
+
+def drain_items(queues):
+    items = []
+    while queues.qsize():
+        items.append(queues.get(timeout=0))
+    return items
+
+
+def test_drop_newest():
+    queues = PriorityQueues([('routine', 2, 1)])
+    assert queues.put(1, 'routine', OVERFLOW_DROP_NEWEST) == (True, 0)
+    assert queues.put(2, 'routine', OVERFLOW_DROP_NEWEST) == (True, 0)
+    assert queues.put(3, 'routine', OVERFLOW_DROP_NEWEST) == (False, 1)
+    assert drain_items(queues) == [('routine', 1), ('routine', 2)]
+    assert queues.stats['routine']['dropped'] == 1
+
+
+def test_drop_oldest():
+    queues = PriorityQueues([('routine', 2, 1)])
+    for item in (1, 2):
+        queues.put(item, 'routine', OVERFLOW_DROP_OLDEST)
+    assert queues.put(3, 'routine', OVERFLOW_DROP_OLDEST) == (True, 1)
+    assert drain_items(queues) == [('routine', 2), ('routine', 3)]
+    stats = queues.stats['routine']
+    assert (stats['enqueued'], stats['dropped'], stats['served']) == (3, 1, 2)
+
+
+def test_block_times_out():
+    queues = PriorityQueues([('routine', 1, 1)])
+    queues.put(1, 'routine', OVERFLOW_BLOCK)
+    started = time.monotonic()
+    assert queues.put(2, 'routine', OVERFLOW_BLOCK, timeout=0.05) == (False, 1)
+    assert time.monotonic() - started >= 0.05
+    assert drain_items(queues) == [('routine', 1)]
+
+
+def test_block_waits_for_consumer():
+    queues = PriorityQueues([('routine', 1, 1)])
+    queues.put(1, 'routine', OVERFLOW_BLOCK)
+    consumer = threading.Timer(0.05, queues.get)
+    consumer.start()
+    # Reader bekler (backpressure), tüketici yer açınca okuma kaybolmadan eklenir
+    assert queues.put(2, 'routine', OVERFLOW_BLOCK, timeout=5.0) == (True, 0)
+    consumer.join()
+    assert drain_items(queues) == [('routine', 2)]
+    assert queues.stats['routine']['dropped'] == 0
+
+
+def test_weighted_round_robin():
+    queues = PriorityQueues([('critical', 100, 3), ('routine', 100, 1)])
+    for i in range(8):
+        queues.put(i, 'critical')
+        queues.put(i, 'routine')
+    levels = [level for level, _ in drain_items(queues)]
+    # Turda 3 kritik + 1 rutin; rutin aç kalmaz, kritikler bitince rutinler art arda
+    assert levels[:8] == ['critical'] * 3 + ['routine'] + ['critical'] * 3 + ['routine']
+    assert levels[8:] == ['critical', 'critical', 'routine', 'routine'] + ['routine'] * 4
+
+
+def test_get_timeout_and_close():
+    queues = PriorityQueues([('routine', 1, 1)])
+    try:
+        queues.get(timeout=0.01)
+    except queue.Empty:
+        pass
+    else:
+        raise AssertionError("queue.Empty bekleniyordu")
+    queues.put(1, 'routine')
+    queues.close()
+    assert queues.get() == ('routine', 1)  # Kapanınca önce kalanlar boşaltılır
+    assert queues.get() is None
+
+
+def test_rules_classify():
+    rules = PriorityRules([
+        {'key': 'CO', 'above': 50, 'priority': 'critical'},
+        {'key': 'WT', 'above': 40, 'below': 5, 'priority': 'high'},
+        {'anomaly': True, 'priority': 'high'}
+    ], ['critical', 'high', 'routine'])
+    assert rules.classify({'data': {'WT': 25.0}}) == 'routine'
+    assert rules.classify({'data': {'WT': 41.0}}) == 'high'
+    assert rules.classify({'data': {'WT': 4.0, 'CO': 51.0}}) == 'critical'
+    assert rules.classify({'data': {'WT': 25.0}, 'anomaly': {'isAnomaly': True}}) == 'high'
+    assert rules.classify({'data': {'WT': 25.0}, 'anomaly': {'isAnomaly': False}}) == 'routine'
+    try:
+        PriorityRules([{'key': 'WT', 'above': 1, 'priority': 'urgent'}], ['high', 'routine'])
+    except ValueError:
+        return
+    raise AssertionError("Tanımsız seviye için ValueError bekleniyordu")
+
+
+def main():
+    tests = [test_drop_newest, test_drop_oldest, test_block_times_out, test_block_waits_for_consumer,
+             test_weighted_round_robin, test_get_timeout_and_close, test_rules_classify]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
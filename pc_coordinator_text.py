@@ -7,27 +7,187 @@ import serial
 import serial.tools.list_ports
 import requests
 from datetime import datetime
+import argparse
+import asyncio
+import logging
+import os
 import time
 import re
+from operator import itemgetter
+
+from coordinator import (
+    UploadPipeline, SerialReaderThread, BackendClient, CircuitOpenError,
+    DiskSpool, SpoolReplayer, GatewayReader, run_gateways, parse_frame,
+    Coalescer, DeadbandFilter, MetricsRegistry, MetricsServer, RateMeter,
+    setup_logging, CaptureWriter, ReplaySerial, StubBackend, load_capture, RouterHistory,
+    AnomalyPrescreen, load_anomaly_detector, is_binary_frame, PriorityRules
+)
 
 # Configuration
 BACKEND_URL = 'http://localhost:5000/api/lora/data'
+BATCH_URL = 'http://localhost:5000/api/lora/batch'
+HEALTH_URL = 'http://localhost:5000/api/health'
+SERIAL_BAUDRATE = 9600
+
+# Backend HTTP client - keep-alive havuzu, retry ve devre kesici
+HTTP_POOL_SIZE = 4                # Açık tutulacak maksimum bağlantı (>= UPLOAD_WORKERS)
+HTTP_CONNECT_TIMEOUT = 3.05       # Bağlantı kurma timeout'u (s)
+HTTP_READ_TIMEOUT = 10.0          # Cevap bekleme timeout'u (s)
+HTTP_MAX_RETRIES = 3              # Batch upload için tekrar deneme sayısı
+HTTP_BACKOFF_BASE = 0.5           # Exponential backoff başlangıcı (s)
+HTTP_BACKOFF_MAX = 8.0            # Tek bekleme için üst sınır (s)
+BREAKER_FAILURE_THRESHOLD = 5     # Art arda kaç hatada devre açılsın
+BREAKER_RESET_TIMEOUT = 30.0      # Devre açıkken bekleme süresi (s)
+
+# Upload kuyruğu - serial okuma backend'i beklemez
+UPLOAD_QUEUE_SIZE = 1000          # Kuyrukta bekleyebilecek maksimum paket
+UPLOAD_WORKERS = 2                # Paralel backend gönderim thread sayısı
+UPLOAD_OVERFLOW_POLICY = 'drop_oldest'  # 'block' | 'drop_newest' | 'drop_oldest'
+UPLOAD_BLOCK_TIMEOUT = 5.0        # 'block' modunda reader'ın en fazla bekleme süresi (s)
+UPLOAD_BATCH_SIZE = 50            # Tek istekte gönderilecek maksimum okuma
+UPLOAD_BATCH_WAIT = 2.0           # Batch dolmasa bile en fazla bu kadar bekle (s)
+
+# Öncelikli gönderim - alarm okumaları ayrı kuyrukta, rutin okumaların önünde
+PRIORITY_LEVELS = (               # (seviye, kuyruk boyutu, tur başına gönderim) - yüksekten düşüğe
+    ('critical', 100, 8),
+    ('high', 200, 4),
+    ('normal', UPLOAD_QUEUE_SIZE, 1),
+)                                 # Her turda her seviye en az 1 okuma gönderir (aç kalma yok)
+PRIORITY_RULES = [                # above: değer > eşik, below: değer < eşik
+    {'key': 'CO', 'above': 50, 'priority': 'critical'},               # ppm
+    {'key': 'NO', 'above': 5, 'priority': 'critical'},                # ppm
+    {'key': 'WT', 'above': 40, 'below': 5, 'priority': 'high'},       # AnomalyDetector.threshold_based_detection
+    {'key': 'WH', 'above': 90, 'below': 10, 'priority': 'high'},      # ile aynı sınırlar
+    {'key': 'WG', 'above': 100, 'below': 0, 'priority': 'high'},
+    {'anomaly': True, 'priority': 'high'},                            # edge ön taraması
+]
+
+# Router bazında birleştirme - tek satırda tek key gönderen router'lar için
+COALESCE_WINDOW = 3.0             # Bir router döngüsünün en fazla süresi (s) - 0: kapalı
+COALESCE_EXPECTED_KEYS = {        # Bilinen router'ların bir döngüde gönderdiği key'ler
+    '107': ('WT', 'PR', 'AL', 'WH'),   # BME280
+    '108': ('CO', 'NO'),               # MICS-4514
+}                                 # Listede olmayan router'lar için key seti öğrenilir
+
+# Deadband - anlamlı değişmeyen değerler gönderilmez, heartbeat süresinde bir gönderilir
+DEADBAND_ENABLED = True
+DEADBAND_HEARTBEAT = 600.0        # Değişmese de en geç bu kadar saniyede bir gönder
+DEADBAND_RULES = {                # abs: mutlak fark, rel: göreli fark (0.01 = %1)
+    'PR': {'abs': 0.5},           # hPa
+    'AL': {'abs': 1.0},           # m
+    'WG': {'abs': 0.05},          # kg
+    'WT': {'abs': 0.2},           # °C
+    'WH': {'abs': 1.0},           # %
+}                                 # Kuralı olmayan key'ler (CO, NO vb.) her zaman gönderilir
+
+# Router geçmişi - router/key başına son HISTORY_CAPACITY okuma (trend / anomali için)
+HISTORY_CAPACITY = 128            # Seri başına ring buffer boyutu
+HISTORY_IDLE_TIMEOUT = 3600.0     # Bu kadar süre veri göndermeyen router unutulur (s)
+HISTORY_MAX_ROUTERS = 256         # Aynı anda tutulacak maksimum router
+
+# Edge anomali ön taraması - AnomalyDetector coordinator içinde bir kez yüklenir (--prescreen)
+ANOMALY_PRESCREEN_ENABLED = False # numpy / pandas / scikit-learn gerektirir
+ANOMALY_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'ml', 'models')
+ANOMALY_MODEL_PATH = None         # None: ANOMALY_MODELS_DIR/anomaly_model.joblib
+ANOMALY_HISTORY_POINTS = 10       # Trend feature'ları için kullanılacak son okuma sayısı
+ANOMALY_PRESCREEN_ONLINE = False  # Router başına EWMA baseline (online_detector.py) - ingest'te öğrenir
+
+STATS_INTERVAL = 60               # Kuyruk istatistiklerini yazdırma aralığı (s)
+
+# Metrikler ve log - paket başına mesajlar DEBUG seviyesinde, sayılar /metrics'te
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9108               # http://127.0.0.1:9108/metrics - 0: kapalı
+LOG_LEVEL = 'INFO'                # Paket başına detay için: --log-level DEBUG
+LOG_BURST = 5                     # Aynı mesajdan LOG_INTERVAL içinde en fazla kaç tane
+LOG_INTERVAL = 10.0               # Tekrarlanan mesaj bastırma penceresi (s)
+
+# Replay - kaydedilmiş serial log'u stub backend'e karşı oynatma (--replay)
+REPLAY_SPEED = 1.0                # 1: kayıttaki hız, N: N kat hızlı, 0: olabildiğince hızlı
+REPLAY_LINE_INTERVAL = 0.1        # Zaman damgasız satırlar arası varsayılan süre (s)
+REPLAY_STUB_LATENCY = 0.0         # Stub backend'in her isteğe ekleyeceği gecikme (s)
 
-# Router data collection - Dinamik yapı (artık manuel router'lar için)
-# Cache sistemi artık sadece gelen verileri geçici tutmak için kullanılacak
-router_data_cache = {}
+# Disk spool - backend'e ulaşılamazken okumalar burada bekler
+SPOOL_ENABLED = True
+SPOOL_DIR = 'coordinator_spool'
+SPOOL_SEGMENT_BYTES = 4 * 1024 * 1024   # Segment dosyası boyutu (rotation)
+SPOOL_MAX_BYTES = 256 * 1024 * 1024     # Toplam disk limiti - aşılınca en eski segment silinir
+SPOOL_FSYNC_BATCH = 200                 # Kaç kayıtta bir fsync
+SPOOL_FSYNC_INTERVAL = 1.0              # En fazla kaç saniyede bir fsync
+SPOOL_REPLAY_BATCH = 100                # Replay sırasında tek istekteki okuma sayısı
+SPOOL_RETRY_INTERVAL = 10.0             # Backend hâlâ kapalıysa tekrar deneme aralığı (s)
 
-def add_router_to_cache(router_id, sensor_id=None):
-    """Yeni router'ı cache'e ekle"""
-    if router_id not in router_data_cache:
-        router_data_cache[router_id] = {
-            'sensor_id': sensor_id,
-            'data': {},
-            'last_update': None
-        }
-        print(f"📝 Router {router_id} cache'e eklendi (Sensor ID: {sensor_id})")
+backend_client = BackendClient(
+    pool_size=HTTP_POOL_SIZE,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+    max_retries=HTTP_MAX_RETRIES,
+    backoff_base=HTTP_BACKOFF_BASE,
+    backoff_max=HTTP_BACKOFF_MAX,
+    breaker_threshold=BREAKER_FAILURE_THRESHOLD,
+    breaker_reset=BREAKER_RESET_TIMEOUT
+)
 
-# Bu fonksiyon silindi - send_to_backend içindeki update_router_cache kullanılacak
+# Spool main() içinde açılır
+reading_spool = None
+
+# --record verilirse okunan satırlar replay için buraya yazılır
+capture_writer = None
+
+logger = logging.getLogger('coordinator.main')
+
+# Hot-path metrikleri - değerler /metrics endpoint'inden okunur
+metrics = MetricsRegistry()
+active_readers = []               # Çalışan SerialReaderThread / GatewayReader'lar
+parse_failures = metrics.counter('parse_failures_total', "Parse edilemeyen RID satırları")
+packets_by_router = metrics.counter('packets_total', "Parse edilen paketler", labels=('router',))
+http_responses = metrics.counter('http_responses_total', "Backend cevapları (HTTP kodu ya da hata tipi)",
+                                 labels=('code',))
+upload_latency = metrics.histogram('upload_latency_seconds', "Backend POST süresi (retry'lar dahil)")
+metrics.counter_fn('lines_read_total', "Serial porttan okunan frame'ler",
+                   lambda: {(r.port,): r.lines_read for r in active_readers}, labels=('port',))
+metrics.counter_fn('framing_errors_total', "Framing hataları (uzun / bozuk / çöp byte)",
+                   lambda: {(r.port,): r.framer.stats['errors'] for r in active_readers}, labels=('port',))
+metrics.counter_fn('serial_bytes_total', "Serial porttan okunan byte'lar",
+                   lambda: {(r.port,): r.framer.stats['bytes'] for r in active_readers}, labels=('port',))
+prescreen_latency = metrics.histogram('prescreen_seconds', "Edge anomali skorlama süresi",
+                                      buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1))
+anomalies_by_router = metrics.counter('anomalies_total', "Edge ön taramasında anomali bulunan okumalar",
+                                      labels=('router',))
+serial_rate = RateMeter(lambda: sum(r.framer.stats['bytes'] for r in active_readers))
+metrics.gauge('serial_bytes_per_second', "Son 10 saniyedeki serial okuma hızı", fn=serial_rate.rate)
+
+# Router verisi - router/key bazında sınırlı ring buffer geçmişi
+router_history = RouterHistory(
+    capacity=HISTORY_CAPACITY,
+    idle_timeout=HISTORY_IDLE_TIMEOUT,
+    max_routers=HISTORY_MAX_ROUTERS
+)
+metrics.gauge('history_routers', "Geçmişi tutulan router sayısı", fn=lambda: len(router_history))
+metrics.counter_fn('history_evicted_total', "Sessiz kaldığı için unutulan router'lar",
+                   lambda: router_history.stats['evicted'])
+
+# Data key mapping - hangi data_key hangi geçmiş key'ine karşılık gelir
+CACHE_KEY_MAPPING = {
+    # Router 107 (BME280)
+    'WT': 'temperature',
+    'PR': 'pressure', 
+    'AL': 'altitude',
+    'WH': 'humidity',
+    # Router 108 (MICS-4514)
+    'CO': 'co',
+    'NO': 'no',
+    # Router 109+ (Genişletilebilir)
+    'WG': 'weight',
+    'VB': 'vibration',
+    'SD': 'sound',
+    'LT': 'light',
+    'UV': 'uv',
+    'PH': 'ph',
+    'MS': 'moisture'
+}
+
+# Deadband durumu - router/sensor bazında son gönderilen değer ve zamanı
+router_deadband_state = {}
 
 def find_serial_port():
     """Mevcut COM portlarını tara ve LoRa modülünü bul"""
@@ -47,86 +207,65 @@ def find_serial_port():
     print(f"📡 Otomatik seçilen: {selected_port}")
     return selected_port
 
+def log_line(line, gateway=None):
+    """Okunan ham satırı logla ve --record açıksa capture dosyasına yaz"""
+    if gateway:
+        logger.debug("📝 Text [%s]: %s", gateway, line)
+    else:
+        logger.debug("📝 Text: %s", line)
+    if capture_writer:
+        capture_writer.write(line)
+
+def find_serial_ports():
+    """Tüm COM portlarını döndür - multi-gateway modu için"""
+    ports = [port.device for port in serial.tools.list_ports.comports()]
+    
+    if not ports:
+        print("❌ Hiç COM port bulunamadı!")
+        print("💡 LoRa E32 modüllerinizin bilgisayara bağlı olduğundan emin olun")
+        return []
+    
+    print(f"📡 {len(ports)} gateway portu bulundu: {', '.join(ports)}")
+    return ports
+
 def parse_text_data(line):
-    """Text formatındaki veriyi parse et: RID:107; SID:1013; WT: 25.83"""
-    try:
-        # RID:107; SID:1013; WT: 25.83 formatını parse et
-        if 'RID:' in line and 'SID:' in line:
-            parts = line.strip().split(';')
-            
-            # RID kısmını parse et
-            rid_part = parts[0].strip()  # "RID:107"
-            router_id = rid_part.split(':')[1].strip()  # "107"
-            
-            # SID kısmını parse et
-            sid_part = parts[1].strip()  # " SID:1013"
-            sensor_id = sid_part.split(':')[1].strip()  # "1013"
-            
-            # Data kısmını parse et
-            data_part = parts[2].strip()  # " WT: 25.83"
-            data_split = data_part.split(':')
-            data_key = data_split[0].strip()  # "WT"
-            data_value = float(data_split[1].strip())  # 25.83
-            
-            return {
-                'router': router_id,
-                'sensor': sensor_id,
-                'data_key': data_key,
-                'data_value': data_value
-            }
-    except Exception as e:
-        print(f"❌ Text parse hatası: {e}")
-        print(f"   Line: {line}")
-    return None
+    """Text formatındaki veriyi parse et: RID:107; SID:1013; WT: 25.83
+    
+    Bir satırda birden fazla alan olabilir: RID:107; SID:1013; WT:25.83; WH:55.1; PR:1012
+    Reader'lar frame'i bytes olarak verir; str de kabul edilir.
+    """
+    if isinstance(line, str):
+        line = line.encode('ascii', errors='ignore').strip()
+    
+    record = parse_frame(line)
+    if record is None:
+        if b'RID:' in line or is_binary_frame(line):
+            parse_failures.inc()
+            logger.warning("❌ Text parse hatası: %r", line)
+        return None
+    
+    return record.to_payload()
 
 def update_router_cache(payload):
-    """Router verisini cache'e ekle ve güncel durumu göster - Dinamik yapı"""
+    """Router verisini geçmişe ekle ve güncel durumu göster - Dinamik yapı"""
     router_id = payload['router']
-    data_key = payload['data_key']
-    value = payload['data_value']
-    
-    # Cache'i güncelle - router yoksa oluştur
-    if router_id not in router_data_cache:
-        router_data_cache[router_id] = {'last_update': None}
-    
-    # Data key mapping - hangi data_key hangi cache key'e karşılık gelir
-    cache_mapping = {
-        # Router 107 (BME280)
-        'WT': 'temperature',
-        'PR': 'pressure', 
-        'AL': 'altitude',
-        'WH': 'humidity',
-        # Router 108 (MICS-4514)
-        'CO': 'co',
-        'NO': 'no',
-        # Router 109+ (Genişletilebilir)
-        'WG': 'weight',
-        'VB': 'vibration',
-        'SD': 'sound',
-        'LT': 'light',
-        'UV': 'uv',
-        'PH': 'ph',
-        'MS': 'moisture'
-    }
     
-    cache_key = cache_mapping.get(data_key, data_key.lower())
-    router_data_cache[router_id][cache_key] = value
-    router_data_cache[router_id]['last_update'] = datetime.now()
+    fields = {}
+    for data_key, value in payload['data'].items():
+        cache_key = CACHE_KEY_MAPPING.get(data_key, data_key.lower())
+        fields[cache_key] = value
+        
+        # Güncel durumu göster
+        logger.debug("📥 Router %s: %s = %.2f → %s", router_id, data_key, value, cache_key)
     
-    # Güncel durumu göster
-    print(f"📥 Router {router_id}: {data_key} = {value:.2f} → {cache_key}")
+    router_history.record(router_id, fields, sensor=payload['sensor'])
 
-def send_to_backend(payload):
-    """Gelen veriyi anında backend'e uygun formatta gönder"""
+def build_api_data(payload):
+    """Parse edilmiş payload'dan backend API formatını oluştur"""
     router_id = payload['router']
     sensor_id = payload['sensor']
-    data_key = payload['data_key']
-    value = payload['data_value']
     device_id = f"BT{router_id}"
     
-    # Router cache'ini güncelle
-    update_router_cache(payload)
-    
     # Backend API formatı - Router ve Sensor ID ayrı ayrı gönder
     api_data = {
         "deviceId": device_id,
@@ -134,7 +273,7 @@ def send_to_backend(payload):
         "sensorId": sensor_id,      # ⭐ Sensor ID ayrı  
         "batteryLevel": 85,
         "signalStrength": -65,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": payload.get('timestamp') or datetime.now().isoformat(),
         "sensorData": {}
     }
     
@@ -166,41 +305,120 @@ def send_to_backend(payload):
         "MS": "moisture"
     }
     
-    # Veri anahtarını backend parametresine çevir
-    backend_key = data_mapping.get(data_key, data_key.lower())
-    api_data["sensorData"][backend_key] = value
+    # Edge ön taramasının sonucu (backend metadata.anomaly olarak saklar)
+    if payload.get('anomaly'):
+        api_data["anomaly"] = payload['anomaly']
     
-    print(f"📤 Backend'e gönderiliyor: {device_id} (R:{router_id}/S:{sensor_id}) - {data_key} → {backend_key} = {value}")
+    # Eski formatta spool'a yazılmış okumalar: tek data_key/data_value
+    data = payload.get('data') or {payload['data_key']: payload['data_value']}
+    
+    # Veri anahtarlarını backend parametresine çevir
+    for data_key, value in data.items():
+        backend_key = data_mapping.get(data_key, data_key.lower())
+        api_data["sensorData"][backend_key] = value
+    
+    return api_data
+
+def post_to_backend(url, data, idempotent=False):
+    """backend_client.post_json + gecikme ve HTTP kodu metrikleri"""
+    started = time.monotonic()
+    try:
+        response = backend_client.post_json(url, data, idempotent=idempotent)
+    except CircuitOpenError:
+        http_responses.inc('circuit_open')
+        raise
+    except requests.exceptions.Timeout:
+        http_responses.inc('timeout')
+        upload_latency.observe(time.monotonic() - started)
+        raise
+    except requests.exceptions.ConnectionError:
+        http_responses.inc('connection_error')
+        upload_latency.observe(time.monotonic() - started)
+        raise
+    http_responses.inc(str(response.status_code))
+    upload_latency.observe(time.monotonic() - started)
+    return response
+
+def send_to_backend(payload):
+    """Tek bir veriyi backend'e uygun formatta gönder
+    
+    True: gönderildi, False: backend reddetti, None: backend'e ulaşılamadı (spool'a alınabilir)
+    """
+    router_id = payload['router']
+    sensor_id = payload['sensor']
+    device_id = f"BT{router_id}"
+    
+    api_data = build_api_data(payload)
+    data_key = '/'.join(payload.get('data') or [payload.get('data_key', '')])
     
     # Backend'e gönder
     try:
-        print(f"📤 Backend'e gönderiliyor: {device_id} (R:{router_id}/S:{sensor_id}) - {data_key}")
-        print(f"🔍 API Data: {api_data}")  # Debug için API data'yı göster
-        response = requests.post(
-            BACKEND_URL, 
-            json=api_data, 
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
+        logger.debug("📤 Backend'e gönderiliyor: %s (R:%s/S:%s) - %s", device_id, router_id, sensor_id, data_key)
+        logger.debug("🔍 API Data: %s", api_data)
+        response = post_to_backend(BACKEND_URL, api_data)
+        
+        if response.status_code == 200:
+            logger.debug("✅ %s %s verisi backend'e başarıyla gönderildi!", device_id, data_key)
+            return True
+        else:
+            logger.warning("⚠️ Backend hata: HTTP %d - Response: %s - Sent Data: %s",
+                           response.status_code, response.text, api_data)
+            return None if response.status_code >= 500 else False
+            
+    except CircuitOpenError:
+        logger.warning("⛔ Backend devre dışı, gönderilmedi: %s %s", device_id, data_key)
+    except requests.exceptions.Timeout:
+        logger.warning("⏰ Backend timeout: %s %s", device_id, data_key)
+    except requests.exceptions.ConnectionError:
+        logger.warning("🔌 Backend bağlantı hatası: %s %s", device_id, data_key)
+    except Exception as e:
+        logger.error("❌ Backend gönderim hatası: %s", e)
+        return False
+    return None
+
+def send_batch_to_backend(payloads):
+    """Biriken verileri tek istekle batch endpoint'ine gönder - dönüş değeri send_to_backend ile aynı"""
+    if len(payloads) == 1:
+        return send_to_backend(payloads[0])
+    
+    readings = [build_api_data(payload) for payload in payloads]
+    
+    try:
+        logger.debug("📤 Backend'e batch gönderiliyor: %d okuma", len(readings))
+        response = post_to_backend(BATCH_URL, {"readings": readings}, idempotent=True)
         
         if response.status_code == 200:
-            print(f"✅ {device_id} {data_key} verisi backend'e başarıyla gönderildi!")
+            result = response.json().get('data', {})
+            logger.debug("✅ Batch gönderildi: %s kaydedildi, %s atlandı",
+                         result.get('saved', len(readings)), result.get('skipped', 0))
+            return True
         else:
-            print(f"⚠️ Backend hata: HTTP {response.status_code}")
-            print(f"   Response: {response.text}")
-            print(f"   Sent Data: {api_data}")  # Hata durumunda gönderilen veriyi göster
+            logger.warning("⚠️ Backend batch hata: HTTP %d - Response: %s", response.status_code, response.text)
+            return None if response.status_code >= 500 else False
             
+    except CircuitOpenError:
+        logger.warning("⛔ Backend devre dışı, batch gönderilmedi: %d okuma", len(readings))
     except requests.exceptions.Timeout:
-        print(f"⏰ Backend timeout: {device_id} {data_key}")
+        logger.warning("⏰ Backend batch timeout: %d okuma", len(readings))
     except requests.exceptions.ConnectionError:
-        print(f"🔌 Backend bağlantı hatası: {device_id} {data_key}")
+        logger.warning("🔌 Backend bağlantı hatası: %d okuma", len(readings))
     except Exception as e:
-        print(f"❌ Backend gönderim hatası: {e}")
+        logger.error("❌ Backend batch gönderim hatası: %s", e)
+        return False
+    return None
+
+def upload_readings(payloads):
+    """Upload worker'larından çağrılır - backend'e ulaşılamazsa okumalar spool'a yazılır"""
+    result = send_batch_to_backend(payloads)
+    if result is None and reading_spool is not None:
+        reading_spool.append(payloads)
+        logger.info("💾 %d okuma spool'a alındı", len(payloads))
+    return bool(result)
 
 def check_backend_connection():
     """Backend sunucusunun çalışıp çalışmadığını kontrol et"""
     try:
-        response = requests.get('http://localhost:5000/api/health', timeout=5)
+        response = backend_client.get(HEALTH_URL, timeout=5)
         if response.status_code == 200:
             print("✅ Backend sunucusu çalışıyor")
             return True
@@ -211,8 +429,400 @@ def check_backend_connection():
     print("💡 Backend'i başlatmak için: cd backend && npm start")
     return False
 
+def start_upload_services():
+    """Spool, replayer, upload pipeline ve coalescer'ı başlat - tüm okuma modları bunları paylaşır"""
+    global reading_spool
+    
+    services = {'replayer': None, 'coalescer': None}
+    if SPOOL_ENABLED:
+        reading_spool = DiskSpool(
+            SPOOL_DIR,
+            segment_bytes=SPOOL_SEGMENT_BYTES,
+            max_bytes=SPOOL_MAX_BYTES,
+            fsync_batch=SPOOL_FSYNC_BATCH,
+            fsync_interval=SPOOL_FSYNC_INTERVAL
+        )
+        pending = reading_spool.pending_bytes()
+        if pending:
+            print(f"💾 Spool'da bekleyen {pending / 1024:.1f} KB veri var, backend'e tekrar gönderilecek")
+        services['replayer'] = SpoolReplayer(
+            reading_spool,
+            send_batch_to_backend,
+            batch_size=SPOOL_REPLAY_BATCH,
+            retry_interval=SPOOL_RETRY_INTERVAL
+        )
+        services['replayer'].start()
+    
+    pipeline = UploadPipeline(
+        upload_readings,
+        queue_size=UPLOAD_QUEUE_SIZE,
+        workers=UPLOAD_WORKERS,
+        overflow_policy=UPLOAD_OVERFLOW_POLICY,
+        block_timeout=UPLOAD_BLOCK_TIMEOUT,
+        batch_size=UPLOAD_BATCH_SIZE,
+        batch_wait=UPLOAD_BATCH_WAIT,
+        levels=PRIORITY_LEVELS,
+        priority_fn=itemgetter('priority')
+    )
+    pipeline.start()
+    services['pipeline'] = pipeline
+    
+    deadband = None
+    if DEADBAND_ENABLED:
+        deadband = DeadbandFilter(
+            DEADBAND_RULES,
+            heartbeat=DEADBAND_HEARTBEAT,
+            state=router_deadband_state
+        )
+    services['deadband'] = deadband
+    
+    priority_rules = PriorityRules(PRIORITY_RULES, [name for name, _, _ in PRIORITY_LEVELS])
+    
+    prescreen = None
+    if ANOMALY_PRESCREEN_ENABLED:
+        try:
+            detector = load_anomaly_detector(ANOMALY_MODELS_DIR, ANOMALY_MODEL_PATH, online=ANOMALY_PRESCREEN_ONLINE)
+        except ImportError as e:
+            logger.warning("⚠️ Anomali ön taraması kapalı - ML bağımlılıkları eksik: %s", e)
+        else:
+            prescreen = AnomalyPrescreen(detector, router_history, history_points=ANOMALY_HISTORY_POINTS)
+            print(f"🧠 Edge anomali ön taraması açık "
+                  f"({'online EWMA' if ANOMALY_PRESCREEN_ONLINE else 'ML model' if detector.is_trained else 'eşik kuralları'})")
+    services['prescreen'] = prescreen
+    
+    def submit(payload):
+        # Router geçmişine göre skorla - anomaliler deadband'e takılmaz ve hemen gönderilir
+        if prescreen:
+            started = time.perf_counter()
+            anomaly = prescreen.score(payload)
+            prescreen_latency.observe(time.perf_counter() - started)
+            if anomaly and anomaly['isAnomaly']:
+                anomalies_by_router.inc(payload['router'])
+                logger.info("🚨 Anomali: Router %s skor %.3f (%s)",
+                            payload['router'], anomaly['score'], anomaly['method'])
+        
+        # Alarm okumaları deadband'e takılmaz ve öncelikli kuyruğa girer
+        payload['priority'] = priority_rules.classify(payload)
+        
+        # Değişmeyen alanları çıkar - hiçbiri değişmediyse okuma gönderilmez
+        if deadband:
+            filtered = deadband.filter(payload)
+            if payload['priority'] == priority_rules.levels[-1]:
+                payload = filtered
+            if payload is None:
+                return
+        
+        # Backend'e gönderim kuyruğuna ekle (Improved hardware matching ile)
+        if not pipeline.submit(payload):
+            logger.warning("🗑️ Upload kuyruğu dolu, paket atıldı (Router %s, %s)",
+                           payload['router'], payload['priority'])
+    
+    if COALESCE_WINDOW > 0:
+        services['coalescer'] = Coalescer(
+            submit,
+            window=COALESCE_WINDOW,
+            expected_keys=COALESCE_EXPECTED_KEYS
+        )
+        services['coalescer'].start()
+        services['submit'] = services['coalescer'].add
+    else:
+        services['submit'] = submit
+    
+    register_service_metrics(services)
+    return services
+
+def register_service_metrics(services):
+    """Kuyruk, spool, birleştirme ve deadband istatistiklerini /metrics'e bağla"""
+    pipeline = services['pipeline']
+    metrics.gauge('upload_queue_depth', "Upload kuyruğundaki paketler", labels=('priority',),
+                  fn=lambda: {(name,): pipeline.queue.qsize(name) for name in pipeline.queue.names})
+    metrics.gauge('upload_queue_wait_max_seconds', "Kuyrukta en uzun bekleme", labels=('priority',),
+                  fn=lambda: {(name,): s['wait_max'] for name, s in pipeline.queue.stats.items()})
+    metrics.counter_fn('upload_readings_total', "Upload kuyruğundan çıkan okumalar",
+                       lambda: {(status,): pipeline.stats()[status] for status in ('uploaded', 'failed', 'dropped')},
+                       labels=('status',))
+    if reading_spool:
+        metrics.gauge('spool_pending_bytes', "Spool'da backend'i bekleyen veri", fn=reading_spool.pending_bytes)
+    if services['coalescer']:
+        coalescer = services['coalescer']
+        metrics.counter_fn('coalesce_fields_total', "Birleştirmeye giren alanlar",
+                           lambda: coalescer.stats['fields_in'])
+    if services['deadband']:
+        deadband = services['deadband']
+        metrics.counter_fn('deadband_suppressed_fields_total', "Deadband ile gönderilmeyen alanlar",
+                           lambda: {(key,): n for key, n in deadband.stats['suppressed_by_key'].items()},
+                           labels=('key',))
+
+def start_metrics_server(port):
+    """/metrics endpoint'ini arka planda başlat - port 0 ise kapalı"""
+    if not port:
+        return None
+    try:
+        server = MetricsServer(metrics, host=METRICS_HOST, port=port)
+    except OSError as e:
+        logger.warning("⚠️ Metrics endpoint açılamadı (%s:%d): %s", METRICS_HOST, port, e)
+        return None
+    server.start()
+    print(f"📈 Metrikler: http://{METRICS_HOST}:{server.port}/metrics")
+    return server
+
+def stop_upload_services(services):
+    """Bekleyen pencereleri kapat, kuyruğu boşalt, replayer'ı durdur ve spool'u kapat"""
+    if services['coalescer']:
+        services['coalescer'].stop()
+    print("⏳ Kuyruktaki veriler gönderiliyor...")
+    pipeline = services['pipeline']
+    pipeline.stop(drain=True)
+    if services['replayer']:
+        services['replayer'].stop()
+        services['replayer'].join(2.0)
+    backend_client.close()
+    stats = pipeline.stats()
+    print(f"📊 Toplam gönderilen: {stats['uploaded']}, hatalı: {stats['failed']}, atılan: {stats['dropped']}")
+    if reading_spool:
+        reading_spool.close()
+        print(f"💾 Spool: {reading_spool.stats['spooled']} yazıldı, "
+              f"{reading_spool.stats['replayed']} tekrar gönderildi, "
+              f"{reading_spool.pending_bytes() / 1024:.1f} KB bekliyor")
+
+def print_pipeline_stats(services):
+    """Periyodik kuyruk istatistiği"""
+    stats = services['pipeline'].stats()
+    logger.info("📊 Kuyruk: %d/%d (max %d) - gönderilen: %d (%d istek), hatalı: %d, atılan: %d",
+                stats['depth'], UPLOAD_QUEUE_SIZE, stats['max_depth'], stats['uploaded'],
+                stats['batches'], stats['failed'], stats['dropped'])
+    logger.info("🚦 Öncelik: %s", ", ".join(
+        f"{name} {level['served']} (ort. bekleme {level['wait_total'] / max(1, level['served']):.2f}s)"
+        for name, level in stats['levels'].items()))
+    if services['coalescer']:
+        coalesce = services['coalescer'].stats
+        logger.info("🔗 Birleştirme: %d alan → %d okuma", coalesce['fields_in'], coalesce['readings_out'])
+    if services['deadband']:
+        deadband = services['deadband']
+        logger.info("🔕 Deadband: %d/%d alan bastırıldı (%%%.0f), %d okuma hiç gönderilmedi - key bazında: %s",
+                    deadband.stats['fields_suppressed'], deadband.stats['fields_in'],
+                    deadband.savings() * 100, deadband.stats['readings_suppressed'],
+                    deadband.stats['suppressed_by_key'])
+    if services['prescreen']:
+        prescreen = services['prescreen'].stats
+        logger.info("🧠 Ön tarama: %d okuma skorlandı (ort. %.2f ms), %d anomali, %d atlandı",
+                    prescreen['scored'], prescreen['seconds'] * 1000 / max(1, prescreen['scored']),
+                    prescreen['anomalies'], prescreen['skipped'])
+
+def make_payload_handler(services):
+    """Parse edilen her payload için çağrılacak handler - cache günceller ve gönderime verir"""
+    packet_count = 0
+    submit = services['submit']
+    
+    def on_payload(payload):
+        nonlocal packet_count
+        packet_count += 1
+        packets_by_router.inc(payload['router'])
+        logger.debug("📦 Paket #%d%s", packet_count,
+                     f" [{payload['gateway']}]" if 'gateway' in payload else "")
+        
+        # Okuma zamanını kaydet - batch gecikmesi timestamp'i kaydırmasın
+        payload['timestamp'] = datetime.now().isoformat()
+        
+        # Cache'i güncelle
+        update_router_cache(payload)
+        
+        # Router döngüsü tamamlanınca tek okuma olarak kuyruğa girer
+        submit(payload)
+    
+    return on_payload
+
+def run_serial(port, baudrate, services):
+    """Tek port modu - reader thread okur, ana thread istatistik yazar"""
+    try:
+        ser = serial.Serial(port, baudrate, timeout=1)
+        time.sleep(2)
+        print(f"✅ Serial porta başarıyla bağlanıldı: {port}")
+        print("\n👂 Text verilerini dinlemeye başlıyor...")
+        print("💡 Çıkmak için Ctrl+C tuşlayın\n")
+        
+        reader = SerialReaderThread(
+            ser,
+            parse_text_data,
+            make_payload_handler(services),
+            on_line=log_line
+        )
+        active_readers.append(reader)
+        reader.start()
+        
+        last_stats = time.monotonic()
+        while reader.is_alive():
+            try:
+                reader.join(1.0)
+                if time.monotonic() - last_stats >= STATS_INTERVAL:
+                    last_stats = time.monotonic()
+                    print_pipeline_stats(services)
+            except KeyboardInterrupt:
+                print("\n\n🛑 Coordinator durduruluyor...")
+                break
+                
+    except serial.SerialException as e:
+        print(f"❌ Serial port hatası: {e}")
+    finally:
+        if 'reader' in locals():
+            reader.stop()
+            reader.join(2.0)
+        if 'ser' in locals() and ser.is_open:
+            ser.close()
+
+def run_multi_gateway(ports, baudrate, services):
+    """Asyncio modu - tüm gateway portları tek event loop'ta, ortak pipeline ile"""
+    handle_payload = make_payload_handler(services)
+    
+    async def on_payload(payload):
+        # 'block' politikasında sadece ilgili port bekler, diğer gateway'ler okumaya devam eder
+        if UPLOAD_OVERFLOW_POLICY == 'block':
+            await asyncio.to_thread(handle_payload, payload)
+        else:
+            handle_payload(payload)
+    
+    gateways = [
+        GatewayReader(
+            port,
+            baudrate,
+            parse_text_data,
+            on_payload,
+            on_line=lambda gw, line: log_line(line, gw)
+        )
+        for port in ports
+    ]
+    active_readers.extend(gateways)
+    
+    async def report_stats():
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            print_pipeline_stats(services)
+    
+    async def run():
+        stats_task = asyncio.create_task(report_stats())
+        try:
+            await run_gateways(gateways)
+        finally:
+            stats_task.cancel()
+    
+    print(f"\n👂 {len(gateways)} gateway dinleniyor: {', '.join(ports)}")
+    print("💡 Çıkmak için Ctrl+C tuşlayın\n")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n\n🛑 Coordinator durduruluyor...")
+
+def run_replay(path, speed):
+    """Kaydedilmiş serial log'u stub backend'e karşı oynat ve throughput / gecikme raporla
+    
+    Satırlar gerçek moddaki ile aynı yoldan geçer: framer → parse → cache → coalesce →
+    deadband → upload kuyruğu → HTTP. Gecikme okumanın parse anından stub'a varışına kadardır.
+    """
+    global BACKEND_URL, BATCH_URL, SPOOL_ENABLED
+    
+    records = load_capture(path, line_interval=REPLAY_LINE_INTERVAL)
+    if not records:
+        print(f"❌ Replay dosyasında satır yok: {path}")
+        return
+    
+    stub = StubBackend(latency=REPLAY_STUB_LATENCY).start()
+    BACKEND_URL = stub.url('/api/lora/data')
+    BATCH_URL = stub.url('/api/lora/batch')
+    SPOOL_ENABLED = False  # Gerçek spool'a test verisi yazılmasın
+    
+    duration = records[-1][0] / speed if speed > 0 else 0
+    print(f"▶️ Replay: {len(records)} satır, hız {'max' if speed <= 0 else f'{speed:g}x'}"
+          + (f", ~{duration:.0f}s" if duration else ""))
+    
+    services = start_upload_services()
+    source = ReplaySerial(records, speed=speed)
+    reader = SerialReaderThread(source, parse_text_data, make_payload_handler(services), on_line=log_line)
+    active_readers.append(reader)
+    
+    started = time.monotonic()
+    reader.start()
+    try:
+        source.finished.wait()
+    except KeyboardInterrupt:
+        print("\n\n🛑 Replay durduruluyor...")
+    reader.stop()
+    reader.join(2.0)
+    fed_elapsed = time.monotonic() - started
+    
+    stop_upload_services(services)
+    elapsed = time.monotonic() - started
+    stub.stop()
+    
+    report = stub.report()
+    pipeline = services['pipeline'].stats()
+    packets = packets_by_router.total()
+    latency = report['latency']
+    
+    def ms(value):
+        return f"{value * 1000:.1f} ms" if value is not None else "-"
+    
+    print("\n📊 Replay sonucu")
+    print("=" * 70)
+    print(f"  Satır          : {source.lines_fed} ({source.lines_fed / fed_elapsed:.0f} satır/s)")
+    print(f"  Paket          : {packets} parse edildi ({packets / fed_elapsed:.0f} paket/s), "
+          f"{parse_failures.total()} parse hatası")
+    print(f"  Backend        : {report['readings']} okuma / {report['requests']} istek "
+          f"({report['readings'] / elapsed:.0f} okuma/s, toplam {elapsed:.2f}s)")
+    print(f"  Gecikme        : p50 {ms(latency[50])}, p90 {ms(latency[90])}, "
+          f"p99 {ms(latency[99])}, max {ms(report['latency_max'])}")
+    print(f"  Kayıp          : kuyruktan atılan {pipeline['dropped']}, "
+          f"gönderilemeyen {pipeline['failed']}")
+    print("  Öncelik        : " + ", ".join(
+        f"{name} {level['served']} (ort. {level['wait_total'] * 1000 / max(1, level['served']):.1f} ms, "
+        f"max {level['wait_max'] * 1000:.1f} ms, atılan {level['dropped']})"
+        for name, level in pipeline['levels'].items()))
+    if services['deadband']:
+        print(f"  Deadband       : {services['deadband'].stats['readings_suppressed']} okuma bastırıldı")
+    print("=" * 70)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BeeTwin PC Coordinator - Text Format")
+    parser.add_argument('--ports', nargs='+', metavar='PORT',
+                        help="Birden fazla gateway portu (asyncio modu), örn: --ports COM3 COM4")
+    parser.add_argument('--all-ports', action='store_true',
+                        help="Bulunan tüm COM portlarını gateway olarak dinle (asyncio modu)")
+    parser.add_argument('--baud', type=int, default=SERIAL_BAUDRATE,
+                        help=f"Serial baud rate (varsayılan: {SERIAL_BAUDRATE})")
+    parser.add_argument('--log-level', default=LOG_LEVEL,
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper,
+                        help=f"Log seviyesi - DEBUG paket başına detay yazar (varsayılan: {LOG_LEVEL})")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help=f"/metrics endpoint portu, 0: kapalı (varsayılan: {METRICS_PORT})")
+    parser.add_argument('--prescreen', action='store_true',
+                        help="Okumaları AnomalyDetector ile coordinator içinde skorla (ML bağımlılıkları gerekir)")
+    parser.add_argument('--prescreen-online', action='store_true',
+                        help="Ön taramada router başına EWMA baseline kullan (online_detector.py, --prescreen'i açar)")
+    parser.add_argument('--record', metavar='FILE',
+                        help="Okunan satırları replay için zaman damgasıyla dosyaya kaydet")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="Donanım yerine kaydedilmiş serial log'u stub backend'e karşı oynat")
+    parser.add_argument('--speed', type=float, default=REPLAY_SPEED,
+                        help=f"Replay hızı: 1 gerçek zaman, N kat hızlı, 0 en hızlı (varsayılan: {REPLAY_SPEED:g})")
+    return parser.parse_args()
+
 def main():
     """Ana coordinator fonksiyonu - Text format veri işleme"""
+    global capture_writer, ANOMALY_PRESCREEN_ENABLED, ANOMALY_PRESCREEN_ONLINE
+    
+    args = parse_args()
+    setup_logging(args.log_level, burst=LOG_BURST, interval=LOG_INTERVAL)
+    ANOMALY_PRESCREEN_ONLINE = ANOMALY_PRESCREEN_ONLINE or args.prescreen_online
+    ANOMALY_PRESCREEN_ENABLED = ANOMALY_PRESCREEN_ENABLED or args.prescreen or ANOMALY_PRESCREEN_ONLINE
+    
+    if args.replay:
+        metrics_server = start_metrics_server(args.metrics_port)
+        try:
+            run_replay(args.replay, args.speed)
+        finally:
+            if metrics_server:
+                metrics_server.stop()
+        return
+    
     print("🐝 BeeTwin PC Coordinator - Text Format")
     print("=" * 70)
     print("📡 Router'lardan text format veri alır ve backend'e gönderir")
@@ -229,63 +839,37 @@ def main():
         if choice.lower() != 'y':
             return
     
-    # Serial port bul ve bağlan
+    # Serial port(lar)ı bul
     print("\n🔌 Serial bağlantısı kuruluyor...")
-    port = find_serial_port()
-    if not port:
+    if args.ports:
+        ports = args.ports
+    elif args.all_ports:
+        ports = find_serial_ports()
+    else:
+        port = find_serial_port()
+        ports = [port] if port else []
+    if not ports:
         return
     
+    if args.record:
+        capture_writer = CaptureWriter(args.record)
+        print(f"⏺️ Okunan satırlar kaydediliyor: {args.record}")
+    
+    services = start_upload_services()
+    metrics_server = start_metrics_server(args.metrics_port)
     try:
-        ser = serial.Serial(port, 9600, timeout=1)
-        time.sleep(2)
-        print(f"✅ Serial porta başarıyla bağlanıldı: {port}")
-        print("\n👂 Text verilerini dinlemeye başlıyor...")
-        print("💡 Çıkmak için Ctrl+C tuşlayın\n")
-        
-        packet_count = 0
-        
-        while True:
-            try:
-                if ser.in_waiting > 0:
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
-                    
-                    if line:
-                        print(f"📝 Text: {line}")
-                        
-                        # "Coordinator ready..." mesajını atla
-                        if "Coordinator ready" in line:
-                            continue
-                            
-                        # Text veriyi parse et
-                        payload = parse_text_data(line)
-                        if payload:
-                            packet_count += 1
-                            print(f"📦 Paket #{packet_count} - {datetime.now().strftime('%H:%M:%S')}")
-                            
-                            # Cache'i güncelle
-                            update_router_cache(payload)
-                            
-                            # Backend'e gönder (Improved hardware matching ile)
-                            send_to_backend(payload)
-                            
-                            print("-" * 60)
-                
-                time.sleep(0.1)
-                
-            except KeyboardInterrupt:
-                print("\n\n🛑 Coordinator durduruluyor...")
-                break
-            except Exception as e:
-                print(f"❌ Hata: {e}")
-                time.sleep(1)
-                
-    except serial.SerialException as e:
-        print(f"❌ Serial port hatası: {e}")
+        if args.ports or args.all_ports:
+            run_multi_gateway(ports, args.baud, services)
+        else:
+            run_serial(ports[0], args.baud, services)
     except Exception as e:
         print(f"❌ Beklenmeyen hata: {e}")
     finally:
-        if 'ser' in locals() and ser.is_open:
-            ser.close()
+        stop_upload_services(services)
+        if metrics_server:
+            metrics_server.stop()
+        if capture_writer:
+            capture_writer.close()
         print("👋 Coordinator kapatıldı!")
 
 if __name__ == "__main__":